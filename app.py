@@ -26,6 +26,8 @@ import sqlite3
 import json
 from datetime import datetime
 
+import model_runtime
+
 app = Flask(__name__, static_folder='.')
 CORS(app)
 
@@ -37,6 +39,10 @@ DB_PATH = 'patients.db'
 MODEL_PATH = 'models/gru_v23_best.keras'
 PREPROCESSING_DIR = 'data/processed'
 
+# Model çalıştırma seçenekleri (bkz. model_runtime.py): XLA derleme ve açılmış GRU
+MODEL_JIT_COMPILE = os.getenv('MODEL_JIT_COMPILE', '0') == '1'
+MODEL_UNROLL = os.getenv('MODEL_UNROLL', '0') == '1'
+
 def init_database():
     """Veritabanını oluştur ve tabloları tanımla"""
     conn = sqlite3.connect(DB_PATH)
@@ -205,8 +211,11 @@ def load_model_and_preprocessing():
         
         # Modeli yükle
         print(f"\n[1/5] Model yükleniyor: {MODEL_PATH}")
-        model = keras.models.load_model(MODEL_PATH)
-        print("  ✓ Model başarıyla yüklendi")
+        model = model_runtime.load_model(
+            MODEL_PATH, jit_compile=MODEL_JIT_COMPILE, unroll=MODEL_UNROLL
+        )
+        print(f"  ✓ Model başarıyla yüklendi "
+              f"({model_runtime.describe(MODEL_JIT_COMPILE, MODEL_UNROLL)})")
         
         # Column info yükle
         print(f"\n[2/5] Sütun bilgileri yükleniyor...")
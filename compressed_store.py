@@ -0,0 +1,446 @@
+"""
+Sepsis Tahmin Sistemi - Sıkıştırılmış Dizi Depolama
+===================================================
+
+Hazırlanmış pencere dizileri (X_<split>) için parçalı (chunked) sıkıştırılmış
+depolama. Medyanla doldurulmuş fizyolojik seriler çok tekrar içerdiğinden
+yüksek oranda sıkışır.
+
+- Dizi ilk eksen boyunca chunk_rows satırlık parçalara bölünür; her parça
+  ayrı sıkıştırılır. Rastgele batch erişiminde yalnızca ilgili parçalar
+  açılır.
+- İsteğe bağlı bayt karıştırma (byte-shuffle): float değerlerin aynı
+  anlamlı baytları yan yana getirilir. Örtüşen pencerelerde satırlar aynen
+  tekrarlandığından karıştırmasız sıkıştırma genellikle daha iyi oran verir;
+  bu yüzden varsayılan olarak kapalıdır.
+- Codec: zlib, lzma, bz2 (standart kütüphane); zstandard veya lz4 kuruluysa
+  zstd ve lz4 (en hızlı açma).
+- Okuma: eksik parçalar iş parçacığı havuzunda paralel açılır (codec'ler
+  GIL'i bırakır); açılmış parçalar boyutu sınırlı bir LRU önbellekte tutulur.
+- Tamamen rastgele batch'ler neredeyse her parçaya dokunur; eğitimde
+  chunk_shuffled_order ile parça bazında karıştırma kullanılır (her batch
+  yalnızca birkaç parça açar).
+
+Dosya düzeni (.npc):
+    MAGIC | parça_0 | parça_1 | ... | JSON alt bilgi | alt bilgi uzunluğu (8 bayt) | MAGIC
+Alt bilgi shape, dtype, codec, seviye ve parça ofsetlerini/satır sayılarını
+tutar; böylece dosya akış halinde yazılabilir ve sonuna parça eklenebilir.
+Eklemede önce dosyanın geçerli boyutu <dosya>.journal'a yazılır; yeni
+parçalar eski alt bilginin arkasına, yeni alt bilgi en sona yazılır ve ancak
+bunlar diske ulaştıktan sonra journal silinir. Journal varken okuyucular
+dosyayı journal'daki boyutta (eski alt bilgiyle) görür; yarıda kalan ekleme
+bir sonraki eklemede kırpılarak temizlenir.
+"""
+
+import bz2
+import json
+import lzma
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from file_utils import write_json_atomic
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import lz4.frame
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+
+MAGIC = b'SEPSNPC1'
+COMPRESSED_SUFFIX = '.npc'
+CODECS = ['zlib', 'lzma', 'bz2', 'zstd', 'lz4']
+DEFAULT_LEVELS = {'zlib': 6, 'lzma': 6, 'bz2': 9, 'zstd': 3, 'lz4': 0}
+
+
+def available_codecs() -> list:
+    """Bu ortamda kullanılabilen codec'ler"""
+    return [
+        codec for codec in CODECS
+        if (codec != 'zstd' or HAS_ZSTD) and (codec != 'lz4' or HAS_LZ4)
+    ]
+
+
+def compress_bytes(data: bytes, codec: str, level: int) -> bytes:
+    """Bayt dizisini sıkıştır"""
+    if codec == 'zlib':
+        return zlib.compress(data, level)
+    if codec == 'lzma':
+        return lzma.compress(data, preset=level)
+    if codec == 'bz2':
+        return bz2.compress(data, level)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if codec == 'lz4':
+        return lz4.frame.compress(data, compression_level=level)
+    raise ValueError(f"Bilinmeyen codec: {codec}")
+
+
+def decompress_bytes(data: bytes, codec: str) -> bytes:
+    """Sıkıştırılmış bayt dizisini aç"""
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'lzma':
+        return lzma.decompress(data)
+    if codec == 'bz2':
+        return bz2.decompress(data)
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == 'lz4':
+        return lz4.frame.decompress(data)
+    raise ValueError(f"Bilinmeyen codec: {codec}")
+
+
+def shuffle_bytes(array: np.ndarray) -> bytes:
+    """Elemanların i. baytlarını yan yana getir (sıkıştırma öncesi filtre)"""
+    itemsize = array.dtype.itemsize
+    raw = np.ascontiguousarray(array).view(np.uint8).reshape(-1, itemsize)
+    return raw.T.tobytes()
+
+
+def unshuffle_bytes(data: bytes, dtype: np.dtype, shape: tuple) -> np.ndarray:
+    """shuffle_bytes işleminin tersi"""
+    itemsize = dtype.itemsize
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(itemsize, -1)
+    return np.ascontiguousarray(raw.T).view(dtype).reshape(shape)
+
+
+def _journal_path(path: str) -> str:
+    return path + '.journal'
+
+
+def _committed_size(path: str):
+    """Yarıda kalmış bir ekleme varsa dosyanın ondan önceki boyutu, yoksa None"""
+    journal = _journal_path(path)
+    if not os.path.exists(journal):
+        return None
+    with open(journal, 'r', encoding='utf-8') as f:
+        return json.load(f)['committed_size']
+
+
+def _read_footer(f, file_size: int = None) -> tuple:
+    """(alt bilgi, alt bilginin başladığı ofset); file_size: geçerli dosya sonu"""
+    if file_size is None:
+        file_size = _committed_size(f.name)
+    if file_size is None:
+        file_size = f.seek(0, os.SEEK_END)
+    f.seek(file_size - 8 - len(MAGIC))
+    footer_size = int.from_bytes(f.read(8), 'little')
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name}: geçerli bir sıkıştırılmış dizi dosyası değil")
+    footer_start = file_size - 8 - len(MAGIC) - footer_size
+    f.seek(footer_start)
+    return json.loads(f.read(footer_size).decode('utf-8')), footer_start
+
+
+class CompressedArrayWriter:
+    """
+    Satırları parça parça sıkıştırarak .npc dosyasına yazar
+
+    mode='a' ile mevcut dosyanın sonuna yeni parçalar eklenir; mevcut parçalar
+    okunmaz. Eski alt bilgiye dokunulmaz: geçerli boyut journal'a yazılır,
+    yeni parçalar ondan sonra yazılır, close() yeni alt bilgiyi en sona ekler
+    ve journal'ı siler. Ekleme yarıda kesilirse dosya eski alt bilgisiyle
+    okunabilir kalır; with bloğunda hata oluşursa dosya eski boyutuna kırpılır.
+    """
+
+    def __init__(self, path: str, dtype=None, row_shape: tuple = None, codec: str = 'zlib',
+                 level: int = None, chunk_rows: int = 512, shuffle: bool = False,
+                 mode: str = 'w'):
+        self.path = path
+        self.mode = mode
+        if mode == 'a':
+            self.file = open(path, 'r+b')
+            self.meta, _ = _read_footer(self.file)
+            # Önceki yarım eklemeden kalan baytlar atılır
+            self._committed_size = _committed_size(path)
+            if self._committed_size is None:
+                self._committed_size = self.file.seek(0, os.SEEK_END)
+                write_json_atomic(_journal_path(path), {'committed_size': self._committed_size})
+            self.file.truncate(self._committed_size)
+            self.file.seek(self._committed_size)
+        else:
+            if codec not in available_codecs():
+                raise ValueError(f"Codec kullanılamıyor: {codec} (mevcut: {available_codecs()})")
+            self.file = open(path, 'wb')
+            # Üzerine yazılan dosyanın yarım eklemesine ait journal geçersizdir
+            if os.path.exists(_journal_path(path)):
+                os.remove(_journal_path(path))
+            self.file.write(MAGIC)
+            self.meta = {
+                'shape': [0] + list(row_shape),
+                'dtype': np.dtype(dtype).str,
+                'codec': codec,
+                'level': DEFAULT_LEVELS[codec] if level is None else level,
+                'shuffle': shuffle,
+                'chunk_rows': chunk_rows,
+                'offsets': [],
+                'sizes': [],
+                'rows': []
+            }
+        self.dtype = np.dtype(self.meta['dtype'])
+        self.row_shape = tuple(self.meta['shape'][1:])
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._pending = []
+        self._pending_rows = 0
+
+    def write(self, array: np.ndarray):
+        """Satır ekle (chunk_rows dolunca parça sıkıştırılıp yazılır)"""
+        array = np.asarray(array, dtype=self.dtype)
+        if array.shape[1:] != self.row_shape:
+            raise ValueError(f"{self.path}: {array.shape} şekilli veri {self.row_shape} satırlarına eklenemez")
+        chunk_rows = self.meta['chunk_rows']
+        while len(array):
+            take = min(chunk_rows - self._pending_rows, len(array))
+            self._pending.append(array[:take])
+            self._pending_rows += take
+            array = array[take:]
+            if self._pending_rows == chunk_rows:
+                self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self._pending_rows:
+            return
+        chunk = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        data = shuffle_bytes(chunk) if self.meta['shuffle'] else np.ascontiguousarray(chunk).tobytes()
+        compressed = compress_bytes(data, self.meta['codec'], self.meta['level'])
+        self.meta['offsets'].append(self.file.tell())
+        self.meta['sizes'].append(len(compressed))
+        self.meta['rows'].append(len(chunk))
+        self.meta['shape'][0] += len(chunk)
+        self.file.write(compressed)
+        self.raw_bytes += chunk.nbytes
+        self.stored_bytes += len(compressed)
+        self._pending = []
+        self._pending_rows = 0
+
+    def close(self):
+        """Kalan satırları yaz ve alt bilgiyi ekle"""
+        self._flush_chunk()
+        # Parçalar diske ulaşmadan onlara işaret eden alt bilgi yazılmaz
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        footer = json.dumps(self.meta).encode('utf-8')
+        self.file.write(footer)
+        self.file.write(len(footer).to_bytes(8, 'little'))
+        self.file.write(MAGIC)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if self.mode == 'a':
+            os.remove(_journal_path(self.path))
+
+    def abort(self):
+        """Eklemeyi geri al: dosyayı eski boyutuna kırp (mode='w' için close)"""
+        if self.mode != 'a':
+            self.close()
+            return
+        self.file.truncate(self._committed_size)
+        self.file.close()
+        os.remove(_journal_path(self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class CompressedArray:
+    """
+    .npc dosyası için salt okunur, NumPy benzeri görünüm
+
+    len(), shape, dtype ve int/dilim/indeks dizisi erişimi destekler. Bir
+    erişimin ihtiyaç duyduğu eksik parçalar workers iş parçacığıyla paralel
+    açılır; açılmış parçalar cache_mb sınırlı LRU önbellekte tutulur.
+    """
+
+    def __init__(self, path: str, workers: int = None, cache_mb: float = 256):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.meta, _ = _read_footer(f)
+        self._fd = os.open(path, os.O_RDONLY)
+        self.codec = self.meta['codec']
+        self._dtype = np.dtype(self.meta['dtype'])
+        self._shape = tuple(self.meta['shape'])
+        self._rows = np.asarray(self.meta['rows'], dtype=np.int64)
+        self._row_starts = np.concatenate([[0], np.cumsum(self._rows)])
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self._executor = None
+        self.cache_bytes = int(cache_mb * 1024**2)
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    @property
+    def shape(self) -> tuple:
+        return self._shape
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Açılmış (ham) veri boyutu (byte)"""
+        return int(np.prod(self._shape)) * self._dtype.itemsize
+
+    @property
+    def chunk_row_starts(self) -> np.ndarray:
+        """Parçaların başlangıç satırları (son eleman toplam satır sayısı)"""
+        return self._row_starts
+
+    @property
+    def stored_bytes(self) -> int:
+        """Diskteki sıkıştırılmış veri boyutu (byte)"""
+        return int(sum(self.meta['sizes']))
+
+    def _decompress_chunk(self, i: int) -> np.ndarray:
+        data = os.pread(self._fd, self.meta['sizes'][i], self.meta['offsets'][i])
+        data = decompress_bytes(data, self.codec)
+        shape = (int(self._rows[i]),) + self._shape[1:]
+        if self.meta['shuffle']:
+            return unshuffle_bytes(data, self._dtype, shape)
+        return np.frombuffer(data, dtype=self._dtype).reshape(shape)
+
+    def _chunks(self, chunk_ids) -> dict:
+        """İstenen parçaları döndür (eksikler paralel açılır)"""
+        with self._lock:
+            found = {}
+            for i in chunk_ids:
+                if i in self._cache:
+                    self._cache.move_to_end(i)
+                    found[i] = self._cache[i]
+        missing = [i for i in chunk_ids if i not in found]
+        if len(missing) > 1 and self.workers > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            decompressed = list(self._executor.map(self._decompress_chunk, missing))
+        else:
+            decompressed = [self._decompress_chunk(i) for i in missing]
+
+        with self._lock:
+            for i, chunk in zip(missing, decompressed):
+                found[i] = chunk
+                if chunk.nbytes > self.cache_bytes:
+                    continue
+                self._cache[i] = chunk
+                self._cached_bytes += chunk.nbytes
+                while self._cached_bytes > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= evicted.nbytes
+        return found
+
+    def _take(self, indices: np.ndarray) -> np.ndarray:
+        chunk_of = np.searchsorted(self._row_starts, indices, side='right') - 1
+        chunk_ids = np.unique(chunk_of).tolist()
+        chunks = self._chunks(chunk_ids)
+        out = np.empty((len(indices),) + self._shape[1:], dtype=self._dtype)
+        for i in chunk_ids:
+            mask = chunk_of == i
+            out[mask] = chunks[i][indices[mask] - self._row_starts[i]]
+        return out
+
+    def __getitem__(self, key) -> np.ndarray:
+        if isinstance(key, (int, np.integer)):
+            index = int(key) + len(self) if key < 0 else int(key)
+            if not 0 <= index < len(self):
+                raise IndexError(f"{key} indeksi {len(self)} satır için geçersiz")
+            return self._take(np.array([index]))[0]
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                # Ardışık dilim: parçalar sırayla birleştirilir
+                first = np.searchsorted(self._row_starts, start, side='right') - 1
+                last = np.searchsorted(self._row_starts, max(stop - 1, start), side='right') - 1
+                if stop <= start:
+                    return np.empty((0,) + self._shape[1:], dtype=self._dtype)
+                chunk_ids = list(range(first, last + 1))
+                chunks = self._chunks(chunk_ids)
+                parts = [chunks[i] for i in chunk_ids]
+                joined = np.concatenate(parts) if len(parts) > 1 else parts[0]
+                offset = start - self._row_starts[first]
+                return joined[offset:offset + (stop - start)].copy()
+            return self._take(np.arange(start, stop, step))
+        indices = np.asarray(key)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        indices = np.where(indices < 0, indices + len(self), indices)
+        return self._take(indices.astype(np.int64))
+
+    def __array__(self, dtype=None):
+        array = self[:]
+        return array if dtype is None else array.astype(dtype)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def chunk_shuffled_order(chunk_row_starts: np.ndarray, rng: np.random.Generator,
+                         group_chunks: int = 8) -> np.ndarray:
+    """
+    Parça bazında karıştırılmış satır sırası
+
+    Parça sırası karıştırılır; ardışık group_chunks parçanın satırları kendi
+    aralarında karıştırılır. Böylece bir batch en fazla ~group_chunks parça
+    açar ve her parça grup başına bir kez açılır (LRU önbellekte kalır).
+    """
+    chunk_ids = rng.permutation(len(chunk_row_starts) - 1)
+    order = []
+    for g in range(0, len(chunk_ids), group_chunks):
+        rows = np.concatenate([
+            np.arange(chunk_row_starts[i], chunk_row_starts[i + 1])
+            for i in chunk_ids[g:g + group_chunks]
+        ])
+        rng.shuffle(rows)
+        order.append(rows)
+    return np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+
+
+def write_compressed_windows(path: str, features: np.ndarray, ends: np.ndarray, window_size: int,
+                             codec: str = 'zlib', level: int = None, chunk_rows: int = 512,
+                             shuffle: bool = False, mode: str = 'w') -> tuple:
+    """
+    Pencereleri toplayarak sıkıştırılmış .npc dosyasına yaz (veya mode='a' ile ekle)
+
+    Returns:
+        (ham boyut, sıkıştırılmış boyut) byte cinsinden
+    """
+    from sequence_store import gather_windows
+
+    with CompressedArrayWriter(
+        path, dtype=features.dtype, row_shape=(window_size, features.shape[1]),
+        codec=codec, level=level, chunk_rows=chunk_rows, shuffle=shuffle, mode=mode
+    ) as writer:
+        for start in range(0, len(ends), chunk_rows):
+            writer.write(gather_windows(features, ends[start:start + chunk_rows], window_size))
+    return writer.raw_bytes, writer.stored_bytes
@@ -0,0 +1,186 @@
+"""
+Sepsis Tahmin Sistemi - CPU İş Parçacığı Yapılandırması
+=======================================================
+
+Eğitim ve batch script'lerinin (train_gru_v23.py, evaluate_model.py,
+run_gru_on_csv_v23.py) CPU kullanımını sınırlar; paylaşılan düğümlerde
+birden fazla iş aynı anda çalıştırılırken çekirdeklerin aşırı
+paylaşılmasını (oversubscription) önler.
+
+Ayarlar (öncelik sırasıyla: komut satırı > ortam değişkeni > --cpu-config JSON):
+
+- --intra-op-threads / SEPSIS_INTRA_OP_THREADS: TF op içi paralellik
+- --inter-op-threads / SEPSIS_INTER_OP_THREADS: TF op'lar arası paralellik
+- --omp-threads / SEPSIS_OMP_THREADS: OMP_NUM_THREADS, MKL_NUM_THREADS,
+  OPENBLAS_NUM_THREADS (verilmezse intra-op değeri kullanılır)
+- --cpu-affinity / SEPSIS_CPU_AFFINITY: süreci belirtilen çekirdeklere bağla
+  (ör. "0-15,32-47"; yalnızca Linux). intra-op verilmezse çekirdek sayısı
+  kullanılır.
+- --cpu-config / SEPSIS_CPU_CONFIG: scripts/tune_threads.py'nin kaydettiği
+  en iyi ayar
+
+OpenMP/MKL ortam değişkenleri kütüphaneler yüklenirken okunduğundan
+ayarlar TensorFlow import edilmeden önce apply_from_argv() ile uygulanır.
+Bu modül bu yüzden numpy/TensorFlow import etmez.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ENV_VARS = {
+    'intra_op_threads': 'SEPSIS_INTRA_OP_THREADS',
+    'inter_op_threads': 'SEPSIS_INTER_OP_THREADS',
+    'omp_threads': 'SEPSIS_OMP_THREADS',
+    'cpu_affinity': 'SEPSIS_CPU_AFFINITY',
+}
+CONFIG_ENV_VAR = 'SEPSIS_CPU_CONFIG'
+OMP_ENV_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']
+
+# apply_from_argv ile uygulanan son ayarlar (script'ler raporlamak için okur)
+ACTIVE = {}
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """CPU iş parçacığı seçeneklerini parser'a ekle"""
+    group = parser.add_argument_group('CPU iş parçacıkları')
+    group.add_argument('--intra-op-threads', type=int, default=None,
+                       help=f'TensorFlow op içi iş parçacığı sayısı (${ENV_VARS["intra_op_threads"]})')
+    group.add_argument('--inter-op-threads', type=int, default=None,
+                       help=f'TensorFlow op\'lar arası iş parçacığı sayısı '
+                            f'(${ENV_VARS["inter_op_threads"]})')
+    group.add_argument('--omp-threads', type=int, default=None,
+                       help=f'OpenMP/MKL/OpenBLAS iş parçacığı sayısı; varsayılan intra-op '
+                            f'(${ENV_VARS["omp_threads"]})')
+    group.add_argument('--cpu-affinity', type=str, default=None,
+                       help=f'Çekirdek listesi, ör. "0-15,32-47" (${ENV_VARS["cpu_affinity"]})')
+    group.add_argument('--cpu-config', type=str, default=None,
+                       help=f'tune_threads.py çıktısı JSON ayar dosyası (${CONFIG_ENV_VAR})')
+
+
+def parse_cpu_list(text: str) -> list:
+    """'0-3,8,10-11' biçimindeki çekirdek listesini ayrıştır"""
+    cpus = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    if not cpus:
+        raise ValueError(f"Boş çekirdek listesi: {text!r}")
+    return sorted(cpus)
+
+
+def usable_cpus() -> int:
+    """Sürecin kullanabileceği çekirdek sayısı (affinity dikkate alınır)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def resolve(args=None) -> dict:
+    """Komut satırı, ortam değişkenleri ve ayar dosyasından geçerli ayarları topla"""
+    settings = dict.fromkeys(ENV_VARS)
+
+    config_path = getattr(args, 'cpu_config', None) or os.environ.get(CONFIG_ENV_VAR)
+    if config_path:
+        with open(config_path, encoding='utf-8') as f:
+            best = json.load(f).get('best', {})
+        settings.update({key: best[key] for key in ENV_VARS if best.get(key) is not None})
+
+    for key, env_var in ENV_VARS.items():
+        if os.environ.get(env_var):
+            settings[key] = os.environ[env_var]
+        value = getattr(args, key, None)
+        if value is not None:
+            settings[key] = value
+
+    for key in ['intra_op_threads', 'inter_op_threads', 'omp_threads']:
+        if settings[key] is not None:
+            settings[key] = int(settings[key])
+            if settings[key] < 0:
+                raise ValueError(f"{key} negatif olamaz: {settings[key]}")
+    if isinstance(settings['cpu_affinity'], str):
+        settings['cpu_affinity'] = parse_cpu_list(settings['cpu_affinity'])
+    return settings
+
+
+def apply(settings: dict) -> dict:
+    """
+    Ayarları sürece uygula
+
+    Affinity önce uygulanır; intra-op verilmemişse bağlanan çekirdek sayısı
+    kullanılır. Ortam değişkenleri alt süreçlere (ör. --workers) de geçer.
+    TensorFlow zaten import edilmişse thread havuzları tf.config ile ayarlanır
+    (çalışma zamanı başlatılmadan önce çağrılmalıdır).
+    """
+    settings = dict(settings)
+    affinity = settings.get('cpu_affinity')
+    if affinity:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, affinity)
+        else:
+            print("⚠ CPU affinity bu platformda desteklenmiyor, atlanıyor")
+            settings['cpu_affinity'] = None
+        if settings.get('intra_op_threads') is None:
+            settings['intra_op_threads'] = len(affinity)
+
+    intra = settings.get('intra_op_threads')
+    inter = settings.get('inter_op_threads')
+    omp = settings.get('omp_threads') or intra
+    if omp:
+        for env_var in OMP_ENV_VARS:
+            os.environ[env_var] = str(omp)
+    if intra is not None:
+        os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra)
+    if inter is not None:
+        os.environ['TF_NUM_INTEROP_THREADS'] = str(inter)
+
+    if 'tensorflow' in sys.modules:
+        set_tf_threads(intra, inter)
+
+    ACTIVE.clear()
+    ACTIVE.update(settings)
+    return settings
+
+
+def set_tf_threads(intra: int = None, inter: int = None):
+    """TensorFlow thread havuzlarını ayarla (TensorFlow import edilmiş olmalı)"""
+    import tensorflow as tf
+
+    try:
+        if intra is not None:
+            tf.config.threading.set_intra_op_parallelism_threads(intra)
+        if inter is not None:
+            tf.config.threading.set_inter_op_parallelism_threads(inter)
+    except RuntimeError as e:
+        # Çalışma zamanı başlatıldıktan sonra değiştirilemez
+        print(f"⚠ TensorFlow thread ayarı uygulanamadı: {e}")
+
+
+def apply_from_argv(argv: list = None) -> dict:
+    """Thread seçeneklerini sys.argv'den ön-ayrıştır ve uygula (TF import'undan önce)"""
+    parser = argparse.ArgumentParser(add_help=False)
+    add_arguments(parser)
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return apply(resolve(args))
+
+
+def describe(settings: dict) -> str:
+    """Ayarların tek satırlık özeti"""
+    if not settings or all(value is None for value in settings.values()):
+        return 'TensorFlow varsayılanları'
+    affinity = settings.get('cpu_affinity')
+    parts = [
+        f"intra-op: {settings.get('intra_op_threads') or 'varsayılan'}",
+        f"inter-op: {settings.get('inter_op_threads') or 'varsayılan'}",
+        f"omp: {settings.get('omp_threads') or settings.get('intra_op_threads') or 'varsayılan'}",
+    ]
+    if affinity:
+        parts.append(f"affinity: {len(affinity)} çekirdek")
+    return ', '.join(parts)
@@ -0,0 +1,198 @@
+"""
+Sepsis Tahmin Sistemi - Tipli Veri Yükleme
+==========================================
+
+prepare_sequence_dataset_v23.py için hızlı ve bellek dostu girdi okuma.
+
+- Açık dtype haritası: şema dosyasından (--schema) veya dosyanın ilk
+  satırlarından çıkarılır. Sayısal özellikler float32, metin özellikleri
+  category olarak okunur; Patient_ID, ICULOS ve SepsisLabel örnekten
+  çıkarılan tiplerini korur.
+- Sütun budama: şema verilirse yalnızca şemadaki sütunlar (ve zorunlu
+  sütunlar) okunur.
+- pyarrow kuruluysa çok iş parçacıklı 'pyarrow' CSV motoru kullanılır.
+- CSV bir kez Feather (Arrow IPC) önbelleğine dönüştürülür; aynı dosya,
+  şema ve sütunlarla yapılan sonraki çalıştırmalar önbellekten okur.
+- iter_table_chunks: aynı tiplerle parça parça okuma (CSV, Parquet, Feather;
+  out-of-core fit için).
+
+Şema dosyası biçimi (JSON):
+    {"columns": {"Patient_ID": "int64", "ICULOS": "int64", "HR": "float32", ...}}
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    pq = None
+    HAS_PYARROW = False
+
+
+REQUIRED_COLUMNS = ['Patient_ID', 'ICULOS', 'SepsisLabel']
+SAMPLE_ROWS = 10_000
+CACHE_VERSION = 1
+
+
+def load_schema(schema_path: str) -> dict:
+    """Şema dosyasını oku ({"columns": {...}} veya düz sütun -> dtype eşlemesi)"""
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    return dict(schema.get('columns', schema))
+
+
+def infer_schema(input_path: str, sample_rows: int = SAMPLE_ROWS) -> dict:
+    """Dosyanın ilk satırlarından dtype haritası çıkar"""
+    sample = pd.read_csv(input_path, nrows=sample_rows)
+    schema = {}
+    for col, dtype in sample.dtypes.items():
+        if col in REQUIRED_COLUMNS:
+            schema[col] = str(dtype)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            schema[col] = 'float32'
+        else:
+            schema[col] = 'category'
+    return schema
+
+
+def cache_path_for(input_path: str, schema: dict, cache_dir: str) -> str:
+    """
+    Önbellek dosyası yolu
+
+    Anahtar; dosyanın mutlak yolu, boyutu, değişiklik zamanı ve dtype
+    haritasından türetilir (çok GB'lık dosyanın içeriği hashlenmez).
+    """
+    stat = os.stat(input_path)
+    key_source = json.dumps({
+        'version': CACHE_VERSION,
+        'path': os.path.abspath(input_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'schema': schema
+    }, sort_keys=True)
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(cache_dir, f'{name}-{key}.feather')
+
+
+def relaxed_schema(schema: dict) -> dict:
+    """Tamsayı sütunları float64 olarak oku (eksik değer içerebilirler)"""
+    return {
+        col: 'float64' if pd.api.types.is_integer_dtype(dtype) else dtype
+        for col, dtype in schema.items()
+    }
+
+
+def read_csv_typed(input_path: str, schema: dict) -> pd.DataFrame:
+    """CSV'yi dtype haritasıyla, yalnızca şemadaki sütunları okuyarak yükle"""
+    kwargs = {'usecols': list(schema), 'dtype': schema}
+    if HAS_PYARROW:
+        kwargs['engine'] = 'pyarrow'
+    try:
+        return pd.read_csv(input_path, **kwargs)
+    except (ValueError, TypeError) as e:
+        # Örnekte tamsayı görünen bir sütunda daha sonra eksik değer olabilir
+        print(f"  ⚠ Tipli okuma başarısız ({e}); tamsayı sütunlar float64 olarak okunuyor")
+        kwargs['dtype'] = relaxed_schema(schema)
+        return pd.read_csv(input_path, **kwargs)
+
+
+def load_table(
+    input_path: str,
+    schema_path: str = None,
+    cache_dir: str = None,
+    use_cache: bool = True
+) -> pd.DataFrame:
+    """
+    Eğitim tablosunu tipli olarak yükle
+
+    Args:
+        input_path: CSV, Parquet veya Feather dosyası
+        schema_path: İsteğe bağlı şema (JSON); verilmezse örnekten çıkarılır
+        cache_dir: Feather önbellek dizini (varsayılan: girdinin yanında .ingest_cache/)
+        use_cache: False ise önbellek okunmaz ve yazılmaz
+    """
+    start = time.perf_counter()
+    extension = os.path.splitext(input_path)[1].lower()
+    schema = load_schema(schema_path) if schema_path else None
+    columns = list(schema) if schema else None
+
+    if extension in ('.parquet', '.pq'):
+        df = pd.read_parquet(input_path, columns=columns)
+        source = 'parquet'
+    elif extension in ('.feather', '.arrow', '.ipc'):
+        df = pd.read_feather(input_path, columns=columns)
+        source = 'feather'
+    else:
+        if schema is None:
+            schema = infer_schema(input_path)
+
+        cache_path = None
+        if use_cache and HAS_PYARROW:
+            cache_dir = cache_dir or os.path.join(
+                os.path.dirname(os.path.abspath(input_path)), '.ingest_cache'
+            )
+            cache_path = cache_path_for(input_path, schema, cache_dir)
+
+        if cache_path and os.path.exists(cache_path):
+            df = pd.read_feather(cache_path)
+            source = f'önbellek ({cache_path})'
+        else:
+            df = read_csv_typed(input_path, schema)
+            source = 'csv (pyarrow)' if HAS_PYARROW else 'csv'
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = cache_path + '.tmp'
+                df.to_feather(tmp_path)
+                os.replace(tmp_path, cache_path)
+                source += f', önbelleğe yazıldı ({cache_path})'
+
+    elapsed = time.perf_counter() - start
+    memory_mb = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"✓ {len(df)} satır, {len(df.columns)} sütun yüklendi")
+    print(f"  - Kaynak: {source}")
+    print(f"  - Okuma süresi: {elapsed:.2f} sn, bellek: {memory_mb:,.1f} MB")
+    return df
+
+
+def iter_table_chunks(input_path: str, chunk_rows: int, schema_path: str = None):
+    """
+    Eğitim tablosunu load_table ile aynı tiplerle en fazla chunk_rows satırlık
+    DataFrame parçaları olarak oku
+
+    CSV'de tamsayı sütunlar float64 okunur: bir sonraki parçada eksik değer
+    çıkarsa okuma yarıda kesilmez. Parquet/Feather dosyalarında kayıt grupları
+    tek tek açılır (pyarrow gerekir).
+    """
+    extension = os.path.splitext(input_path)[1].lower()
+    schema = load_schema(schema_path) if schema_path else None
+    columns = list(schema) if schema else None
+
+    if extension in ('.parquet', '.pq', '.feather', '.arrow', '.ipc'):
+        if not HAS_PYARROW:
+            raise ImportError("Parquet/Feather parça okuma için pyarrow gerekli: pip install pyarrow")
+        if extension in ('.parquet', '.pq'):
+            for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_rows,
+                                                                 columns=columns):
+                yield batch.to_pandas()
+            return
+        with pa.memory_map(input_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(offset, chunk_rows).to_pandas()
+        return
+
+    schema = relaxed_schema(schema or infer_schema(input_path))
+    yield from pd.read_csv(input_path, usecols=list(schema), dtype=schema, chunksize=chunk_rows)
@@ -7,6 +7,8 @@ ve tüm performans metriklerini hesaplar.
 
 Kullanım:
     python evaluate_model.py
+    python evaluate_model.py --jit-compile --unroll   # XLA + açılmış GRU ile tahmin
+    python evaluate_model.py --intra-op-threads 8 --inter-op-threads 2 --cpu-affinity 0-7
 
 Çıktı:
     - ROC-AUC, PR-AUC
@@ -15,6 +17,12 @@ Kullanım:
     - Detaylı performans raporu
 """
 
+import cpu_config
+
+if __name__ == '__main__':
+    # Thread ayarları TensorFlow ve OpenMP/MKL yüklenmeden uygulanmalı
+    cpu_config.apply_from_argv()
+
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
@@ -27,8 +35,16 @@ from sklearn.metrics import (
     roc_curve
 )
 import matplotlib.pyplot as plt
+import argparse
 import os
 
+import model_runtime
+
+from sequence_store import (
+    FORMAT_INDEX, FORMAT_SHARDS, load_dataset_info, load_shard_labels, load_split,
+    predict_in_batches, predict_shards
+)
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -45,21 +61,34 @@ OUTPUT_DIR = 'evaluation_results'
 def load_test_data():
     """Test verisini yükle"""
     print("📂 Test verisi yükleniyor...")
-    X_test = np.load(TEST_DATA_PATH)
-    y_test = np.load(TEST_LABELS_PATH)
-    
-    print(f"   ✓ X_test shape: {X_test.shape}")
+    data_dir = os.path.dirname(TEST_DATA_PATH)
+    info = load_dataset_info(data_dir)
+    if info['format'] == FORMAT_SHARDS:
+        # Shard formatı: shard'lar tahmin sırasında tek tek okunur
+        y_test = load_shard_labels(data_dir, 'test')
+        X_test = None
+        x_shape = (len(y_test), info['window_size'], info['n_features'])
+    elif info['format'] == FORMAT_INDEX or info.get('compression'):
+        # Index / sıkıştırılmış format: pencereler tahmin sırasında batch batch toplanır/açılır
+        X_test, y_test = load_split(data_dir, 'test', mmap_mode='r')
+        x_shape = X_test.shape
+    else:
+        X_test = np.load(TEST_DATA_PATH, mmap_mode='r')
+        y_test = np.load(TEST_LABELS_PATH)
+        x_shape = X_test.shape
+    
+    print(f"   ✓ X_test shape: {x_shape}")
     print(f"   ✓ y_test shape: {y_test.shape}")
     print(f"   ✓ Sepsis cases: {y_test.sum():.0f} ({y_test.mean()*100:.2f}%)")
     print(f"   ✓ Normal cases: {(1-y_test).sum():.0f} ({(1-y_test.mean())*100:.2f}%)")
     
     return X_test, y_test
 
-def load_model():
-    """Eğitilmiş modeli yükle"""
+def load_model(jit_compile=False, unroll=False):
+    """Eğitilmiş modeli yükle (isteğe bağlı XLA / açılmış GRU)"""
     print(f"\n🤖 Model yükleniyor: {MODEL_PATH}")
-    model = keras.models.load_model(MODEL_PATH)
-    print("   ✓ Model başarıyla yüklendi")
+    model = model_runtime.load_model(MODEL_PATH, jit_compile=jit_compile, unroll=unroll)
+    print(f"   ✓ Model başarıyla yüklendi ({model_runtime.describe(jit_compile, unroll)})")
     
     # Model özeti
     print("\n📊 Model Mimarisi:")
@@ -252,9 +281,19 @@ def save_metrics_to_file(metrics, threshold, output_dir):
 
 def main():
     """Ana evaluation fonksiyonu"""
+    parser = argparse.ArgumentParser(description='GRU v23 modelini test setinde değerlendir')
+    parser.add_argument('--jit-compile', action='store_true',
+                        help='Tahmin adımını XLA ile derle')
+    parser.add_argument('--unroll', action='store_true',
+                        help='GRU döngüsünü açarak tahmin yap')
+    cpu_config.add_arguments(parser)
+    args = parser.parse_args()
+    cpu_settings = cpu_config.apply(cpu_config.resolve(args))
+    
     print("\n" + "="*70)
     print("GRU v23 MODEL EVALUATION - STARTING")
     print("="*70)
+    print(f"CPU: {cpu_config.describe(cpu_settings)}")
     
     # Output directory oluştur
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -263,11 +302,15 @@ def main():
     X_test, y_test = load_test_data()
     
     # 2. Modeli yükle
-    model = load_model()
+    model = load_model(jit_compile=args.jit_compile, unroll=args.unroll)
     
     # 3. Tahmin yap
     print("\nTahminler yapiliyor...")
-    y_pred_proba = model.predict(X_test, batch_size=1024, verbose=1)
+    # Veri memmap/index olarak açıldığı için batch batch okunur
+    if X_test is None:
+        y_pred_proba = predict_shards(model, os.path.dirname(TEST_DATA_PATH), 'test', batch_size=1024)
+    else:
+        y_pred_proba = predict_in_batches(model, X_test, batch_size=1024)
     y_pred_proba = y_pred_proba.flatten()
     
     print(f"   Tahminler tamamlandi: {len(y_pred_proba)} ornek")
@@ -0,0 +1,61 @@
+"""
+Sepsis Tahmin Sistemi - Dosya Yardımcıları
+==========================================
+
+Checkpoint, önbellek ve batch çalıştırma modüllerinin ortak kullandığı
+küçük dosya yardımcıları.
+
+- write_json_atomic: JSON'u geçici dosyaya yazıp fsync ve os.replace ile
+  atomik olarak yerine koyar; süreç yazım sırasında öldürülse bile eski
+  dosya bozulmadan kalır.
+- file_sha256: dosya (veya dosya / dizin listesi) içeriğinin SHA-256 özeti.
+"""
+
+import hashlib
+import json
+import os
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def write_json_atomic(path: str, data: dict):
+    """JSON dosyasını geçici dosya + os.replace ile atomik ve kalıcı olarak yaz"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _update_with_file(digest, path: str):
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+
+def file_sha256(paths) -> str:
+    """
+    SHA-256 özeti
+
+    Tek bir dosya yolu için dosya içeriğinin hash'i. Liste verilirse tüm
+    dosyaların (dizinler için içerdikleri tüm dosyaların, göreli yollarıyla
+    birlikte) ortak özeti.
+    """
+    digest = hashlib.sha256()
+    if isinstance(paths, (str, os.PathLike)) and not os.path.isdir(paths):
+        _update_with_file(digest, paths)
+        return digest.hexdigest()
+
+    for path in [paths] if isinstance(paths, (str, os.PathLike)) else paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path) for name in names
+            )
+        else:
+            files = [path]
+        for file_path in files:
+            digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+            _update_with_file(digest, file_path)
+    return digest.hexdigest()
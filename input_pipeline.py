@@ -0,0 +1,189 @@
+"""
+Sepsis Tahmin Sistemi - tf.data Girdi Pipeline'ları
+===================================================
+
+prepare_sequence_dataset_v23.py çıktılarını tf.data ile okur.
+
+shard_dataset (--format shards):
+
+- Eğitim: shard listesi her epoch karıştırılır, cycle_length shard paralel
+  olarak okunup satır satır iç içe geçirilir (interleave), ardından
+  shuffle_buffer boyutunda karıştırılır. Bellekte aynı anda yalnızca
+  cycle_length shard bulunur. Karıştırma tohumu (seed, epoch) ile
+  belirlenir; interleave paralel okur ama sırayı korur, böylece bir
+  epoch'un satır sırası yalnızca tohuma bağlıdır.
+- Validation/test: shard'lar paralel okunur ancak sıra korunur; tahminler
+  load_shard_labels ile aynı sırada döner.
+
+window_dataset (windows / index / sıkıştırılmış, train_gru_v23.py --input-pipeline tfdata):
+- Veri seti belleğe alınmaz; pipeline yalnızca pencere indeksleri üzerinde
+  çalışır. Eğitimde her epoch tüm indekslerin yeni bir permütasyonu
+  batch'lere bölünür, pencereler paralel map ile (memmap / WindowDataset /
+  CompressedArray üzerinden) toplanır ve prefetch(AUTOTUNE) ile model
+  hesaplarken sonraki batch'ler hazırlanır. Permütasyon (seed, epoch) ile
+  belirlenir (WindowBatchSequence ile aynı).
+- Pencereler hasta sırasıyla saklandığından sınırlı bir karıştırma tamponu
+  yalnızca kayan bir bant içinde karıştırır; bu yüzden indeksler tamponla
+  değil tam permütasyonla karıştırılır (n int64 indeks bellekte tutulur).
+- cache=True: toplanan batch'ler ilk geçişten sonra bellekte tutulur
+  (validation için; her epoch yeniden okunmaz).
+
+Eğitim pipeline'ları initial_epoch'tan saymaya başlar: checkpoint'ten devam
+eden eğitim (--resume) kesintisiz bir eğitimle aynı epoch tohumlarını
+kullanır, ilk epoch'un sırasını yeniden oynatmaz.
+"""
+
+import numpy as np
+import tensorflow as tf
+
+from sequence_store import load_dataset_info, shard_paths
+
+
+def _epoch_rngs(seed: int, initial_epoch: int):
+    """
+    Her çağrıda bir sonraki epoch'un (seed, epoch) RNG'sini döndüren fonksiyon
+
+    tf.data generator'ları her yeni iterasyonda (Keras'ta her epoch) yeniden
+    çağrılır; sayaç initial_epoch'tan başlar.
+    """
+    epoch = [initial_epoch]
+
+    def next_rng():
+        rng = np.random.default_rng([seed, epoch[0]])
+        epoch[0] += 1
+        return rng
+
+    return next_rng
+
+
+def _load_shard(path):
+    """NPZ shard'ını (X, y) olarak oku (tf.numpy_function içinden çağrılır)"""
+    with np.load(path.decode() if isinstance(path, bytes) else path) as shard:
+        return shard['X'], shard['y'].astype(np.float32)
+
+
+def shard_dataset(
+    data_dir: str,
+    split: str,
+    batch_size: int = 512,
+    shuffle: bool = False,
+    shuffle_buffer: int = 10_000,
+    cycle_length: int = 4,
+    seed: int = 42,
+    cache: bool = False,
+    initial_epoch: int = 0
+) -> tf.data.Dataset:
+    """
+    Bir split'in shard'larından (X, y) batch'leri üreten tf.data pipeline'ı
+
+    Args:
+        data_dir: prepare_sequence_dataset_v23.py çıktı dizini
+        split: 'train', 'val' veya 'test'
+        batch_size: Batch boyutu
+        shuffle: Eğitim için shard ve satır karıştırma
+        shuffle_buffer: Satır karıştırma tampon boyutu
+        cycle_length: Aynı anda okunan shard sayısı
+        seed: Karıştırma tohumu (her epoch için (seed, epoch) kullanılır)
+        cache: Batch'leri ilk geçişten sonra bellekte tut (validation için)
+        initial_epoch: İlk iterasyonun epoch numarası (checkpoint'ten devam)
+    """
+    info = load_dataset_info(data_dir)
+    paths = shard_paths(data_dir, split)
+    feature_dtype = tf.as_dtype(info['feature_dtype'])
+    window_shape = (info['window_size'], info['n_features'])
+
+    def load(path):
+        X, y = tf.numpy_function(_load_shard, [path], [feature_dtype, tf.float32])
+        X.set_shape((None,) + window_shape)
+        y.set_shape((None,))
+        return X, y
+
+    files = tf.data.Dataset.from_tensor_slices(paths)
+    if shuffle:
+        next_rng = _epoch_rngs(seed, initial_epoch)
+
+        def epoch_seeds():
+            # Shard sırası ve satır tamponu için epoch'a özgü tohumlar
+            yield next_rng().integers(2**31, size=2)
+
+        def epoch_rows(seeds):
+            shuffled = files.shuffle(len(paths), seed=seeds[0])
+            rows = shuffled.interleave(
+                lambda path: tf.data.Dataset.from_tensor_slices(load(path)),
+                cycle_length=cycle_length,
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=True
+            )
+            return rows.shuffle(shuffle_buffer, seed=seeds[1])
+
+        dataset = tf.data.Dataset.from_generator(
+            epoch_seeds, output_signature=tf.TensorSpec((2,), tf.int64)
+        ).flat_map(epoch_rows)
+    else:
+        # Paralel okuma, sıra korunur
+        dataset = files.map(
+            load, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True
+        ).unbatch()
+
+    dataset = dataset.batch(batch_size)
+    if cache:
+        dataset = dataset.cache()
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def window_dataset(
+    X,
+    y: np.ndarray,
+    batch_size: int = 512,
+    shuffle: bool = False,
+    seed: int = 42,
+    cache: bool = False,
+    initial_epoch: int = 0
+) -> tf.data.Dataset:
+    """
+    Bellekte tutulmayan bir split'ten (X, y) batch'leri üreten tf.data pipeline'ı
+
+    Args:
+        X: np.memmap, WindowDataset veya CompressedArray (batch indeksleme destekli)
+        y: Etiketler
+        batch_size: Batch boyutu
+        shuffle: Eğitim için tüm indekslerin karıştırılması (her epoch yeni permütasyon)
+        seed: Karıştırma tohumu (her epoch için (seed, epoch) kullanılır)
+        cache: Batch'leri ilk geçişten sonra bellekte tut (validation için)
+        initial_epoch: İlk iterasyonun epoch numarası (checkpoint'ten devam)
+    """
+    y = np.asarray(y, dtype=np.float32)
+    window_shape = tuple(X.shape[1:])
+    feature_dtype = tf.as_dtype(X.dtype)
+
+    def gather(ids):
+        # Sıralı indeksler memmap/sıkıştırılmış parçalardan daha verimli okunur
+        ids = np.sort(ids)
+        return np.asarray(X[ids]), y[ids]
+
+    def load(ids):
+        X_batch, y_batch = tf.numpy_function(gather, [ids], [feature_dtype, tf.float32])
+        X_batch.set_shape((None,) + window_shape)
+        y_batch.set_shape((None,))
+        return X_batch, y_batch
+
+    if shuffle:
+        next_rng = _epoch_rngs(seed, initial_epoch)
+
+        def epoch_batches():
+            # Generator her epoch yeniden çağrılır: tüm veri üzerinde yeni permütasyon
+            order = next_rng().permutation(len(y))
+            for start in range(0, len(order), batch_size):
+                yield order[start:start + batch_size]
+
+        dataset = tf.data.Dataset.from_generator(
+            epoch_batches, output_signature=tf.TensorSpec((None,), tf.int64)
+        )
+    else:
+        dataset = tf.data.Dataset.range(len(y)).batch(batch_size)
+    dataset = dataset.map(
+        load, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle
+    )
+    if cache:
+        dataset = dataset.cache()
+    return dataset.prefetch(tf.data.AUTOTUNE)
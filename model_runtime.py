@@ -0,0 +1,64 @@
+"""
+Sepsis Tahmin Sistemi - Model Çalıştırma Seçenekleri
+====================================================
+
+Eğitilmiş GRU modelini yükleme ve CPU'da adım başına ek yükü azaltma
+seçenekleri (train_gru_v23.py, evaluate_model.py, run_gru_on_csv_v23.py, app.py).
+
+- jit_compile: train/predict fonksiyonları XLA ile tek bir çekirdek grafiği
+  olarak derlenir; küçük GRU'da op başına dağıtım (dispatch) yükü ortadan
+  kalkar. İlk çağrı ve her yeni batch şekli bir kez derleme maliyeti öder.
+- unroll: GRU döngüsü sabit ve kısa pencere (6 adım) için açılır; while
+  döngüsü yerine düz op dizisi çalışır. Kayıtlı modeller için katman
+  yapılandırması unroll=True ile yeniden kurulur ve ağırlıklar kopyalanır.
+
+Ölçüm için bkz. scripts/benchmark_compile.py.
+"""
+
+from tensorflow import keras
+
+
+def unrolled_copy(model: keras.Model) -> keras.Model:
+    """GRU/RNN katmanları unroll=True olan, aynı ağırlıklara sahip model kopyası"""
+    config = model.get_config()
+    changed = False
+    for layer_config in config['layers']:
+        if 'unroll' in layer_config.get('config', {}) and not layer_config['config']['unroll']:
+            layer_config['config']['unroll'] = True
+            changed = True
+    if not changed:
+        return model
+
+    unrolled = model.__class__.from_config(config)
+    unrolled.set_weights(model.get_weights())
+    return unrolled
+
+
+def prepare_inference_model(model: keras.Model, jit_compile: bool = False,
+                            unroll: bool = False) -> keras.Model:
+    """
+    Yüklenmiş modeli tahmin için hazırla
+
+    Args:
+        model: Keras modeli
+        jit_compile: predict fonksiyonunu XLA ile derle
+        unroll: GRU döngüsünü aç (model yeniden kurulur, derleme bilgisi düşer)
+    """
+    if unroll:
+        model = unrolled_copy(model)
+    if jit_compile:
+        # predict_function bir sonraki çağrıda jit_compile=True ile yeniden oluşturulur
+        model.jit_compile = True
+    return model
+
+
+def load_model(path: str, jit_compile: bool = False, unroll: bool = False) -> keras.Model:
+    """Kayıtlı modeli yükle ve prepare_inference_model seçeneklerini uygula"""
+    model = keras.models.load_model(path)
+    return prepare_inference_model(model, jit_compile=jit_compile, unroll=unroll)
+
+
+def describe(jit_compile: bool, unroll: bool) -> str:
+    """Çalıştırma yapılandırmasının kısa adı (rapor ve log için)"""
+    parts = [name for name, enabled in [('xla', jit_compile), ('unroll', unroll)] if enabled]
+    return '+'.join(parts) or 'default'
@@ -5,38 +5,75 @@ Sepsis Tahmin Sistemi - Veri Hazırlama Pipeline'ı (v23)
 Bu script, ham ICU verilerini GRU modeli için uygun sekans formatına dönüştürür.
 
 Özellikler:
+- Tipli, sütun budamalı ve önbellekli girdi okuma (bkz. data_ingest.py)
 - Eksik değer doldurma (SimpleImputer)
 - Özellik ölçeklendirme (StandardScaler)
+- İsteğe bağlı out-of-core (parça parça) imputer/scaler eğitimi
+- Yapılandırılabilir özellik tipi (varsayılan float32, --dtype)
 - Kategorik değişken kodlama (OneHotEncoder)
 - Hasta bazlı 6 saatlik kayan pencere oluşturma
-- Train/Validation/Test bölümlemesi
+- Train/Validation/Test bölümlemesi (pencere veya hasta bazında)
+- Artımlı ekleme (--append): yeni hastalar kaydedilmiş preprocessing
+  nesneleriyle dönüştürülüp mevcut veri setine eklenir
+- Tek çalıştırmada birden fazla pencere boyutu (--window 4 6 8 12); tüm
+  boyutlar aynı dönüştürülmüş matrisi ve aynı hasta bölmesini paylaşır
+- İçerik hash'li aşama önbelleği (bkz. stage_cache.py, --no-cache)
+- İki çıktı formatı: windows (X_*.npy) veya index (features.npy + pencere
+  indeksleri, bkz. sequence_store.py)
+- windows formatında memmap üzerinden parça parça yazım (sınırlı bellek)
+- İsteğe bağlı parçalı sıkıştırılmış depolama (--compress, bkz. compressed_store.py)
+- shards formatı: paralel okunabilen, boyutu sınırlı NPZ shard'ları
 
 Kullanım:
     python prepare_sequence_dataset_v23.py --input data/train.csv --output data/processed/
+    python prepare_sequence_dataset_v23.py --input data/train.csv --output data/processed/ --format index
+    python prepare_sequence_dataset_v23.py --input data/train.csv --output data/processed/ --window 4 6 8 12
+    python prepare_sequence_dataset_v23.py --input data/new_month.csv --output data/processed/ --append
 """
 
 import numpy as np
 import pandas as pd
 import pickle
+import json
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.model_selection import train_test_split
 import argparse
+import hashlib
 import os
+from contextlib import nullcontext
+from datetime import datetime
+from functools import cached_property
 from typing import Tuple
 
+from sequence_store import (
+    DATASET_INFO_FILE, FORMAT_INDEX, FORMAT_SHARDS, FORMAT_WINDOWS, FEATURES_FILE,
+    PATIENTS_FILE, SHARDS_MANIFEST_FILE, append_npy, append_windows, gather_windows,
+    index_dtype, load_dataset_info, load_patient_ids, load_shard_manifest,
+    save_dataset_info, save_index_split, write_shards, write_windows
+)
+from resource_monitor import StageProfiler, peak_rss_mb, format_mb
+from streaming_stats import QuantileSketch, RunningMoments
+from data_ingest import REQUIRED_COLUMNS, iter_table_chunks, load_schema, load_table
+from stage_cache import StageCache, code_version
+from compressed_store import (
+    CODECS, COMPRESSED_SUFFIX, DEFAULT_LEVELS, available_codecs, write_compressed_windows
+)
+
 
 class SepsisDataPreprocessor:
     """Sepsis verilerini önişleme ve sekans oluşturma sınıfı"""
     
-    def __init__(self, window_size: int = 6, step_size: int = 1):
+    def __init__(self, window_size: int = 6, step_size: int = 1, dtype: str = 'float32'):
         """
         Args:
             window_size: Geri bakış penceresi (saat cinsinden)
             step_size: Pencere kayma adımı
+            dtype: Çıktı özellik tipi (float32, float16 veya float64)
         """
         self.window_size = window_size
         self.step_size = step_size
+        self.dtype = np.dtype(dtype)
         self.imputer = None
         self.scaler = None
         self.ohe = None
@@ -71,7 +108,16 @@ class SepsisDataPreprocessor:
         df = df.drop_duplicates(subset=['Patient_ID', 'ICULOS'])
         print(f"  - {original_len - len(df)} mükerrer kayıt kaldırıldı")
         
-        # Fizyolojik olarak geçersiz değerleri temizle
+        df = self.mask_invalid_values(df)
+            
+        # Hasta ID ve zamana göre sırala
+        df = df.sort_values(['Patient_ID', 'ICULOS']).reset_index(drop=True)
+        print(f"  - Toplam {len(df)} kayıt işlenecek")
+        
+        return df
+    
+    def mask_invalid_values(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fizyolojik olarak geçersiz değerleri NaN yap"""
         if 'HR' in df.columns:
             df.loc[(df['HR'] < 0) | (df['HR'] > 300), 'HR'] = np.nan
         if 'MAP' in df.columns:
@@ -80,11 +126,6 @@ class SepsisDataPreprocessor:
             df.loc[(df['Temp'] < 25) | (df['Temp'] > 45), 'Temp'] = np.nan
         if 'O2Sat' in df.columns:
             df.loc[(df['O2Sat'] < 0) | (df['O2Sat'] > 100), 'O2Sat'] = np.nan
-            
-        # Hasta ID ve zamana göre sırala
-        df = df.sort_values(['Patient_ID', 'ICULOS']).reset_index(drop=True)
-        print(f"  - Toplam {len(df)} kayıt işlenecek")
-        
         return df
     
     def fit_preprocessing(self, df: pd.DataFrame):
@@ -107,65 +148,203 @@ class SepsisDataPreprocessor:
             self.ohe = OneHotEncoder(handle_unknown='ignore', sparse=False)
             self.ohe.fit(df[self.categorical_columns])
             print(f"  ✓ OneHotEncoder eğitildi ({len(self.ohe.get_feature_names_out())} özellik)")
+    
+    def fit_preprocessing_streaming(
+        self,
+        input_path: str,
+        chunk_rows: int = 100_000,
+        quantile_eps: float = 0.001,
+        schema_path: str = None
+    ):
+        """
+        Preprocessing nesnelerini girdiyi parça parça okuyarak eğit (out-of-core)
+        
+        Girdi data_ingest.iter_table_chunks ile load_table ile aynı tiplerle
+        okunur (CSV, Parquet, Feather; --schema). Medyanlar sütun başına bir
+        QuantileSketch ile (rank hatası <= eps), ortalama/varyans gözlenen
+        değerler üzerinden RunningMoments ile hesaplanır; eksik değerlerin
+        medyanla doldurulmasının etkisi kapalı formda eklenir. Sonuç
+        fit_preprocessing ile aynı tipte SimpleImputer/StandardScaler/
+        OneHotEncoder nesneleridir.
+        
+        Mükerrer (Patient_ID, ICULOS) kayıtlar parça içinde ve parça sınırında
+        (önceki parçanın son anahtarı) ayıklanır; (Patient_ID, ICULOS) sıralı
+        girdide sonuç clean_data ile aynıdır. Sırasız girdide farklı parçalara
+        düşen ve sınırda bitişik olmayan mükerrerler ayıklanmaz, fit'e iki kez
+        girer.
+        """
+        print("\n[2/5] Preprocessing Nesnelerini Eğitiyor (streaming)...")
+        
+        moments = None
+        sketches = None
+        categories = {}
+        n_rows = 0
+        last_key = None
+        
+        for chunk in iter_table_chunks(input_path, chunk_rows, schema_path=schema_path):
+            if moments is None:
+                missing_cols = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+                if missing_cols:
+                    raise ValueError(f"Eksik sütunlar: {missing_cols}")
+                if self.numerical_columns is None:
+                    self.identify_columns(chunk)
+                moments = RunningMoments(len(self.numerical_columns))
+                sketches = [QuantileSketch(quantile_eps) for _ in self.numerical_columns]
+            
+            chunk = chunk.drop_duplicates(subset=['Patient_ID', 'ICULOS'])
+            if last_key is not None:
+                # Parça sınırını aşan mükerrer: önceki parçanın son kaydıyla aynı anahtar
+                chunk = chunk[~((chunk['Patient_ID'] == last_key[0])
+                                & (chunk['ICULOS'] == last_key[1]))]
+                if len(chunk) == 0:
+                    continue
+            last_key = (chunk['Patient_ID'].iloc[-1], chunk['ICULOS'].iloc[-1])
+            chunk = self.mask_invalid_values(chunk.copy())
+            X = chunk[self.numerical_columns].to_numpy(dtype=np.float64)
+            moments.update(X)
+            for j, sketch in enumerate(sketches):
+                sketch.update(X[:, j])
+            for col in self.categorical_columns:
+                categories.setdefault(col, set()).update(chunk[col].dropna().unique())
+            
+            n_rows += len(chunk)
+            print(f"    İşlenen: {n_rows:,} satır", end='\r')
+        print()
+        
+        # Eksik değer doldurma: yaklaşık medyanlar
+        medians = np.array([sketch.quantile(0.5) for sketch in sketches])
+        medians_frame = pd.DataFrame([medians], columns=self.numerical_columns)
+        self.imputer = SimpleImputer(strategy='median')
+        self.imputer.fit(medians_frame)
+        max_rank_error = max(sketch.rank_error_bound for sketch in sketches)
+        print(f"  ✓ SimpleImputer eğitildi (medyan rank hatası <= {100*max_rank_error:.3f}%)")
+        
+        # Ölçeklendirme: doldurulmuş verinin moment'leri
+        n, mean, var = moments.filled_moments(medians)
+        observed = moments.count > 0
+        scale = np.sqrt(var[observed])
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        self.scaler = StandardScaler()
+        self.scaler.fit(self.imputer.transform(medians_frame))
+        self.scaler.mean_ = mean[observed]
+        self.scaler.var_ = var[observed]
+        self.scaler.scale_ = scale
+        self.scaler.n_samples_seen_ = int(n_rows)
+        print(f"  ✓ StandardScaler eğitildi ({n_rows:,} satır)")
+        
+        # Kategorik kodlama
+        if self.categorical_columns:
+            values = {col: sorted(categories.get(col, [])) for col in self.categorical_columns}
+            n_max = max(len(v) for v in values.values())
+            categories_frame = pd.DataFrame({
+                col: v + v[:1] * (n_max - len(v)) for col, v in values.items()
+            })
+            self.ohe = OneHotEncoder(handle_unknown='ignore', sparse=False)
+            self.ohe.fit(categories_frame)
+            print(f"  ✓ OneHotEncoder eğitildi ({len(self.ohe.get_feature_names_out())} özellik)")
         
     def transform_features(self, df: pd.DataFrame) -> np.ndarray:
         """Özellikleri dönüştür"""
-        # Sayısal özellikleri dönüştür
-        X_numerical = self.imputer.transform(df[self.numerical_columns])
+        # float16 yalnızca depolama tipi; hesaplama en az float32 ile yapılır
+        compute_dtype = np.float64 if self.dtype == np.float64 else np.float32
+        
+        # Sayısal özellikleri dönüştür (sklearn float32 girdide float32 döndürür)
+        X_numerical = self.imputer.transform(df[self.numerical_columns].astype(compute_dtype))
         X_numerical = self.scaler.transform(X_numerical)
         
         # Kategorik özellikleri dönüştür
         if self.categorical_columns and self.ohe is not None:
-            X_categorical = self.ohe.transform(df[self.categorical_columns])
+            X_categorical = self.ohe.transform(df[self.categorical_columns]).astype(compute_dtype)
             X_combined = np.hstack([X_numerical, X_categorical])
         else:
             X_combined = X_numerical
             
-        return X_combined
+        # Satır sıralı (C) çıktı: pencere toplama ve .npy'ye ekleme satır bazında
+        return np.ascontiguousarray(X_combined, dtype=self.dtype)
     
-    def create_sequences(
-        self, 
-        df: pd.DataFrame, 
+    def window_starts(self, patient_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tüm geçerli pencerelerin başlangıç satırlarını tek seferde hesapla
+
+        Hastalar ilk görülme sırasına göre gruplanır (kararlı sıralama), her
+        hastanın satırları kendi içindeki sırasını korur. Bir hasta için
+        pencere başlangıçları 0, step, 2*step, ... şeklinde ilerler.
+
+        Returns:
+            order: Satırları hasta bazında gruplayan sıralama (veri zaten
+                gruplu ise None)
+            starts: Gruplanmış satır uzayında pencere başlangıç indeksleri
+        """
+        codes, _ = pd.factorize(patient_ids)
+        n_rows = len(codes)
+
+        order = np.argsort(codes, kind='stable')
+        if np.array_equal(order, np.arange(n_rows)):
+            order = None
+            sorted_codes = codes
+        else:
+            sorted_codes = codes[order]
+
+        # Hasta sınırları
+        group_starts = np.flatnonzero(np.diff(sorted_codes, prepend=sorted_codes[:1] - 1))
+        group_lengths = np.diff(np.append(group_starts, n_rows))
+
+        # Hasta başına pencere sayısı (eksik Patient_ID'li satırlar hariç)
+        n_windows = np.maximum(0, (group_lengths - self.window_size) // self.step_size + 1)
+        n_windows[sorted_codes[group_starts] < 0] = 0
+
+        # Her pencerenin başlangıcı: hasta başlangıcı + adım * hasta içi pencere sırası
+        window_offsets = np.repeat(np.cumsum(n_windows) - n_windows, n_windows)
+        starts = (
+            np.repeat(group_starts, n_windows)
+            + (np.arange(n_windows.sum()) - window_offsets) * self.step_size
+        )
+
+        return order, starts
+
+    def create_window_index(
+        self,
+        df: pd.DataFrame,
         X_transformed: np.ndarray
-    ) -> Tuple[np.ndarray, np.ndarray]:
-        """Hasta bazlı kayan pencereler oluştur"""
-        print("\n[3/5] Sekans Pencereleri Oluşturuluyor...")
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pencereleri kopyalamadan indeksle
+
+        Returns:
+            X_grouped: Hasta bazında gruplanmış (satır, F) özellik matrisi
+            ends: Her pencerenin X_grouped içindeki son satırı
+            labels: Pencere etiketleri (pencere sonundaki değer)
+            patients: Her pencerenin Patient_ID değeri
+        """
+        print(f"\n[3/5] Sekans Pencereleri Oluşturuluyor (pencere: {self.window_size})...")
         
-        sequences = []
-        labels = []
-        patient_ids = df['Patient_ID'].unique()
+        patient_ids = df['Patient_ID'].to_numpy()
+        print(f"  - {df['Patient_ID'].nunique()} hasta işlenecek")
         
-        print(f"  - {len(patient_ids)} hasta işlenecek")
+        order, starts = self.window_starts(patient_ids)
+        X_grouped = X_transformed if order is None else X_transformed[order]
+        y_grouped = df['SepsisLabel'].to_numpy()
+        if order is not None:
+            y_grouped = y_grouped[order]
+            patient_ids = patient_ids[order]
         
-        for i, patient_id in enumerate(patient_ids):
-            if (i + 1) % 1000 == 0:
-                print(f"    İşlenen: {i+1}/{len(patient_ids)} hasta", end='\r')
-            
-            # Hasta verilerini al
-            patient_mask = df['Patient_ID'] == patient_id
-            patient_indices = np.where(patient_mask)[0]
-            patient_X = X_transformed[patient_mask]
-            patient_y = df.loc[patient_mask, 'SepsisLabel'].values
-            
-            # Kayan pencereler oluştur
-            for start_idx in range(0, len(patient_X) - self.window_size + 1, self.step_size):
-                end_idx = start_idx + self.window_size
-                
-                # 6 saatlik pencere
-                sequence = patient_X[start_idx:end_idx]
-                
-                # Etiket: pencere sonundaki değer
-                label = patient_y[end_idx - 1]
-                
-                sequences.append(sequence)
-                labels.append(label)
+        ends = (starts + self.window_size - 1).astype(index_dtype(len(X_grouped)))
+        labels = y_grouped[ends]
         
-        X_seq = np.array(sequences)
-        y_seq = np.array(labels)
+        print(f"  ✓ {len(ends)} sekans oluşturuldu")
+        print(f"  ✓ Pozitif örnekler: {labels.sum()} ({100*labels.mean():.2f}%)")
         
-        print(f"\n  ✓ {len(sequences)} sekans oluşturuldu")
+        return X_grouped, ends, labels, patient_ids[ends]
+    
+    def create_sequences(
+        self, 
+        df: pd.DataFrame, 
+        X_transformed: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Hasta bazlı kayan pencereler oluştur"""
+        X_grouped, ends, y_seq, _ = self.create_window_index(df, X_transformed)
+        X_seq = gather_windows(X_grouped, ends, self.window_size)
         print(f"  ✓ Sekans şekli: {X_seq.shape}")
-        print(f"  ✓ Pozitif örnekler: {y_seq.sum()} ({100*y_seq.mean():.2f}%)")
         
         return X_seq, y_seq
     
@@ -192,6 +371,537 @@ class SepsisDataPreprocessor:
             pickle.dump(column_info, f)
         
         print(f"\n✓ Preprocessing nesneleri kaydedildi: {output_dir}")
+    
+    def load_preprocessing_objects(self, input_dir: str):
+        """Kaydedilmiş (dondurulmuş) preprocessing nesnelerini yükle"""
+        with open(os.path.join(input_dir, 'imputer.pkl'), 'rb') as f:
+            self.imputer = pickle.load(f)
+        
+        with open(os.path.join(input_dir, 'scaler.pkl'), 'rb') as f:
+            self.scaler = pickle.load(f)
+        
+        ohe_path = os.path.join(input_dir, 'ohe.pkl')
+        if os.path.exists(ohe_path):
+            with open(ohe_path, 'rb') as f:
+                self.ohe = pickle.load(f)
+        
+        with open(os.path.join(input_dir, 'column_info.pkl'), 'rb') as f:
+            column_info = pickle.load(f)
+        self.numerical_columns = column_info['numerical_columns']
+        self.categorical_columns = column_info['categorical_columns']
+        
+        print(f"✓ Preprocessing nesneleri yüklendi: {input_dir}")
+
+
+# Aşama çıktılarını etkileyen kaynak dosyalar (değişirlerse önbellek geçersiz olur)
+CACHE_CODE_FILES = [os.path.abspath(__file__)] + [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ['data_ingest.py', 'streaming_stats.py', 'sequence_store.py',
+                 'compressed_store.py']
+]
+
+
+PROFILE_STAGES = ['load', 'clean', 'fit', 'transform', 'windows', 'split', 'save']
+
+
+class PreparationStages:
+    """
+    Hazırlama aşamalarını aşama önbelleği üzerinden, yalnızca gerektiğinde çalıştır
+    
+    Zincir: girdi hash'i -> clean -> fit -> transform -> windows. Bir aşama
+    önbellekte bulunursa, ondan önceki aşamalar yalnızca başka bir aşama
+    onlara ihtiyaç duyarsa yüklenir. Hesaplanacak bir aşamanın bağımlılıkları
+    aşama profiline girmeden önce çözülür; böylece her aşamanın süre ve
+    belleği yalnızca kendi işini içerir.
+    """
+    
+    def __init__(self, args, preprocessor: SepsisDataPreprocessor, cache: StageCache,
+                 profiler: StageProfiler):
+        self.args = args
+        self.preprocessor = preprocessor
+        self.cache = cache
+        self.profiler = profiler
+        
+        input_key = cache.input_key(args.input) if cache.enabled else ''
+        schema = load_schema(args.schema) if args.schema else None
+        fit_params = {
+            'fit_chunk_rows': args.fit_chunk_rows,
+            'quantile_eps': args.quantile_eps if args.fit_chunk_rows else None
+        }
+        self.keys = {'clean': cache.key('clean', input_key, {'schema': schema})}
+        self.keys['fit'] = cache.key('fit', self.keys['clean'], fit_params)
+        self.keys['transform'] = cache.key('transform', self.keys['fit'], {'dtype': args.dtype})
+        self._windows = {}
+    
+    def _set_columns(self, numerical_columns, categorical_columns):
+        self.preprocessor.numerical_columns = numerical_columns
+        self.preprocessor.categorical_columns = categorical_columns
+    
+    @cached_property
+    def cleaned(self) -> pd.DataFrame:
+        """Yüklenmiş ve temizlenmiş veri"""
+        def compute():
+            print(f"\nVeri yükleniyor: {self.args.input}")
+            with self.profiler.stage('load'):
+                df = load_table(
+                    self.args.input,
+                    schema_path=self.args.schema,
+                    cache_dir=self.args.ingest_cache_dir,
+                    use_cache=not self.args.no_ingest_cache
+                )
+            
+            # Gerekli sütunları kontrol et
+            required_cols = ['Patient_ID', 'ICULOS', 'SepsisLabel']
+            missing_cols = [col for col in required_cols if col not in df.columns]
+            if missing_cols:
+                raise ValueError(f"Eksik sütunlar: {missing_cols}")
+            
+            # Sütunları belirle ve veriyi temizle
+            self.preprocessor.identify_columns(df)
+            df = self.preprocessor.clean_data(df)
+            return df, self.preprocessor.numerical_columns, self.preprocessor.categorical_columns
+        
+        with self.profiler.stage('clean'):
+            df, numerical_columns, categorical_columns = self.cache.run(
+                'clean', self.keys['clean'], compute
+            )
+        self._set_columns(numerical_columns, categorical_columns)
+        return df
+    
+    @cached_property
+    def fitted(self) -> tuple:
+        """Eğitilmiş imputer/scaler/ohe (preprocessor üzerine de yazılır)"""
+        def compute():
+            if self.args.fit_chunk_rows:
+                # Out-of-core: temizlenmiş verinin tamamı belleğe yüklenmez
+                self.preprocessor.fit_preprocessing_streaming(
+                    self.args.input,
+                    chunk_rows=self.args.fit_chunk_rows,
+                    quantile_eps=self.args.quantile_eps,
+                    schema_path=self.args.schema
+                )
+            else:
+                self.preprocessor.fit_preprocessing(self.cleaned)
+            p = self.preprocessor
+            return p.numerical_columns, p.categorical_columns, p.imputer, p.scaler, p.ohe
+        
+        if not self.args.fit_chunk_rows and not self.cache.has('fit', self.keys['fit']):
+            self.cleaned
+        with self.profiler.stage('fit'):
+            result = self.cache.run('fit', self.keys['fit'], compute)
+        numerical_columns, categorical_columns, imputer, scaler, ohe = result
+        self._set_columns(numerical_columns, categorical_columns)
+        self.preprocessor.imputer = imputer
+        self.preprocessor.scaler = scaler
+        self.preprocessor.ohe = ohe
+        return result
+    
+    @cached_property
+    def transformed(self) -> np.ndarray:
+        """Dönüştürülmüş (satır, F) özellik matrisi"""
+        def compute():
+            self.fitted
+            X_transformed = self.preprocessor.transform_features(self.cleaned)
+            print(f"\n  ✓ Dönüştürülmüş özellik şekli: {X_transformed.shape}")
+            return X_transformed
+        
+        if not self.cache.has('transform', self.keys['transform']):
+            self.fitted
+            self.cleaned
+        with self.profiler.stage('transform'):
+            return self.cache.run('transform', self.keys['transform'], compute)
+    
+    def windows(self, window_size: int) -> tuple:
+        """
+        Bir pencere boyutu için (X_grouped, ends, labels, patients)
+
+        X_grouped dönüştürülmüş matrisle aynıysa tekrar saklanmaz. Gruplama
+        sırası pencere boyutuna bağlı olmadığından tüm pencere boyutları aynı
+        X_grouped matrisini paylaşır.
+        """
+        if window_size in self._windows:
+            return self._windows[window_size]
+        
+        def compute():
+            X_transformed = self.transformed
+            self.preprocessor.window_size = window_size
+            X_grouped, ends, labels, patients = self.preprocessor.create_window_index(
+                self.cleaned, X_transformed
+            )
+            return (None if X_grouped is X_transformed else X_grouped), ends, labels, patients
+        
+        key = self.cache.key(
+            'windows', self.keys['transform'], {'window': window_size, 'step': self.args.step}
+        )
+        if not self.cache.has('windows', key):
+            self.transformed
+            self.cleaned
+        with self.profiler.stage('windows'):
+            X_grouped, ends, labels, patients = self.cache.run('windows', key, compute)
+        if X_grouped is None:
+            X_grouped = self.transformed
+        elif self._windows:
+            # Önceki pencere boyutunun (eşit) gruplu matrisini paylaş
+            X_grouped = next(iter(self._windows.values()))[0]
+        self.preprocessor.window_size = window_size
+        self._windows[window_size] = (X_grouped, ends, labels, patients)
+        return self._windows[window_size]
+
+
+SPLIT_BY = ['window', 'patient']
+
+
+def patient_hash(patient_ids: np.ndarray) -> np.ndarray:
+    """
+    Hasta ID'lerini [0, 1) aralığında deterministik değerlere eşle
+
+    Değer yalnızca ID'ye bağlıdır (veri sırası, pencere boyutu ve çalıştırmadan
+    bağımsız); tamsayı değerli float ID'ler (ör. 12.0) tamsayıyla aynı değeri alır.
+    """
+    codes, uniques = pd.factorize(patient_ids)
+    values = np.empty(len(uniques))
+    for i, patient_id in enumerate(uniques):
+        if isinstance(patient_id, (float, np.floating)) and float(patient_id).is_integer():
+            patient_id = int(patient_id)
+        digest = hashlib.blake2b(str(patient_id).encode('utf-8'), digest_size=8).digest()
+        values[i] = int.from_bytes(digest, 'big') / 2**64
+    return values[codes]
+
+
+def split_windows(ends: np.ndarray, labels: np.ndarray, patients: np.ndarray,
+                  split_by: str, test_size: float, val_size: float) -> dict:
+    """
+    Pencereleri train/val/test olarak ayır (yalnızca indeksler, diziler kopyalanmaz)
+
+    split_by='window': pencere bazında katmanlı rastgele bölme.
+    split_by='patient': hasta ID hash'ine göre bölme; bir hastanın tüm
+    pencereleri aynı split'e düşer ve atama pencere boyutundan bağımsızdır.
+
+    Returns:
+        {split: (ends, labels)}
+    """
+    window_ids = np.arange(len(ends))
+    
+    if split_by == 'patient':
+        u = patient_hash(patients)
+        ids_test = window_ids[u < test_size]
+        ids_val = window_ids[(u >= test_size) & (u < test_size + val_size)]
+        ids_train = window_ids[u >= test_size + val_size]
+    else:
+        # Önce test setini ayır
+        ids_temp, ids_test = train_test_split(
+            window_ids,
+            test_size=test_size,
+            stratify=labels,
+            random_state=42
+        )
+        
+        # Sonra validation setini ayır
+        val_ratio = val_size / (1 - test_size)
+        ids_train, ids_val = train_test_split(
+            ids_temp,
+            test_size=val_ratio,
+            stratify=labels[ids_temp],
+            random_state=42
+        )
+    
+    return {
+        'train': (ends[ids_train], labels[ids_train]),
+        'val': (ends[ids_val], labels[ids_val]),
+        'test': (ends[ids_test], labels[ids_test])
+    }
+
+
+def save_split_dataset(args, output_dir: str, window_size: int, X_grouped: np.ndarray,
+                       splits: dict, split_by: str, patients: np.ndarray,
+                       shared_features: str = None):
+    """
+    Bölünmüş pencereleri seçilen formatta kaydet
+
+    Args:
+        patients: Pencerelerin Patient_ID değerleri (patient_ids.npy için)
+        shared_features: index formatında output_dir'e göre paylaşılan
+            features.npy yolu; verilirse özellik matrisi tekrar yazılmaz
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    n_features = X_grouped.shape[1]
+    n_windows = sum(len(split_ends) for split_ends, _ in splits.values())
+    
+    if args.format == FORMAT_INDEX:
+        if shared_features is None:
+            np.save(os.path.join(output_dir, FEATURES_FILE), X_grouped)
+        for name, (split_ends, split_y) in splits.items():
+            save_index_split(output_dir, name, split_ends, split_y)
+        stored_bytes = X_grouped.nbytes
+    elif args.format == FORMAT_SHARDS:
+        # Her split boyutu sınırlı NPZ shard'larına bölünür
+        manifest = {'window_size': window_size, 'n_features': n_features, 'splits': {}}
+        for name, (split_ends, split_y) in splits.items():
+            entries = write_shards(
+                output_dir, name, X_grouped, split_ends, split_y, window_size,
+                shard_mb=args.shard_mb
+            )
+            manifest['splits'][name] = entries
+            print(f"  ✓ {name}: {len(entries)} shard")
+        with open(os.path.join(output_dir, SHARDS_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        stored_bytes = n_windows * window_size * n_features * X_grouped.dtype.itemsize
+    else:
+        # Pencereler memmap üzerinden (veya sıkıştırılmış parçalar halinde)
+        # parça parça yazılır; tüm split RAM'e alınmaz
+        stored_bytes = 0
+        uncompressed_bytes = 0
+        for name, (split_ends, split_y) in splits.items():
+            if args.compress != 'none':
+                raw_bytes, split_bytes = write_compressed_windows(
+                    os.path.join(output_dir, f'X_{name}{COMPRESSED_SUFFIX}'),
+                    X_grouped, split_ends, window_size,
+                    codec=args.compress,
+                    level=args.compress_level,
+                    chunk_rows=args.compress_chunk,
+                    shuffle=args.compress_shuffle
+                )
+                print(f"  ✓ X_{name}{COMPRESSED_SUFFIX}: {raw_bytes / 1024**2:,.1f} MB -> "
+                      f"{split_bytes / 1024**2:,.1f} MB ({raw_bytes / max(split_bytes, 1):.1f}x)")
+                stored_bytes += split_bytes
+                uncompressed_bytes += raw_bytes
+            else:
+                split_bytes = write_windows(
+                    os.path.join(output_dir, f'X_{name}.npy'),
+                    X_grouped, split_ends, window_size,
+                    chunk_windows=args.chunk_windows
+                )
+                stored_bytes += split_bytes
+                uncompressed_bytes += split_bytes
+            np.save(os.path.join(output_dir, f'y_{name}.npy'), split_y)
+    
+    info = {
+        'format': args.format,
+        'window_size': window_size,
+        'step_size': args.step,
+        'n_features': n_features,
+        'n_rows': len(X_grouped),
+        'feature_dtype': str(X_grouped.dtype),
+        'split_by': split_by,
+        'test_size': args.test_size,
+        'val_size': args.val_size,
+        'splits': {name: len(split_ends) for name, (split_ends, _) in splits.items()}
+    }
+    if shared_features is not None:
+        info['features_file'] = shared_features
+    if args.format == FORMAT_WINDOWS and args.compress != 'none':
+        info['compression'] = {
+            'codec': args.compress,
+            'level': DEFAULT_LEVELS[args.compress] if args.compress_level is None else args.compress_level,
+            'chunk_windows': args.compress_chunk,
+            'shuffle': args.compress_shuffle
+        }
+    save_dataset_info(output_dir, info)
+    np.save(os.path.join(output_dir, PATIENTS_FILE), pd.unique(patients))
+    
+    materialized_bytes = n_windows * window_size * n_features * X_grouped.dtype.itemsize
+    if args.format != FORMAT_WINDOWS:
+        uncompressed_bytes = stored_bytes
+    float64_bytes = uncompressed_bytes // X_grouped.dtype.itemsize * np.dtype(np.float64).itemsize
+    print(f"  ✓ NumPy dizileri kaydedildi: {output_dir} (format: {args.format}, dtype: {X_grouped.dtype})")
+    if shared_features is not None:
+        print(f"  ✓ Özellik matrisi paylaşılıyor: {shared_features}")
+    print(f"  ✓ Özellik verisi: {stored_bytes / 1024**2:,.1f} MB "
+          f"(materyalize pencereler: {materialized_bytes / 1024**2:,.1f} MB)")
+    if stored_bytes != uncompressed_bytes:
+        print(f"  ✓ Sıkıştırma ({args.compress}): {uncompressed_bytes / max(stored_bytes, 1):.1f}x "
+              f"(.npy: {uncompressed_bytes / 1024**2:,.1f} MB)")
+    if X_grouped.dtype != np.float64 or stored_bytes != uncompressed_bytes:
+        print(f"  ✓ float64'e göre tasarruf: {(float64_bytes - stored_bytes) / 1024**2:,.1f} MB "
+              f"({100 * (1 - stored_bytes / max(float64_bytes, 1)):.0f}%)")
+
+
+def dataset_dirs(output_dir: str) -> list:
+    """Veri seti dizinleri: output_dir'in kendisi veya çoklu pencere w<boyut>/ alt dizinleri"""
+    if os.path.exists(os.path.join(output_dir, DATASET_INFO_FILE)):
+        return [output_dir]
+    dirs = [
+        os.path.join(output_dir, name) for name in sorted(os.listdir(output_dir))
+        if os.path.exists(os.path.join(output_dir, name, DATASET_INFO_FILE))
+    ]
+    if not dirs:
+        raise FileNotFoundError(f"{output_dir} içinde veri seti bulunamadı ({DATASET_INFO_FILE})")
+    return sorted(dirs, key=lambda path: load_dataset_info(path)['window_size'])
+
+
+def append_split_dataset(args, data_dir: str, info: dict, X_grouped: np.ndarray,
+                         splits: dict, feature_offsets: dict) -> int:
+    """
+    Yeni pencereleri mevcut veri setinin dosyalarına ekle
+
+    Args:
+        feature_offsets: Paylaşılan features.npy dosyalarının ekleme öncesi
+            satır sayıları; her dosyaya yalnızca bir kez eklenir
+
+    Returns:
+        Eklenen pencere sayısı
+    """
+    window_size = info['window_size']
+    
+    if info['format'] == FORMAT_INDEX:
+        features_path = os.path.realpath(
+            os.path.join(data_dir, info.get('features_file', FEATURES_FILE))
+        )
+        if features_path not in feature_offsets:
+            feature_offsets[features_path] = np.load(features_path, mmap_mode='r').shape[0]
+            append_npy(features_path, X_grouped)
+        offset = feature_offsets[features_path]
+        for name, (split_ends, split_y) in splits.items():
+            append_npy(
+                os.path.join(data_dir, f'{name}_ends.npy'),
+                split_ends.astype(np.int64) + offset
+            )
+            append_npy(os.path.join(data_dir, f'y_{name}.npy'), split_y)
+    elif info['format'] == FORMAT_SHARDS:
+        # Yeni pencereler mevcut shard'ların ardından yeni shard'lara yazılır
+        manifest = load_shard_manifest(data_dir)
+        for name, (split_ends, split_y) in splits.items():
+            entries = write_shards(
+                data_dir, name, X_grouped, split_ends, split_y, window_size,
+                shard_mb=args.shard_mb, start_index=len(manifest['splits'][name])
+            )
+            manifest['splits'][name].extend(entries)
+            print(f"  ✓ {name}: {len(entries)} yeni shard")
+        with open(os.path.join(data_dir, SHARDS_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    else:
+        for name, (split_ends, split_y) in splits.items():
+            if info.get('compression'):
+                # Yeni parçalar dosya sonuna eklenir (codec ve parça boyutu dosyadan)
+                write_compressed_windows(
+                    os.path.join(data_dir, f'X_{name}{COMPRESSED_SUFFIX}'),
+                    X_grouped, split_ends, window_size,
+                    chunk_rows=info['compression']['chunk_windows'],
+                    mode='a'
+                )
+            else:
+                append_windows(
+                    os.path.join(data_dir, f'X_{name}.npy'),
+                    X_grouped, split_ends, window_size,
+                    chunk_windows=args.chunk_windows
+                )
+            append_npy(os.path.join(data_dir, f'y_{name}.npy'), split_y)
+    
+    return sum(len(split_ends) for split_ends, _ in splits.values())
+
+
+def append_dataset(args, profiler: StageProfiler):
+    """
+    Yeni hastaları mevcut veri setine ekle (--append)
+
+    Kaydedilmiş imputer/scaler/ohe ve sütun bilgisi yüklenir; hiçbir şey
+    yeniden eğitilmez ve yalnızca yeni hastalar dönüştürülüp pencerelenir.
+    Yeni hastalar hasta ID hash'i ile split'lere atanır; veri setinde zaten
+    bulunan hastalar atlanır. Çoklu pencere çıktısında her w<boyut>/ alt
+    dizinine eklenir.
+    """
+    data_dirs = dataset_dirs(args.output)
+    infos = {data_dir: load_dataset_info(data_dir) for data_dir in data_dirs}
+    first_info = infos[data_dirs[0]]
+    
+    preprocessor = SepsisDataPreprocessor(
+        window_size=first_info['window_size'],
+        step_size=first_info['step_size'],
+        dtype=first_info['feature_dtype']
+    )
+    preprocessor.load_preprocessing_objects(data_dirs[0])
+    
+    print(f"\nVeri yükleniyor: {args.input}")
+    with profiler.stage('load'):
+        df = load_table(
+            args.input,
+            schema_path=args.schema,
+            cache_dir=args.ingest_cache_dir,
+            use_cache=not args.no_ingest_cache
+        )
+    
+    with profiler.stage('clean'):
+        df = preprocessor.clean_data(df)
+        
+        # Veri setinde (herhangi bir pencere boyutunda) bulunan hastaları atla
+        known = [load_patient_ids(data_dir) for data_dir in data_dirs]
+        if any(patient_ids is None for patient_ids in known):
+            print(f"  ⚠ {PATIENTS_FILE} bulunamadı; mevcut hastalar tespit edilemiyor")
+        known = [patient_ids for patient_ids in known if patient_ids is not None]
+        if known:
+            is_known = df['Patient_ID'].isin(np.concatenate(known))
+            n_skipped = df.loc[is_known, 'Patient_ID'].nunique()
+            df = df[~is_known].reset_index(drop=True)
+            print(f"  - {n_skipped} hasta veri setinde zaten var, atlandı")
+    
+    n_patients = df['Patient_ID'].nunique()
+    print(f"  - {n_patients} yeni hasta eklenecek")
+    if n_patients == 0:
+        print("\n✓ Eklenecek yeni hasta yok; veri seti değişmedi")
+        return
+    
+    with profiler.stage('transform'):
+        X_transformed = preprocessor.transform_features(df)
+        print(f"\n  ✓ Dönüştürülmüş özellik şekli: {X_transformed.shape}")
+    
+    feature_offsets = {}
+    for data_dir in data_dirs:
+        info = infos[data_dir]
+        window_size = info['window_size']
+        
+        with profiler.stage(f'w{window_size}') if len(data_dirs) > 1 else nullcontext():
+            preprocessor.window_size = window_size
+            preprocessor.step_size = info['step_size']
+            with profiler.stage('windows'):
+                X_grouped, ends, y_seq, patients = preprocessor.create_window_index(df, X_transformed)
+            
+            if info.get('split_by', 'window') != 'patient':
+                print("  ⚠ Mevcut veri pencere bazında bölünmüş; yeni hastalar hasta "
+                      "ID hash'i ile atanıyor")
+            print("\n[4/5] Yeni Pencereleri Bölümleme (hasta bazında)...")
+            with profiler.stage('split'):
+                splits = split_windows(
+                    ends, y_seq, patients, 'patient',
+                    info.get('test_size', args.test_size), info.get('val_size', args.val_size)
+                )
+            for name, (split_ends, split_y) in splits.items():
+                positive_rate = split_y.mean() * 100 if len(split_y) else 0.0
+                print(f"  ✓ {name.capitalize() + ':':<6} +{len(split_ends)} pencere "
+                      f"({positive_rate:.2f}% pozitif)")
+            
+            print(f"\n[5/5] Veri Setine Ekleniyor: {data_dir}")
+            with profiler.stage('save'):
+                n_appended = append_split_dataset(
+                    args, data_dir, info, X_grouped, splits, feature_offsets
+                )
+                
+                # Penceresi olmayan (kısa) hastalar da kaydedilir; tekrar eklenmezler
+                known_ids = load_patient_ids(data_dir)
+                new_ids = pd.unique(df['Patient_ID'])
+                np.save(
+                    os.path.join(data_dir, PATIENTS_FILE),
+                    new_ids if known_ids is None else np.concatenate([known_ids, new_ids])
+                )
+                
+                for name, (split_ends, _) in splits.items():
+                    info['splits'][name] += len(split_ends)
+                info['n_rows'] = info.get('n_rows', 0) + len(X_grouped)
+                info.setdefault('appends', []).append({
+                    'input': os.path.abspath(args.input),
+                    'time': datetime.now().isoformat(timespec='seconds'),
+                    'patients': int(len(new_ids)),
+                    'windows': int(n_appended)
+                })
+                save_dataset_info(data_dir, info)
+            print(f"  ✓ {n_appended:,} pencere eklendi (toplam: "
+                  f"{sum(info['splits'].values()):,}, format: {info['format']})")
+    
+    print("\n" + "="*60)
+    print("ARTIMLI EKLEME TAMAMLANDI!")
+    print("="*60)
+    print(f"\nVeri seti: {args.output}")
+    print(f"Yeni hasta: {n_patients}")
+    print(f"Peak bellek (RSS): {format_mb(peak_rss_mb())}")
 
 
 def main():
@@ -202,7 +912,7 @@ def main():
         '--input',
         type=str,
         required=True,
-        help='Giriş CSV dosyası yolu'
+        help='Giriş dosyası yolu (CSV; .parquet/.feather da desteklenir)'
     )
     parser.add_argument(
         '--output',
@@ -213,8 +923,10 @@ def main():
     parser.add_argument(
         '--window',
         type=int,
-        default=6,
-        help='Pencere boyutu (varsayılan: 6 saat)'
+        nargs='+',
+        default=[6],
+        help='Pencere boyutu; birden fazla verilirse (ör. --window 4 6 8 12) her biri '
+             'çıktı dizininde w<boyut>/ altına yazılır (varsayılan: 6 saat)'
     )
     parser.add_argument(
         '--step',
@@ -234,6 +946,136 @@ def main():
         default=0.2,
         help='Validation seti oranı (varsayılan: 0.2)'
     )
+    parser.add_argument(
+        '--split-by',
+        type=str,
+        choices=SPLIT_BY,
+        default=None,
+        help='Bölme birimi: window (pencere bazında katmanlı) veya patient (hasta ID '
+             'hash\'i; pencere boyutundan bağımsız). Varsayılan: tek pencerede window, '
+             'birden fazla pencerede patient'
+    )
+    parser.add_argument(
+        '--format',
+        type=str,
+        choices=[FORMAT_WINDOWS, FORMAT_INDEX, FORMAT_SHARDS],
+        default=FORMAT_WINDOWS,
+        help='Çıktı formatı: windows (materyalize X_*.npy), index '
+             '(tek özellik matrisi + pencere indeksleri) veya shards '
+             '(boyutu sınırlı NPZ shard\'ları + manifest, varsayılan: windows)'
+    )
+    parser.add_argument(
+        '--shard-mb',
+        type=float,
+        default=256,
+        help='shards formatında shard başına en fazla pencere verisi (MB, varsayılan: 256)'
+    )
+    parser.add_argument(
+        '--chunk-windows',
+        type=int,
+        default=100_000,
+        help='windows formatında diske bir seferde yazılan pencere sayısı '
+             '(varsayılan: 100000)'
+    )
+    parser.add_argument(
+        '--compress',
+        type=str,
+        choices=['none'] + CODECS,
+        default='none',
+        help='windows formatında X dizilerini parçalı sıkıştırılmış sakla (X_<split>.npc); '
+             'zstd/lz4 için zstandard/lz4 paketi gerekir (varsayılan: none)'
+    )
+    parser.add_argument(
+        '--compress-level',
+        type=int,
+        default=None,
+        help='Sıkıştırma seviyesi (varsayılan: codec\'e göre, ör. zlib 6, zstd 3)'
+    )
+    parser.add_argument(
+        '--compress-chunk',
+        type=int,
+        default=512,
+        help='Sıkıştırma parçası başına pencere sayısı; küçük parça rastgele erişimi '
+             'ucuzlatır, büyük parça oranı artırır (varsayılan: 512)'
+    )
+    parser.add_argument(
+        '--compress-shuffle',
+        action='store_true',
+        help='Sıkıştırmadan önce bayt karıştırma uygula (örtüşmeyen veride oranı artırır)'
+    )
+    parser.add_argument(
+        '--dtype',
+        type=str,
+        choices=['float32', 'float16', 'float64'],
+        default='float32',
+        help='Özellik veri tipi (varsayılan: float32; float16 yalnızca depolama için)'
+    )
+    parser.add_argument(
+        '--fit-chunk-rows',
+        type=int,
+        default=None,
+        help='Imputer/scaler girdiyi bu kadar satırlık parçalarla okuyarak '
+             'eğitilir (out-of-core; belirtilmezse tüm veri bellekte)'
+    )
+    parser.add_argument(
+        '--quantile-eps',
+        type=float,
+        default=0.001,
+        help='Streaming fit için medyan rank hatası üst sınırı (varsayılan: 0.001)'
+    )
+    parser.add_argument(
+        '--schema',
+        type=str,
+        default=None,
+        help='Sütun -> dtype eşlemesi içeren JSON şema; yalnızca bu sütunlar okunur '
+             '(belirtilmezse ilk satırlardan çıkarılır)'
+    )
+    parser.add_argument(
+        '--ingest-cache-dir',
+        type=str,
+        default=None,
+        help='CSV\'nin Feather önbellek dizini (varsayılan: girdinin yanında .ingest_cache/)'
+    )
+    parser.add_argument(
+        '--no-ingest-cache',
+        action='store_true',
+        help='CSV önbelleğini kullanma'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Aşama önbelleği dizini (varsayılan: çıktı dizininin yanında .stage_cache/)'
+    )
+    parser.add_argument(
+        '--cache-max-gb',
+        type=float,
+        default=20.0,
+        help='Aşama önbelleği boyut sınırı; aşılınca LRU silme (varsayılan: 20 GB)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Aşama önbelleğini kullanma (tüm aşamaları yeniden çalıştır)'
+    )
+    parser.add_argument(
+        '--append',
+        action='store_true',
+        help='Yeni hastaları --output içindeki mevcut veri setine ekle; kaydedilmiş '
+             'imputer/scaler kullanılır, pencere boyutu ve format veri setinden okunur'
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        choices=PROFILE_STAGES,
+        default=None,
+        help='Bu aşama için cProfile istatistiklerini çıktı dizinine yaz (profile_<aşama>.prof)'
+    )
+    parser.add_argument(
+        '--trace-malloc',
+        action='store_true',
+        help='Aşama profiline tracemalloc en büyük bellek ayıranlarını ekle (yavaşlatır)'
+    )
     
     args = parser.parse_args()
     
@@ -241,86 +1083,122 @@ def main():
     print("SEPSIS VERİ HAZIRLAMA PIPELINE'I v23")
     print("="*60)
     
-    # Veriyi yükle
-    print(f"\nVeri yükleniyor: {args.input}")
-    df = pd.read_csv(args.input)
-    print(f"✓ {len(df)} satır, {len(df.columns)} sütun yüklendi")
+    window_sizes = sorted(set(args.window))
+    multi_window = len(window_sizes) > 1
+    split_by = args.split_by or ('patient' if multi_window else 'window')
+    if multi_window and split_by == 'window':
+        parser.error("Birden fazla --window için --split-by patient gerekli "
+                     "(tüm pencere boyutlarında aynı hasta bölmesi)")
+    
+    if args.compress != 'none':
+        if args.format != FORMAT_WINDOWS:
+            parser.error("--compress yalnızca --format windows ile kullanılabilir")
+        if args.compress not in available_codecs():
+            parser.error(f"{args.compress} codec'i bu ortamda kullanılamıyor "
+                         f"(mevcut: {', '.join(available_codecs())})")
     
-    # Gerekli sütunları kontrol et
-    required_cols = ['Patient_ID', 'ICULOS', 'SepsisLabel']
-    missing_cols = [col for col in required_cols if col not in df.columns]
-    if missing_cols:
-        raise ValueError(f"Eksik sütunlar: {missing_cols}")
+    if args.append:
+        profiler = StageProfiler(
+            trace_malloc=args.trace_malloc,
+            profile_stage=args.profile,
+            profile_dir=args.output
+        )
+        append_dataset(args, profiler)
+        profiler.print_report()
+        report_path = os.path.join(args.output, 'profile_report.json')
+        profiler.save(report_path)
+        print(f"\n✓ Profil raporu kaydedildi: {report_path}")
+        return
     
     # Preprocessor oluştur
     preprocessor = SepsisDataPreprocessor(
-        window_size=args.window,
-        step_size=args.step
+        window_size=window_sizes[0],
+        step_size=args.step,
+        dtype=args.dtype
     )
     
-    # Sütunları belirle
-    preprocessor.identify_columns(df)
-    
-    # Veriyi temizle
-    df = preprocessor.clean_data(df)
-    
-    # Preprocessing nesnelerini eğit
-    preprocessor.fit_preprocessing(df)
-    
-    # Özellikleri dönüştür
-    X_transformed = preprocessor.transform_features(df)
-    print(f"\n  ✓ Dönüştürülmüş özellik şekli: {X_transformed.shape}")
-    
-    # Sekansları oluştur
-    X_seq, y_seq = preprocessor.create_sequences(df, X_transformed)
-    
-    # Train/Val/Test ayır
-    print("\n[4/5] Veri Setlerini Bölümleme...")
-    
-    # Önce test setini ayır
-    X_temp, X_test, y_temp, y_test = train_test_split(
-        X_seq, y_seq,
-        test_size=args.test_size,
-        stratify=y_seq,
-        random_state=42
+    # Aşama önbelleği
+    cache_dir = args.cache_dir or os.path.join(
+        os.path.dirname(os.path.normpath(os.path.abspath(args.output))), '.stage_cache'
     )
-    
-    # Sonra validation setini ayır
-    val_ratio = args.val_size / (1 - args.test_size)
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_temp, y_temp,
-        test_size=val_ratio,
-        stratify=y_temp,
-        random_state=42
+    cache = StageCache(
+        cache_dir,
+        max_bytes=int(args.cache_max_gb * 1024**3),
+        code_version=code_version(CACHE_CODE_FILES),
+        enabled=not args.no_cache
     )
+    if cache.enabled:
+        print(f"\nAşama önbelleği: {cache_dir}")
     
-    print(f"  ✓ Train: {X_train.shape} ({y_train.mean()*100:.2f}% pozitif)")
-    print(f"  ✓ Val:   {X_val.shape} ({y_val.mean()*100:.2f}% pozitif)")
-    print(f"  ✓ Test:  {X_test.shape} ({y_test.mean()*100:.2f}% pozitif)")
-    
-    # Sonuçları kaydet
-    print("\n[5/5] Sonuçları Kaydediyor...")
+    # Aşama profili (süre, CPU, bellek; isteğe bağlı tracemalloc/cProfile)
     os.makedirs(args.output, exist_ok=True)
+    profiler = StageProfiler(
+        trace_malloc=args.trace_malloc,
+        profile_stage=args.profile,
+        profile_dir=args.output
+    )
+    stages = PreparationStages(args, preprocessor, cache, profiler)
     
-    np.save(os.path.join(args.output, 'X_train.npy'), X_train)
-    np.save(os.path.join(args.output, 'y_train.npy'), y_train)
-    np.save(os.path.join(args.output, 'X_val.npy'), X_val)
-    np.save(os.path.join(args.output, 'y_val.npy'), y_val)
-    np.save(os.path.join(args.output, 'X_test.npy'), X_test)
-    np.save(os.path.join(args.output, 'y_test.npy'), y_test)
-    
-    print(f"  ✓ NumPy dizileri kaydedildi: {args.output}")
+    # Preprocessing nesneleri her durumda gerekli (kaydedilecek)
+    stages.fitted
     
-    # Preprocessing nesnelerini kaydet
-    preprocessor.save_preprocessing_objects(args.output)
+    # Her pencere boyutu aynı dönüştürülmüş matristen ve aynı hasta bölmesinden üretilir
+    shared_features = None
+    window_counts = {}
+    for window_size in window_sizes:
+        output_dir = os.path.join(args.output, f'w{window_size}') if multi_window else args.output
+        
+        with profiler.stage(f'w{window_size}') if multi_window else nullcontext():
+            # Pencere indeksleri (gerekirse temizleme/dönüştürme aşamaları çalışır)
+            X_grouped, ends, y_seq, patients = stages.windows(window_size)
+            window_counts[window_size] = len(ends)
+            
+            # Train/Val/Test ayır (pencere indeksleri üzerinden; diziler kopyalanmaz)
+            print(f"\n[4/5] Veri Setlerini Bölümleme ({split_by} bazında)...")
+            with profiler.stage('split'):
+                splits = split_windows(
+                    ends, y_seq, patients, split_by, args.test_size, args.val_size
+                )
+            
+            n_features = X_grouped.shape[1]
+            for name, (split_ends, split_y) in splits.items():
+                shape = (len(split_ends), window_size, n_features)
+                positive_rate = split_y.mean() * 100 if len(split_y) else 0.0
+                print(f"  ✓ {name.capitalize() + ':':<6} {shape} ({positive_rate:.2f}% pozitif)")
+            
+            # Sonuçları kaydet
+            print("\n[5/5] Sonuçları Kaydediyor...")
+            with profiler.stage('save'):
+                if multi_window and args.format == FORMAT_INDEX and shared_features is None:
+                    # Özellik matrisi tüm pencere boyutları için bir kez yazılır
+                    np.save(os.path.join(args.output, FEATURES_FILE), X_grouped)
+                    shared_features = os.path.join('..', FEATURES_FILE)
+                save_split_dataset(
+                    args, output_dir, window_size, X_grouped, splits, split_by, patients,
+                    shared_features=shared_features
+                )
+            
+            # Preprocessing nesnelerini kaydet
+            preprocessor.save_preprocessing_objects(output_dir)
     
     print("\n" + "="*60)
     print("VERİ HAZIRLAMA TAMAMLANDI!")
     print("="*60)
     print(f"\nÇıktı dizini: {args.output}")
-    print(f"Toplam özellik sayısı: {X_seq.shape[2]}")
-    print(f"Pencere boyutu: {args.window} saat")
-    print(f"Toplam sekans: {len(X_seq):,}")
+    print(f"Toplam özellik sayısı: {n_features}")
+    if multi_window:
+        print(f"Hasta bölmesi: {split_by} (tüm pencere boyutlarında aynı)")
+        for window_size, n_windows in window_counts.items():
+            print(f"  - w{window_size}: {window_size} saat, {n_windows:,} sekans")
+    else:
+        print(f"Pencere boyutu: {window_sizes[0]} saat")
+        print(f"Toplam sekans: {window_counts[window_sizes[0]]:,}")
+    print(f"Peak bellek (RSS): {format_mb(peak_rss_mb())}")
+    
+    profiler.print_report()
+    report_path = os.path.join(args.output, 'profile_report.json')
+    profiler.save(report_path)
+    print(f"\n✓ Profil raporu kaydedildi: {report_path}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,187 @@
+"""
+Sepsis Tahmin Sistemi - Kaynak Kullanımı Yardımcıları
+=====================================================
+
+Batch script'lerinin bellek kullanımını raporlamak için küçük yardımcılar.
+
+Peak RSS değeri standart kütüphanedeki `resource` modülünden okunur
+(Linux/macOS). Modülün bulunmadığı platformlarda (Windows) fonksiyonlar
+None döndürür ve raporlama sessizce atlanır.
+
+StageProfiler, adlandırılmış aşamalar için duvar saati süresi, CPU süresi,
+peak RSS, isteğe bağlı tracemalloc en büyük bellek ayıranları ve seçilen
+bir aşama için cProfile çıktısı toplar; sonuçlar JSON olarak kaydedilir.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB), bilinmiyorsa None"""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte cinsinden raporlar
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_rss_mb():
+    """Sürecin o anki RSS değeri (MB); /proc okunamıyorsa None"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def format_mb(value_mb):
+    """MB değerini rapor için biçimlendir"""
+    if value_mb is None:
+        return 'bilinmiyor'
+    return f"{value_mb:,.1f} MB"
+
+
+class StageProfiler:
+    """
+    Adlandırılmış aşamalar için süre ve bellek profili
+
+    Aşamalar iç içe olabilir; üst aşamanın süresi alt aşamaları da kapsar.
+    cProfile dosyası üst aşamaların adlarıyla adlandırılır (ör. w6 altındaki
+    windows aşaması profile_w6_windows.prof).
+    Peak RSS süreç ömrü boyunca azalmadığından her aşama için aşama sonundaki
+    değer ve aşama süresince artış raporlanır. tracemalloc belirgin bir ek
+    yük getirdiğinden yalnızca trace_malloc=True iken açılır.
+    """
+
+    def __init__(self, trace_malloc: bool = False, top_n: int = 10,
+                 profile_stage: str = None, profile_dir: str = '.'):
+        self.trace_malloc = trace_malloc
+        self.top_n = top_n
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.records = []
+        self._frames = []
+        self._start = time.perf_counter()
+        if self.trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Bir aşamayı ölç: with profiler.stage('clean'): ..."""
+        record = {
+            'name': name,
+            'parent': self._frames[-1]['record']['name'] if self._frames else None,
+            'depth': len(self._frames)
+        }
+        self.records.append(record)
+
+        frame = {
+            'record': record,
+            'rss_before': peak_rss_mb(),
+            'child_peak': 0,
+            'scope': [parent['record']['name'] for parent in self._frames] + [name]
+        }
+        if self.trace_malloc:
+            frame['snapshot'] = tracemalloc.take_snapshot()
+            frame['traced_before'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._frames.append(frame)
+
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            record['peak_rss_mb'] = peak_rss_mb()
+            if record['peak_rss_mb'] is not None and frame['rss_before'] is not None:
+                record['peak_rss_increase_mb'] = record['peak_rss_mb'] - frame['rss_before']
+            record['rss_mb'] = current_rss_mb()
+
+            self._frames.pop()
+            if self.trace_malloc:
+                self._record_allocations(record, frame)
+            if profiler is not None:
+                self._dump_profile(record, profiler, '_'.join(frame['scope']))
+
+    def _record_allocations(self, record: dict, frame: dict):
+        """tracemalloc tepe değeri ve aşama sonunda tutulan belleği en çok artıran satırlar"""
+        peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+        record['tracemalloc_peak_mb'] = (peak - frame['traced_before']) / (1024 * 1024)
+        # Alt aşamaların tepe değeri üst aşamaya aktarılır (reset_peak sonrası kaybolmasın)
+        if self._frames:
+            self._frames[-1]['child_peak'] = max(self._frames[-1]['child_peak'], peak)
+
+        # Profilleyicinin kendi ayırmaları (ör. tutulan snapshot'lar) hariç
+        exclude = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        snapshot = tracemalloc.take_snapshot().filter_traces(exclude)
+        baseline = frame['snapshot'].filter_traces(exclude)
+        stats = snapshot.compare_to(baseline, 'lineno')[:self.top_n]
+        record['top_allocations'] = [
+            {
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff_kb': stat.size_diff / 1024,
+                'size_kb': stat.size / 1024,
+                'count_diff': stat.count_diff
+            }
+            for stat in stats
+        ]
+
+    def _dump_profile(self, record: dict, profiler: cProfile.Profile, scope: str):
+        """cProfile istatistiklerini dosyaya yaz ve en pahalı çağrıları yazdır"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"profile_{scope}.prof")
+        profiler.dump_stats(path)
+        record['cprofile'] = path
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(15)
+        print(f"\ncProfile ({record['name']}): {path}")
+        print(stream.getvalue())
+
+    def summary(self) -> dict:
+        return {
+            'total_wall_s': time.perf_counter() - self._start,
+            'peak_rss_mb': peak_rss_mb(),
+            'trace_malloc': self.trace_malloc,
+            'stages': self.records
+        }
+
+    def save(self, path: str):
+        """Profili JSON dosyasına yaz"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+    def print_report(self):
+        """Aşama tablosunu konsola yazdır"""
+        print("\nAşama Profili:")
+        print(f"  {'Aşama':<24} {'Süre (sn)':>10} {'CPU (sn)':>10} {'Peak RSS':>14}")
+        for record in self.records:
+            if 'wall_s' not in record:
+                continue
+            name = '  ' * record['depth'] + record['name']
+            print(f"  {name:<24} {record['wall_s']:>10.2f} {record['cpu_s']:>10.2f} "
+                  f"{format_mb(record['peak_rss_mb']):>14}")
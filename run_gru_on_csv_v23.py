@@ -10,20 +10,171 @@ Bu script, eğitilmiş GRU modelini kullanarak yeni hasta verilerine tahmin yapa
 - Hasta bazlı 6 saatlik kayan pencereler oluşturur
 - Her saat için sepsis risk skorunu hesaplar
 - Sonuçları CSV olarak kaydeder
+- Büyük dosyalar için parça parça (streaming) okuma modu (--chunk-rows)
+- Parquet/Feather girdi ve çıktı desteği (format dosya uzantısından belirlenir,
+  yalnızca modelin ihtiyaç duyduğu sütunlar okunur; pyarrow gerekir)
+- Çok süreçli, hasta bazlı shard'lanmış tahmin (--workers)
+- Kesintiye dayanıklı çalıştırma: tamamlanan parçalar commit edilir (--resume)
+- Özet istatistikler online hesaplanır ve <output>.stats.json olarak kaydedilir
+- CPU iş parçacığı ayarları (--intra-op-threads, --inter-op-threads,
+  --omp-threads, --cpu-affinity; bkz. cpu_config.py). --workers ile
+  intra-op bütçesi worker'lar arasında bölünür.
 
 Kullanım:
     python run_gru_on_csv_v23.py --input test_data.csv --model models/gru_v23_best.keras --preprocessing data/processed/
+
+    # Bellek sınırlı streaming modu (girdi Patient_ID + ICULOS sıralı olmalı)
+    python run_gru_on_csv_v23.py --input export.csv --model models/gru_v23_best.keras \
+        --preprocessing data/processed/ --chunk-rows 200000
+
+    # Kolonsal girdi/çıktı
+    python run_gru_on_csv_v23.py --input icu_extract.parquet --output predictions.parquet \
+        --model models/gru_v23_best.keras --preprocessing data/processed/
 """
 
+import cpu_config
+
+if __name__ == '__main__':
+    # Thread ayarları TensorFlow ve OpenMP/MKL yüklenmeden uygulanmalı
+    cpu_config.apply_from_argv()
+
 import numpy as np
 import pandas as pd
 import pickle
 import tensorflow as tf
 from tensorflow import keras
 import argparse
+import contextlib
+import heapq
+import io
+import json
+import multiprocessing as mp
 import os
+import shutil
+import time
+import zlib
 from datetime import datetime
-from typing import List, Tuple
+from typing import List
+
+import model_runtime
+from file_utils import file_sha256, write_json_atomic
+from resource_monitor import peak_rss_mb, format_mb
+from streaming_stats import RunStatistics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Feather desteği opsiyonel
+    pa = None
+    pq = None
+
+
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather'
+}
+
+
+def detect_file_format(path: str) -> str:
+    """Dosya formatını uzantıdan belirle (bilinmeyen uzantılar CSV sayılır)"""
+    file_format = FILE_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+    if file_format != 'csv' and pa is None:
+        raise ImportError(
+            f"{file_format} desteği için pyarrow gerekli: pip install pyarrow"
+        )
+    return file_format
+
+
+def read_file_columns(path: str) -> List[str]:
+    """Dosyayı okumadan sütun adlarını döndür"""
+    file_format = detect_file_format(path)
+    if file_format == 'csv':
+        return pd.read_csv(path, nrows=0).columns.tolist()
+    if file_format == 'parquet':
+        return pq.read_schema(path).names
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def iter_file_chunks(path: str, chunk_rows: int, columns: List[str] = None, csv_dtype=None):
+    """Dosyayı en fazla chunk_rows satırlık DataFrame parçaları olarak oku"""
+    file_format = detect_file_format(path)
+
+    if file_format == 'csv':
+        yield from pd.read_csv(path, usecols=columns, dtype=csv_dtype, chunksize=chunk_rows)
+    elif file_format == 'parquet':
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        # Feather v2 (Arrow IPC): kayıt grupları tek tek açılır
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(offset, chunk_rows).to_pandas()
+
+
+def stats_sidecar_path(output_path: str) -> str:
+    """Çıkış dosyasının yanındaki JSON istatistik dosyası"""
+    return os.path.splitext(output_path)[0] + '.stats.json'
+
+
+def patient_shard(patient_id, n_shards: int) -> int:
+    """Hastayı süreçten bağımsız (kararlı) bir hash ile shard'a ata"""
+    return zlib.crc32(str(patient_id).encode('utf-8')) % n_shards
+
+
+class PredictionWriter:
+    """Tahmin sonuçlarını parça parça çıkış dosyasına yaz (CSV, Parquet, Feather)"""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.file_format = detect_file_format(output_path)
+        self.rows_written = 0
+        self._arrow_writer = None
+        self._schema = None
+
+    @staticmethod
+    def to_columnar(results: pd.DataFrame) -> pd.DataFrame:
+        """Kolonsal çıktı tipleri: float32 skor, nullable int8 tahmin"""
+        return results.astype({'proba': 'float32', 'yhat': 'Int8'})
+
+    def write(self, results: pd.DataFrame):
+        """Bir sonuç parçasını dosyaya ekle"""
+        if self.file_format == 'csv':
+            results.to_csv(
+                self.output_path,
+                mode='a' if self.rows_written > 0 else 'w',
+                header=self.rows_written == 0,
+                index=False
+            )
+        else:
+            table = pa.Table.from_pandas(self.to_columnar(results), preserve_index=False)
+            if self._arrow_writer is None:
+                self._schema = table.schema
+                if self.file_format == 'parquet':
+                    self._arrow_writer = pq.ParquetWriter(self.output_path, self._schema)
+                else:
+                    self._arrow_writer = pa.ipc.new_file(self.output_path, self._schema)
+            else:
+                table = table.cast(self._schema)
+            self._arrow_writer.write_table(table)
+
+        self.rows_written += len(results)
+
+    def close(self):
+        """Kolonsal yazıcıyı kapat (dosya alt bilgisi burada yazılır)"""
+        if self._arrow_writer is not None:
+            self._arrow_writer.close()
+            self._arrow_writer = None
 
 
 class SepsisInferencePipeline:
@@ -34,7 +185,10 @@ class SepsisInferencePipeline:
         model_path: str,
         preprocessing_dir: str,
         window_size: int = 6,
-        threshold: float = 0.1799
+        threshold: float = 0.1799,
+        batch_size: int = 1024,
+        jit_compile: bool = False,
+        unroll: bool = False
     ):
         """
         Args:
@@ -42,11 +196,17 @@ class SepsisInferencePipeline:
             preprocessing_dir: Preprocessing nesnelerinin bulunduğu dizin
             window_size: Sekans pencere boyutu
             threshold: Sınıflandırma eşiği
+            batch_size: Streaming modunda model.predict batch boyutu
+            jit_compile: Tahmin adımını XLA ile derle
+            unroll: GRU döngüsünü açarak tahmin yap
         """
         self.model_path = model_path
         self.preprocessing_dir = preprocessing_dir
         self.window_size = window_size
         self.threshold = threshold
+        self.batch_size = batch_size
+        self.jit_compile = jit_compile
+        self.unroll = unroll
         
         self.model = None
         self.imputer = None
@@ -58,8 +218,10 @@ class SepsisInferencePipeline:
     def load_model(self):
         """Eğitilmiş modeli yükle"""
         print(f"\nModel yükleniyor: {self.model_path}")
-        self.model = keras.models.load_model(self.model_path)
-        print("✓ Model yüklendi")
+        self.model = model_runtime.load_model(
+            self.model_path, jit_compile=self.jit_compile, unroll=self.unroll
+        )
+        print(f"✓ Model yüklendi ({model_runtime.describe(self.jit_compile, self.unroll)})")
         
     def load_preprocessing_objects(self):
         """Preprocessing nesnelerini yükle"""
@@ -89,6 +251,36 @@ class SepsisInferencePipeline:
         print(f"  - Sayısal özellikler: {len(self.numerical_columns)}")
         print(f"  - Kategorik özellikler: {len(self.categorical_columns)}")
         
+    def input_columns(self, input_path: str) -> List[str]:
+        """Girdi dosyasından okunacak sütunlar (projection pushdown)"""
+        available = set(read_file_columns(input_path))
+        if 'Patient_ID' not in available:
+            raise ValueError("'Patient_ID' sütunu bulunamadı!")
+
+        feature_columns = self.numerical_columns + list(self.categorical_columns or [])
+        missing = [col for col in feature_columns if col not in available]
+        if missing:
+            raise ValueError(f"Eksik özellik sütunları: {missing}")
+
+        optional = [col for col in ['ICULOS'] if col in available]
+        return ['Patient_ID'] + optional + feature_columns
+
+    def read_input(self, input_path: str) -> pd.DataFrame:
+        """Girdi dosyasını yalnızca gerekli sütunlarla oku"""
+        columns = self.input_columns(input_path)
+        file_format = detect_file_format(input_path)
+
+        if file_format == 'parquet':
+            return pd.read_parquet(input_path, columns=columns)
+        if file_format == 'feather':
+            return pd.read_feather(input_path, columns=columns)
+        return pd.read_csv(input_path, usecols=columns)
+
+    def iter_input_chunks(self, input_path: str, chunk_rows: int):
+        """Girdi dosyasını en fazla chunk_rows satırlık DataFrame parçaları olarak oku"""
+        columns = self.input_columns(input_path)
+        yield from iter_file_chunks(input_path, chunk_rows, columns=columns)
+
     def preprocess_dataframe(self, df: pd.DataFrame) -> np.ndarray:
         """DataFrame'i model girdisine dönüştür"""
         # Sayısal özellikleri işle
@@ -103,155 +295,552 @@ class SepsisInferencePipeline:
         else:
             X_combined = X_numerical
         
-        return X_combined
-    
-    def create_patient_sequences(
-        self,
-        patient_data: pd.DataFrame
-    ) -> Tuple[List[np.ndarray], List[int]]:
-        """Bir hasta için kayan pencere sekansları oluştur"""
-        # Preprocessing uygula
-        X_processed = self.preprocess_dataframe(patient_data)
-        
-        sequences = []
-        row_indices = []
-        
-        # Kayan pencereler oluştur
-        for i in range(len(X_processed)):
-            if i < self.window_size - 1:
-                # Yeterli geçmiş yok - None olarak işaretle veya atla
-                sequences.append(None)
-                row_indices.append(i)
-            else:
-                # 6 saatlik pencere
-                start_idx = i - self.window_size + 1
-                end_idx = i + 1
-                sequence = X_processed[start_idx:end_idx]
-                
-                sequences.append(sequence)
-                row_indices.append(i)
-        
-        return sequences, row_indices
-    
-    def predict_patient(self, patient_data: pd.DataFrame) -> pd.DataFrame:
-        """Bir hasta için tahmin yap"""
-        sequences, row_indices = self.create_patient_sequences(patient_data)
-        
-        predictions = []
-        
-        for i, seq in enumerate(sequences):
-            if seq is None:
-                # Yeterli geçmiş yok
-                predictions.append({
-                    'row_index': row_indices[i],
-                    'proba': None,
-                    'yhat': None,
-                    'insufficient_history': True
-                })
-            else:
-                # Model tahmini
-                X_seq = np.expand_dims(seq, axis=0)  # (1, 6, features)
-                risk_score = self.model.predict(X_seq, verbose=0)[0, 0]
-                prediction = 1 if risk_score >= self.threshold else 0
-                
-                predictions.append({
-                    'row_index': row_indices[i],
-                    'proba': float(risk_score),
-                    'yhat': int(prediction),
-                    'insufficient_history': False
-                })
-        
-        return pd.DataFrame(predictions)
+        # Model float32 çalışır; pencereler her batch'te yeniden cast edilmesin
+        return X_combined.astype(np.float32, copy=False)
     
-    def predict_csv(self, input_path: str, output_path: str):
-        """CSV dosyasındaki tüm hastalar için tahmin yap"""
+    def predict_csv(self, input_path: str, output_path: str,
+                    block_rows: int = 100_000) -> RunStatistics:
+        """
+        Girdi dosyasındaki (CSV/Parquet/Feather) tüm hastalar için tahmin yap
+
+        Girdi sıralı olmak zorunda değildir, bu yüzden dosya bir kez belleğe
+        okunur. Hastalar dosyada ilk görülme sırasıyla ve ICULOS sıralı olarak
+        ~block_rows satırlık bloklar halinde score_chunk ile toplu skorlanır;
+        her bloğun sonuçları hemen çıkış dosyasına yazılır ve istatistiklere
+        eklenir, sonuçlar bellekte biriktirilmez. Bellek kullanımının girdi
+        boyutundan bağımsız olması için --chunk-rows (sıralı girdi) kullanın.
+
+        Returns:
+            Çalıştırmanın özet istatistikleri (RunStatistics). Satır bazlı
+            sonuçlar yalnızca output_path'e yazılır; önceki sürümlerdeki gibi
+            DataFrame olarak döndürülmez (gerekirse çıkış dosyasından okuyun).
+        """
         print("\n" + "="*60)
         print("TAHMİN PIPELINE'I BAŞLATILIYOR")
         print("="*60)
         print(f"Giriş dosyası: {input_path}")
         print(f"Çıkış dosyası: {output_path}")
         
-        # Veriyi yükle
-        print(f"\nVeri yükleniyor...")
-        df = pd.read_csv(input_path)
-        print(f"✓ {len(df)} satır yüklendi")
-        
-        # Hasta ID'lerini belirle
-        if 'Patient_ID' not in df.columns:
-            raise ValueError("'Patient_ID' sütunu bulunamadı!")
+        # Veriyi yükle (yalnızca gerekli sütunlar)
+        print(f"\nVeri yükleniyor ({detect_file_format(input_path)})...")
+        df = self.read_input(input_path)
+        print(f"✓ {len(df)} satır, {len(df.columns)} sütun yüklendi")
         
-        patient_ids = df['Patient_ID'].unique()
+        # Hasta sırası: dosyada ilk görülme; hasta içinde ICULOS (kararlı sıralama)
+        patient_codes, patient_ids = pd.factorize(df['Patient_ID'])
         print(f"✓ {len(patient_ids)} benzersiz hasta bulundu")
+        sort_keys = [patient_codes]
+        if 'ICULOS' in df.columns:
+            sort_keys.insert(0, df['ICULOS'].to_numpy())
+        order = np.lexsort(sort_keys)
+        order = order[patient_codes[order] >= 0]
+        sorted_codes = patient_codes[order]
+        patient_starts = np.flatnonzero(self._patient_run_starts(sorted_codes))
+        patient_bounds = np.append(patient_starts, len(order))
         
-        # Her hasta için tahmin yap
         print(f"\nHastalar işleniyor...")
-        all_predictions = []
+        writer = PredictionWriter(output_path)
+        stats = RunStatistics(self.threshold)
         
-        for i, patient_id in enumerate(patient_ids):
-            if (i + 1) % 100 == 0:
-                print(f"  İşlenen: {i+1}/{len(patient_ids)} hasta", end='\r')
-            
-            # Hasta verilerini al
-            patient_mask = df['Patient_ID'] == patient_id
-            patient_df = df[patient_mask].copy()
-            
-            # ICULOS'a göre sırala (varsa)
-            if 'ICULOS' in patient_df.columns:
-                patient_df = patient_df.sort_values('ICULOS')
-            
-            # Tahminleri yap
-            patient_predictions = self.predict_patient(patient_df)
-            
-            # Hasta ID'sini ekle
-            patient_predictions['Patient_ID'] = patient_id
-            
-            # Orijinal satırlarla birleştir için gerekli bilgileri ekle
-            if 'ICULOS' in patient_df.columns:
-                patient_predictions['ICULOS'] = patient_df['ICULOS'].values
-            
-            all_predictions.append(patient_predictions)
+        # Blok sınırları hasta sınırlarına denk gelir
+        block_start = 0
+        while block_start < len(order):
+            target = min(block_start + block_rows, len(order))
+            block_end = patient_bounds[np.searchsorted(patient_bounds, target)]
+            block = df.iloc[order[block_start:block_end]].reset_index(drop=True)
+            results = self.score_chunk(block)
+            writer.write(results)
+            stats.update(results)
+            block_start = block_end
+            print(f"  İşlenen: {stats.total_rows:,}/{len(order):,} satır", end='\r')
+        writer.close()
         
         print(f"\n✓ Tüm hastalar işlendi")
-        
-        # Tüm tahminleri birleştir
-        results_df = pd.concat(all_predictions, ignore_index=True)
-        
-        # Sonuçları kaydet
-        results_df.to_csv(output_path, index=False)
         print(f"\n✓ Tahminler kaydedildi: {output_path}")
         
-        # İstatistikler
-        valid_predictions = results_df[~results_df['insufficient_history']]
-        if len(valid_predictions) > 0:
-            print(f"\nTahmin İstatistikleri:")
-            print(f"  Toplam satır: {len(results_df):,}")
-            print(f"  Geçerli tahmin: {len(valid_predictions):,}")
-            print(f"  Yetersiz geçmiş: {results_df['insufficient_history'].sum():,}")
-            print(f"  Ortalama risk skoru: {valid_predictions['proba'].mean():.4f}")
-            print(f"  Pozitif tahminler: {valid_predictions['yhat'].sum():,} ({100*valid_predictions['yhat'].mean():.2f}%)")
-            print(f"  Risk skoru dağılımı:")
-            print(f"    Min:  {valid_predictions['proba'].min():.4f}")
-            print(f"    25%:  {valid_predictions['proba'].quantile(0.25):.4f}")
-            print(f"    50%:  {valid_predictions['proba'].quantile(0.50):.4f}")
-            print(f"    75%:  {valid_predictions['proba'].quantile(0.75):.4f}")
-            print(f"    Max:  {valid_predictions['proba'].max():.4f}")
+        # İstatistikler (blok bazında online hesaplandı)
+        stats.print_report()
+        stats.save(stats_sidecar_path(output_path))
+        print(f"✓ İstatistikler kaydedildi: {stats_sidecar_path(output_path)}")
         
-        return results_df
-    
-    def run(self, input_path: str, output_path: str):
-        """Tam pipeline'ı çalıştır"""
+        return stats
+
+    @staticmethod
+    def _patient_run_starts(patient_ids: np.ndarray) -> np.ndarray:
+        """Ardışık hasta bloklarının başladığı satırları işaretle"""
+        is_start = np.ones(len(patient_ids), dtype=bool)
+        is_start[1:] = patient_ids[1:] != patient_ids[:-1]
+        return is_start
+
+    def _validate_chunk_order(self, chunk: pd.DataFrame):
+        """
+        Streaming modu için satırların Patient_ID ve ICULOS sıralı olduğunu doğrula
+
+        Parçanın başına bir önceki parçanın son satırı eklenmiş olarak verilir;
+        böylece yalnızca tek satır tutulur ve kontrolün belleği hasta sayısıyla
+        büyümez. Sıralı girdide bir hastanın satırları ardışıktır ve daha sonra
+        tekrar görülemez.
+        """
+        patient_ids = chunk['Patient_ID'].to_numpy()
+        is_start = self._patient_run_starts(patient_ids)
+        run_patient_ids = patient_ids[is_start]
+
+        if np.any(run_patient_ids[1:] < run_patient_ids[:-1]):
+            raise ValueError(
+                "Streaming modu için girdi Patient_ID'ye göre sıralı olmalı "
+                "(Patient_ID, ICULOS). Dosyayı sıralayın veya "
+                "--chunk-rows olmadan çalıştırın."
+            )
+
+        if 'ICULOS' in chunk.columns:
+            iculos_diff = np.diff(chunk['ICULOS'].to_numpy())
+            if np.any(iculos_diff[~is_start[1:]] < 0):
+                raise ValueError(
+                    "Streaming modu için her hastanın satırları ICULOS'a göre "
+                    "sıralı olmalı."
+                )
+
+    def _chunk_row_index(
+        self,
+        patient_ids: np.ndarray,
+        first_row_offset: int = 0,
+        n_context: int = 0
+    ) -> np.ndarray:
+        """Parçadaki her satırın hasta içindeki indeksi (row_index)"""
+        is_start = self._patient_run_starts(patient_ids)
+        run_starts = np.flatnonzero(is_start)
+        run_id = np.cumsum(is_start) - 1
+        row_index = np.arange(len(patient_ids)) - run_starts[run_id]
+        row_index[run_id == 0] += first_row_offset - n_context
+        return row_index
+
+    def score_chunk(
+        self,
+        chunk: pd.DataFrame,
+        first_row_offset: int = 0,
+        n_context: int = 0
+    ) -> pd.DataFrame:
+        """
+        Hasta bazlı gruplanmış bir veri parçasını toplu olarak skorla
+
+        Args:
+            chunk: Hasta satırları ardışık ve ICULOS sıralı veri parçası
+            first_row_offset: İlk hastanın önceki parçalarda skorlanmış satır sayısı
+            n_context: Parçanın başındaki, yalnızca bağlam olarak taşınan
+                (önceden skorlanmış) satır sayısı
+
+        Returns:
+            row_index, proba, yhat, insufficient_history, Patient_ID (ve varsa
+            ICULOS) sütunlarıyla, bağlam satırları hariç sonuçlar
+        """
+        patient_ids = chunk['Patient_ID'].to_numpy()
+        n_rows = len(chunk)
+        row_index = self._chunk_row_index(patient_ids, first_row_offset, n_context)
+
+        emit = np.arange(n_rows) >= n_context
+        valid = emit & (row_index >= self.window_size - 1)
+
+        proba = np.full(n_rows, np.nan)
+        end_rows = np.flatnonzero(valid)
+        if len(end_rows) > 0:
+            # Pencereler parça içinde kopyalanmadan görünüm olarak oluşturulur
+            X_processed = self.preprocess_dataframe(chunk)
+            windows = np.lib.stride_tricks.sliding_window_view(
+                X_processed, (self.window_size, X_processed.shape[1])
+            )[:, 0]
+        for start in range(0, len(end_rows), self.batch_size):
+            batch_rows = end_rows[start:start + self.batch_size]
+            X_seq = windows[batch_rows - self.window_size + 1]
+            proba[batch_rows] = np.asarray(self.model.predict_on_batch(X_seq))[:, 0]
+
+        # predict_csv çıktısıyla aynı biçim: geçmişi yetersiz satırlarda NaN
+        yhat = np.where(valid, (proba >= self.threshold).astype(float), np.nan)
+
+        results = pd.DataFrame({
+            'row_index': row_index[emit],
+            'proba': proba[emit],
+            'yhat': yhat[emit],
+            'insufficient_history': ~valid[emit],
+            'Patient_ID': patient_ids[emit]
+        })
+        if 'ICULOS' in chunk.columns:
+            results['ICULOS'] = chunk['ICULOS'].to_numpy()[emit]
+
+        return results
+
+    def predict_csv_streaming(
+        self,
+        input_path: str,
+        output_path: str,
+        chunk_rows: int = 100_000,
+        resume: bool = False
+    ) -> RunStatistics:
+        """
+        Girdi dosyasını parça parça okuyarak tahmin yap (bellek sınırlı mod)
+
+        Girdi Patient_ID ve her hasta içinde ICULOS sıralı olmalı.
+        Parça sınırında bölünen hastanın son window_size-1 satırı bir sonraki
+        parçaya bağlam olarak taşınır. Her parçanın sonuçları part dosyası
+        olarak commit edilir; resume=True ile commit edilmiş parçalar yeniden
+        skorlanmaz. Özet istatistikleri (RunStatistics) döndürür.
+        """
+        print("\n" + "="*60)
+        print("TAHMİN PIPELINE'I BAŞLATILIYOR (STREAMING)")
+        print("="*60)
+        print(f"Giriş dosyası: {input_path}")
+        print(f"Çıkış dosyası: {output_path}")
+        print(f"Parça boyutu: {chunk_rows:,} satır")
+
+        checkpoint = RunCheckpoint(output_path)
+        checkpoint.start(self.run_fingerprint(input_path, output_path, chunk_rows, 1), resume)
+        summary = self.stream_shard(input_path, checkpoint, chunk_rows=chunk_rows, verbose=True)
+        stats = summary['stats']
+
+        concat_part_files(checkpoint.part_paths(0), output_path)
+        checkpoint.cleanup()
+        print(f"✓ Tahminler kaydedildi: {output_path}")
+
+        stats.print_report()
+        stats.save(stats_sidecar_path(output_path))
+        print(f"✓ İstatistikler kaydedildi: {stats_sidecar_path(output_path)}")
+
+        return stats
+
+    def stream_shard(
+        self,
+        input_path: str,
+        checkpoint: 'RunCheckpoint',
+        shard_index: int = 0,
+        n_shards: int = 1,
+        chunk_rows: int = 100_000,
+        verbose: bool = False
+    ) -> dict:
+        """
+        Sıralı girdiyi parça parça okuyarak bir hasta shard'ını skorla (bellek sınırlı)
+
+        Girdi Patient_ID ve her hasta içinde ICULOS sıralı olmalı. Her parçadan
+        yalnızca bu shard'a düşen hastaların satırları skorlanır ve part dosyası
+        olarak commit edilir; bellek kullanımı chunk_rows ile sınırlıdır. Parça
+        sınırında bölünen hastanın son window_size-1 satırı bir sonraki parçaya
+        bağlam olarak taşınır. n_shards > 1 ise birleştirme için dosyadaki hasta
+        sırası '_patient_order' sütununa yazılır. Commit edilmiş parçalar
+        yalnızca bağlam durumu için yeniden okunur, yeniden skorlanmaz.
+        """
+        progress = checkpoint.load_progress(shard_index)
+        committed = progress['parts']
+        stats = RunStatistics(self.threshold)
+        for record in committed:
+            stats.merge(RunStatistics.from_dict(record['stats']))
+        summary = {'patients': 0, 'stats': stats, 'resumed_blocks': len(committed)}
+        if progress['complete']:
+            return summary
+        if committed and verbose:
+            print(f"✓ Devam ediliyor: {len(committed)} parça daha önce commit edilmiş")
+        last_committed_chunk = committed[-1].get('chunk', len(committed)) if committed else 0
+
+        n_carry = self.window_size - 1
+        n_parts = len(committed)
+        context = None
+        context_patient = None
+        context_offset = 0
+        boundary_row = None
+        next_order = 0
+
+        for chunk_no, chunk in enumerate(self.iter_input_chunks(input_path, chunk_rows), 1):
+            # Sıra kontrolü tüm parça üzerinde, önceki parçanın son satırıyla birlikte
+            if boundary_row is not None:
+                self._validate_chunk_order(pd.concat([boundary_row, chunk], ignore_index=True))
+                continues = chunk['Patient_ID'].iloc[0] == boundary_row['Patient_ID'].iloc[0]
+            else:
+                self._validate_chunk_order(chunk)
+                continues = False
+            boundary_row = chunk.iloc[-1:].copy()
+
+            # Hastaların dosyadaki sırası (shard'lar arası birleştirme anahtarı)
+            patient_ids = chunk['Patient_ID'].to_numpy()
+            is_start = self._patient_run_starts(patient_ids)
+            run_id = np.cumsum(is_start) - 1
+            patient_order = run_id + next_order - int(continues)
+            next_order = int(patient_order[-1]) + 1
+
+            if n_shards > 1:
+                run_shards = np.array(
+                    [patient_shard(pid, n_shards) for pid in patient_ids[is_start]], dtype=int
+                )
+                mine = run_shards[run_id] == shard_index
+                chunk = chunk[mine]
+                patient_order = patient_order[mine]
+                if len(chunk) == 0:
+                    continue
+
+            # Önceki parçadan devam eden hastanın bağlam satırlarını ekle
+            n_context = 0
+            first_row_offset = 0
+            if context is not None and chunk['Patient_ID'].iloc[0] == context_patient:
+                n_context = len(context)
+                first_row_offset = context_offset
+                chunk = pd.concat([context, chunk], ignore_index=True)
+
+            row_index = self._chunk_row_index(
+                chunk['Patient_ID'].to_numpy(), first_row_offset, n_context
+            )
+            summary['patients'] += int(np.sum(row_index[n_context:] == 0))
+
+            if chunk_no > last_committed_chunk:
+                results = self.score_chunk(chunk, first_row_offset, n_context)
+                if n_shards > 1:
+                    results['_patient_order'] = patient_order.astype('int64')
+                part_stats = RunStatistics(self.threshold).update(results)
+                checkpoint.commit_part(shard_index, n_parts, results, part_stats.to_dict(),
+                                       chunk=chunk_no)
+                n_parts += 1
+                stats.merge(part_stats)
+
+            # Son hasta bir sonraki parçada devam edebilir
+            context_patient = chunk['Patient_ID'].iloc[-1]
+            context_offset = int(row_index[-1]) + 1
+            n_keep = min(n_carry, context_offset)
+            context = chunk.iloc[len(chunk) - n_keep:].copy()
+
+            if verbose:
+                print(f"  Parça {chunk_no}: {stats.total_rows:,} satır yazıldı "
+                      f"(peak RSS: {format_mb(peak_rss_mb())})", end='\r')
+
+        checkpoint.mark_complete(shard_index)
+        if verbose:
+            print(f"\n✓ Tüm parçalar işlendi")
+        return summary
+
+    def score_shard(
+        self,
+        input_path: str,
+        checkpoint: 'RunCheckpoint',
+        shard_index: int,
+        n_shards: int,
+        chunk_rows: int = 100_000
+    ) -> dict:
+        """
+        Bir hasta shard'ını skorla ve sonuçları part dosyaları olarak commit et
+
+        Sırasız girdiler için: girdi parça parça okunur, yalnızca bu shard'a
+        düşen hastaların satırları tutulur. Shard'ın tamamı bellekte tutulduğundan
+        bellek kullanımı shard boyutuyla büyür (bellek sınırlı mod için sıralı
+        girdiyle stream_shard kullanılır). Hastalar predict_csv ile aynı sırada
+        (dosyada ilk görülme) ve aynı ICULOS sıralamasıyla, ~chunk_rows satırlık bloklar halinde işlenir;
+        her satıra birleştirme için '_patient_order' sütunu eklenir. Daha önce
+        commit edilmiş bloklar atlanır.
+        """
+        committed = checkpoint.load_progress(shard_index)['parts']
+        stats = RunStatistics(self.threshold)
+        for record in committed:
+            stats.merge(RunStatistics.from_dict(record['stats']))
+
+        patient_order = {}
+        shard_frames = []
+        for chunk in self.iter_input_chunks(input_path, chunk_rows):
+            codes, uniques = pd.factorize(chunk['Patient_ID'])
+            for patient_id in uniques:
+                patient_order.setdefault(patient_id, len(patient_order))
+            shards = np.array([patient_shard(pid, n_shards) for pid in uniques], dtype=int)
+            shard_frames.append(chunk[shards[codes] == shard_index])
+
+        shard_df = pd.concat(shard_frames, ignore_index=True)
+        n_patients = 0
+        n_blocks = 0
+
+        def flush(block_frames):
+            if n_blocks < len(committed):
+                return
+            block = pd.concat(block_frames, ignore_index=True)
+            results = self.score_chunk(block)
+            results['_patient_order'] = results['Patient_ID'].map(patient_order).astype('int64')
+            part_stats = RunStatistics(self.threshold).update(results)
+            checkpoint.commit_part(shard_index, n_blocks, results, part_stats.to_dict())
+            stats.merge(part_stats)
+
+        block_frames = []
+        block_rows = 0
+        for _, patient_df in shard_df.groupby('Patient_ID', sort=False):
+            # predict_csv ile aynı sıralama
+            if 'ICULOS' in patient_df.columns:
+                patient_df = patient_df.sort_values('ICULOS')
+            block_frames.append(patient_df)
+            block_rows += len(patient_df)
+            n_patients += 1
+            if block_rows >= chunk_rows:
+                flush(block_frames)
+                n_blocks += 1
+                block_frames, block_rows = [], 0
+        if block_frames:
+            flush(block_frames)
+            n_blocks += 1
+
+        checkpoint.mark_complete(shard_index)
+        return {'patients': n_patients, 'stats': stats, 'resumed_blocks': len(committed)}
+
+    def predict_parallel(
+        self,
+        input_path: str,
+        output_path: str,
+        n_workers: int,
+        chunk_rows: int = None,
+        resume: bool = False
+    ) -> RunStatistics:
+        """
+        Hastaları n_workers shard'a bölerek paralel tahmin yap
+
+        Her worker süreci modeli bir kez yükler, girdiyi kendisi okur ve kendi
+        shard'ını part dosyalarına commit eder; girdi her worker'da ayrıca
+        ayrıştırılır. chunk_rows verilirse girdi Patient_ID + ICULOS sıralı
+        olmalıdır ve worker'lar parça parça skorlar (stream_shard, bellek
+        chunk_rows ile sınırlı). Verilmezse sırasız girdi kabul edilir ancak
+        her worker kendi shard'ının tamamını bellekte tutar (score_shard). Part
+        dosyaları, tek süreçli çıktıyla aynı satır sırasında çıkış dosyasında
+        birleştirilir. resume=True ile tamamlanmış shard'lar ve commit edilmiş
+        bloklar atlanır. Tüm shard'ların birleşik istatistiklerini (RunStatistics)
+        döndürür.
+        """
+        print("\n" + "="*60)
+        print(f"TAHMİN PIPELINE'I BAŞLATILIYOR ({n_workers} WORKER)")
+        print("="*60)
+        print(f"Giriş dosyası: {input_path}")
+        print(f"Çıkış dosyası: {output_path}")
+
+        checkpoint = RunCheckpoint(output_path)
+        checkpoint.start(
+            self.run_fingerprint(input_path, output_path, chunk_rows, n_workers), resume
+        )
+        # Thread bütçesi (intra-op ayarı veya bağlı çekirdekler) worker'lar arasında bölünür
+        total_threads = cpu_config.ACTIVE.get('intra_op_threads') or cpu_config.usable_cpus()
+        threads_per_worker = max(1, total_threads // n_workers)
+        inter_threads = cpu_config.ACTIVE.get('inter_op_threads')
+
+        stats = RunStatistics(self.threshold)
+        tasks = []
+        for shard in range(n_workers):
+            progress = checkpoint.load_progress(shard)
+            if progress['complete']:
+                for record in progress['parts']:
+                    stats.merge(RunStatistics.from_dict(record['stats']))
+                print(f"  Shard {shard + 1}/{n_workers} daha önce tamamlanmış, atlanıyor")
+                continue
+            tasks.append({
+                'model_path': self.model_path,
+                'preprocessing_dir': self.preprocessing_dir,
+                'window_size': self.window_size,
+                'threshold': self.threshold,
+                'batch_size': self.batch_size,
+                'jit_compile': self.jit_compile,
+                'unroll': self.unroll,
+                'input_path': input_path,
+                'output_path': output_path,
+                'shard_index': shard,
+                'n_shards': n_workers,
+                'streaming': chunk_rows is not None,
+                'chunk_rows': chunk_rows or 100_000,
+                'threads': threads_per_worker,
+                'inter_threads': inter_threads
+            })
+
+        print(f"\nShard'lar işleniyor ({threads_per_worker} thread/worker)...")
+        start = time.perf_counter()
+        if tasks:
+            # spawn edilen worker'lar OpenMP/MKL ayarını ortamdan import sırasında okur
+            for env_var in cpu_config.OMP_ENV_VARS:
+                os.environ[env_var] = str(threads_per_worker)
+            with mp.get_context('spawn').Pool(processes=len(tasks)) as pool:
+                for done, summary in enumerate(pool.imap_unordered(_score_shard_worker, tasks), 1):
+                    stats.merge(summary['stats'])
+                    rows = summary['stats'].total_rows
+                    resumed = (f", {summary['resumed_blocks']} blok devralındı"
+                               if summary['resumed_blocks'] else "")
+                    print(f"  Shard {summary['shard'] + 1}/{n_workers} tamamlandı "
+                          f"[{done}/{len(tasks)}]: {summary['patients']:,} hasta, {rows:,} satır, "
+                          f"{summary['seconds']:.1f} s "
+                          f"({rows / max(summary['seconds'], 1e-9):,.0f} satır/s{resumed})")
+        elapsed = time.perf_counter() - start
+        print(f"✓ Tüm shard'lar işlendi: {stats.total_rows:,} satır, {elapsed:.1f} s "
+              f"({stats.total_rows / max(elapsed, 1e-9):,.0f} satır/s)")
+
+        print(f"\nPart dosyaları birleştiriliyor...")
+        merge_part_files(
+            [checkpoint.part_paths(shard) for shard in range(n_workers)],
+            output_path,
+            chunk_rows or 100_000
+        )
+        checkpoint.cleanup()
+        print(f"✓ Tahminler kaydedildi: {output_path}")
+
+        stats.print_report()
+        stats.save(stats_sidecar_path(output_path))
+        print(f"✓ İstatistikler kaydedildi: {stats_sidecar_path(output_path)}")
+
+        return stats
+
+    def run_fingerprint(
+        self,
+        input_path: str,
+        output_path: str,
+        chunk_rows: int,
+        n_workers: int
+    ) -> dict:
+        """Devam ettirilebilirlik için çalıştırmayı tanımlayan girdi/model/parametre özeti"""
+        preprocessing_files = [
+            os.path.join(self.preprocessing_dir, name)
+            for name in ['imputer.pkl', 'scaler.pkl', 'ohe.pkl', 'column_info.pkl']
+        ]
+        return {
+            'input_sha256': file_sha256([input_path]),
+            'model_sha256': file_sha256([self.model_path]),
+            'preprocessing_sha256': file_sha256(
+                [path for path in preprocessing_files if os.path.exists(path)]
+            ),
+            'window_size': self.window_size,
+            'threshold': self.threshold,
+            'chunk_rows': chunk_rows,
+            'n_workers': n_workers,
+            'output_format': detect_file_format(output_path)
+        }
+
+    def run(
+        self,
+        input_path: str,
+        output_path: str,
+        chunk_rows: int = None,
+        n_workers: int = 1,
+        resume: bool = False
+    ) -> RunStatistics:
+        """
+        Tam pipeline'ı çalıştır
+
+        Tahminler output_path'e, istatistikler <output>.stats.json'a yazılır.
+        Her modda (varsayılan, --chunk-rows, --workers) özet istatistikler
+        (RunStatistics) döndürülür; satır bazlı sonuç DataFrame'i döndürülmez.
+        """
+        if resume and n_workers <= 1 and not chunk_rows:
+            raise ValueError("--resume yalnızca --chunk-rows veya --workers ile kullanılabilir")
+
         start_time = datetime.now()
         print("="*60)
         print("GRU SEPSIS TAHMİN SİSTEMİ - İNFERENCE v23")
         print("="*60)
         print(f"Başlangıç: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # Model ve preprocessing nesnelerini yükle
-        self.load_model()
-        self.load_preprocessing_objects()
-        
-        # Tahminleri yap
-        results = self.predict_csv(input_path, output_path)
+        if n_workers > 1:
+            # Paralel modda model her worker sürecinde ayrıca yüklenir
+            results = self.predict_parallel(
+                input_path, output_path, n_workers, chunk_rows, resume
+            )
+        else:
+            # Model ve preprocessing nesnelerini yükle
+            self.load_model()
+            self.load_preprocessing_objects()
+            
+            # Tahminleri yap
+            if chunk_rows:
+                results = self.predict_csv_streaming(input_path, output_path, chunk_rows, resume)
+            else:
+                results = self.predict_csv(input_path, output_path)
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -261,10 +850,215 @@ class SepsisInferencePipeline:
         print("="*60)
         print(f"Bitiş: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Süre: {duration:.2f} saniye")
+        print(f"Peak bellek (RSS): {format_mb(peak_rss_mb())}")
         
         return results
 
 
+class RunCheckpoint:
+    """
+    Kesintiye dayanıklı batch çalıştırmaların durumu (<output>.parts/ dizini)
+
+    - manifest.json: girdi, model ve preprocessing hash'leri ile parametreler
+    - progress-XXXXX.json: her shard için commit edilmiş part dosyaları,
+      kapsadıkları hasta aralığı ve istatistikleri
+
+    Part dosyaları önce geçici adla yazılıp atomik olarak yeniden adlandırılır,
+    ardından progress dosyası güncellenir. Progress'te kayıtlı olmayan part
+    dosyaları yarım kalmış sayılır ve devam ederken silinir.
+    """
+
+    def __init__(self, output_path: str):
+        self.parts_dir = output_path + '.parts'
+        self.part_ext = os.path.splitext(output_path)[1] or '.csv'
+        self.manifest_path = os.path.join(self.parts_dir, 'manifest.json')
+
+    def start(self, fingerprint: dict, resume: bool):
+        """Yeni çalıştırma başlat veya mevcut olana devam et"""
+        if resume and os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            changed = [
+                key for key in fingerprint
+                if manifest['fingerprint'].get(key) != fingerprint[key]
+            ]
+            if changed:
+                raise ValueError(
+                    f"Önceki çalıştırmaya devam edilemez, değişenler: {changed}. "
+                    "--resume olmadan yeniden başlatın."
+                )
+            print(f"✓ Checkpoint bulundu: {self.parts_dir}")
+            return
+
+        if os.path.exists(self.parts_dir):
+            shutil.rmtree(self.parts_dir)
+        os.makedirs(self.parts_dir)
+        write_json_atomic(self.manifest_path, {
+            'fingerprint': fingerprint,
+            'created': datetime.now().isoformat(timespec='seconds')
+        })
+
+    def _progress_path(self, shard: int) -> str:
+        return os.path.join(self.parts_dir, f"progress-{shard:05d}.json")
+
+    def part_name(self, shard: int, seq: int) -> str:
+        return f"part-{shard:05d}-{seq:06d}{self.part_ext}"
+
+    def _read_progress(self, shard: int) -> dict:
+        if not os.path.exists(self._progress_path(shard)):
+            return {'parts': [], 'complete': False}
+        with open(self._progress_path(shard)) as f:
+            return json.load(f)
+
+    def load_progress(self, shard: int) -> dict:
+        """Shard'ın commit edilmiş part kayıtlarını yükle, yarım kalanları temizle"""
+        progress = self._read_progress(shard)
+
+        committed = {record['file'] for record in progress['parts']}
+        prefix = f"part-{shard:05d}-"
+        for name in os.listdir(self.parts_dir):
+            if name.startswith((prefix, '.tmp-' + prefix)) and name not in committed:
+                os.remove(os.path.join(self.parts_dir, name))
+        return progress
+
+    def commit_part(self, shard: int, seq: int, results: pd.DataFrame, stats: dict,
+                    chunk: int = None):
+        """Bir sonuç bloğunu part dosyası olarak atomik şekilde commit et (chunk: girdi parçası no)"""
+        name = self.part_name(shard, seq)
+        tmp_path = os.path.join(self.parts_dir, f".tmp-{name}")
+        writer = PredictionWriter(tmp_path)
+        writer.write(results)
+        writer.close()
+        os.replace(tmp_path, os.path.join(self.parts_dir, name))
+
+        patient_ids = results['Patient_ID']
+        progress = self._read_progress(shard)
+        progress['parts'].append({
+            'file': name,
+            'rows': len(results),
+            'patients': int(patient_ids.nunique()),
+            'first_patient': _json_value(patient_ids.iloc[0]),
+            'last_patient': _json_value(patient_ids.iloc[-1]),
+            'stats': stats
+        })
+        if chunk is not None:
+            progress['parts'][-1]['chunk'] = chunk
+        write_json_atomic(self._progress_path(shard), progress)
+
+    def mark_complete(self, shard: int):
+        progress = self._read_progress(shard)
+        progress['complete'] = True
+        write_json_atomic(self._progress_path(shard), progress)
+
+    def part_paths(self, shard: int) -> List[str]:
+        progress = self._read_progress(shard)
+        return [os.path.join(self.parts_dir, record['file']) for record in progress['parts']]
+
+    def cleanup(self):
+        """Çıkış dosyası birleştirildikten sonra checkpoint dizinini sil"""
+        shutil.rmtree(self.parts_dir)
+
+
+def _json_value(value):
+    """NumPy skalerlerini JSON'a yazılabilir Python tiplerine dönüştür"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _score_shard_worker(task: dict) -> dict:
+    """Worker süreci: modeli bir kez yükle ve bir hasta shard'ını skorla"""
+    start = time.perf_counter()
+    cpu_config.set_tf_threads(task['threads'], task['inter_threads'])
+
+    pipeline = SepsisInferencePipeline(
+        model_path=task['model_path'],
+        preprocessing_dir=task['preprocessing_dir'],
+        window_size=task['window_size'],
+        threshold=task['threshold'],
+        batch_size=task['batch_size'],
+        jit_compile=task['jit_compile'],
+        unroll=task['unroll']
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.load_model()
+        pipeline.load_preprocessing_objects()
+
+    # Sıralı girdi (--chunk-rows): parça parça, bellek sınırlı; aksi halde shard bellekte
+    score = pipeline.stream_shard if task['streaming'] else pipeline.score_shard
+    summary = score(
+        task['input_path'],
+        RunCheckpoint(task['output_path']),
+        task['shard_index'],
+        task['n_shards'],
+        task['chunk_rows']
+    )
+    summary['shard'] = task['shard_index']
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def _iter_part_groups(part_paths: List[str], chunk_rows: int):
+    """Bir shard'ın part dosyalarını (_patient_order, hasta sonuçları) çiftleri olarak oku"""
+    pending = None
+    for part_path in part_paths:
+        # CSV part'ları metin olarak okunur; böylece birleştirilmiş çıktı birebir aynı yazılır
+        csv_dtype = None
+        if detect_file_format(part_path) == 'csv':
+            columns = read_file_columns(part_path)
+            csv_dtype = {col: str for col in columns if col != '_patient_order'}
+            csv_dtype['_patient_order'] = 'int64'
+
+        for chunk in iter_file_chunks(part_path, chunk_rows, csv_dtype=csv_dtype):
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+            order = chunk['_patient_order'].to_numpy()
+            is_last = order == order[-1]
+            for key, group in chunk[~is_last].groupby('_patient_order', sort=False):
+                yield key, group
+            pending = chunk[is_last]
+
+    if pending is not None and len(pending) > 0:
+        yield pending['_patient_order'].iloc[0], pending
+
+
+def merge_part_files(shard_part_paths: List[List[str]], output_path: str, chunk_rows: int = 100_000):
+    """Hasta sırasına göre sıralı shard part dosyalarını k-yollu birleştir"""
+    writer = PredictionWriter(output_path)
+    buffer, buffer_rows = [], 0
+
+    groups = heapq.merge(
+        *[_iter_part_groups(paths, chunk_rows) for paths in shard_part_paths],
+        key=lambda item: item[0]
+    )
+    for _, group in groups:
+        buffer.append(group)
+        buffer_rows += len(group)
+        if buffer_rows >= chunk_rows:
+            writer.write(pd.concat(buffer, ignore_index=True).drop(columns='_patient_order'))
+            buffer, buffer_rows = [], 0
+    if buffer:
+        writer.write(pd.concat(buffer, ignore_index=True).drop(columns='_patient_order'))
+    writer.close()
+
+
+def concat_part_files(part_paths: List[str], output_path: str):
+    """Sıralı part dosyalarını tek çıkış dosyasında uç uca ekle"""
+    if detect_file_format(output_path) == 'csv':
+        # CSV: başlık yalnızca ilk part'tan, geri kalanı bayt olarak kopyalanır
+        with open(output_path, 'wb') as out:
+            for i, part_path in enumerate(part_paths):
+                with open(part_path, 'rb') as f:
+                    if i > 0:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
+        return
+
+    writer = PredictionWriter(output_path)
+    for part_path in part_paths:
+        for chunk in iter_file_chunks(part_path, 1_000_000):
+            writer.write(chunk)
+    writer.close()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Eğitilmiş GRU modeli ile sepsis tahmini yap'
@@ -273,13 +1067,13 @@ def main():
         '--input',
         type=str,
         required=True,
-        help='Giriş CSV dosyası'
+        help='Giriş dosyası (.csv, .parquet veya .feather)'
     )
     parser.add_argument(
         '--output',
         type=str,
         default='predictions_gru_v23.csv',
-        help='Çıkış CSV dosyası'
+        help='Çıkış dosyası (.csv, .parquet veya .feather; skorlar float32)'
     )
     parser.add_argument(
         '--model',
@@ -305,21 +1099,66 @@ def main():
         default=6,
         help='Sekans pencere boyutu (varsayılan: 6)'
     )
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        default=None,
+        help='Streaming modu: girdiyi bu kadar satırlık parçalarla oku '
+             '(girdi Patient_ID + ICULOS sıralı olmalı)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1024,
+        help='Streaming modunda tahmin batch boyutu (varsayılan: 1024)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Paralel worker süreci sayısı; hastalar hash ile shard\'lara bölünür '
+             '(varsayılan: 1)'
+    )
+    parser.add_argument(
+        '--jit-compile',
+        action='store_true',
+        help='Tahmin adımını XLA ile derle (CPU\'da op başına ek yükü azaltır)'
+    )
+    parser.add_argument(
+        '--unroll',
+        action='store_true',
+        help='GRU döngüsünü açarak tahmin yap (kısa, sabit pencereler için)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Yarıda kalan --chunk-rows/--workers çalıştırmasına <output>.parts '
+             'checkpoint\'ından devam et'
+    )
+    cpu_config.add_arguments(parser)
     
     args = parser.parse_args()
+    cpu_settings = cpu_config.apply(cpu_config.resolve(args))
+    print(f"CPU: {cpu_config.describe(cpu_settings)}")
     
     # Pipeline oluştur
     pipeline = SepsisInferencePipeline(
         model_path=args.model,
         preprocessing_dir=args.preprocessing,
         window_size=args.window,
-        threshold=args.threshold
+        threshold=args.threshold,
+        batch_size=args.batch_size,
+        jit_compile=args.jit_compile,
+        unroll=args.unroll
     )
     
     # Çalıştır
     pipeline.run(
         input_path=args.input,
-        output_path=args.output
+        output_path=args.output,
+        chunk_rows=args.chunk_rows,
+        n_workers=args.workers,
+        resume=args.resume
     )
 
 
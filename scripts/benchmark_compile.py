@@ -0,0 +1,185 @@
+"""
+XLA / GRU Unroll Karşılaştırması
+================================
+
+GRUSepsisModel'i dört çalıştırma yapılandırmasında (default, xla, unroll,
+xla+unroll) ölçer ve örnek/sn olarak raporlar:
+
+- eğitim: model.fit, train_gru_v23 ile aynı WindowBatchSequence ->
+  sequence_dataset yolu (class_weight'siz, yalnızca tam batch'ler)
+- tahmin: predict_on_batch (--predict-batch-size, toplu skorlama)
+- tek pencere: batch boyutu 1 ile gecikme (ms), tek pencerelik serving yolu
+
+Her yapılandırma için ilk adım (XLA derlemesi dahil) ayrıca raporlanır ve
+ölçüme katılmaz. --data verilirse train split'inden ilk --samples pencere
+kullanılır, verilmezse aynı şekilde sentetik veri üretilir. CPU iş parçacığı
+seçenekleri (--intra-op-threads vb., bkz. cpu_config.py) desteklenir;
+scripts/tune_threads.py bu script'i farklı ayarlarla alt süreç olarak çalıştırır.
+
+Kullanım:
+    python scripts/benchmark_compile.py
+    python scripts/benchmark_compile.py --data data/processed/ --configs default xla+unroll --output bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cpu_config
+
+if __name__ == '__main__':
+    # Thread ayarları TensorFlow ve OpenMP/MKL yüklenmeden uygulanmalı
+    cpu_config.apply_from_argv()
+
+import numpy as np
+
+from model_runtime import describe
+from sequence_store import load_split
+from train_gru_v23 import GRUSepsisModel, WindowBatchSequence, sequence_dataset
+
+CONFIGS = {
+    'default': (False, False),
+    'xla': (True, False),
+    'unroll': (False, True),
+    'xla+unroll': (True, True),
+}
+
+
+def load_inputs(args):
+    """Ölçüm verisi: hazırlanmış train split'inin başı veya sentetik pencereler"""
+    if args.data:
+        X, y = load_split(args.data, 'train', mmap_mode='r')
+        n = min(args.samples, len(y))
+        return np.asarray(X[:n]), np.asarray(y[:n], dtype=np.float32)
+
+    rng = np.random.default_rng(42)
+    X = rng.standard_normal((args.samples, args.window, args.features)).astype(np.float32)
+    y = (rng.random(args.samples) < 0.02).astype(np.float32)
+    return X, y
+
+
+def batches(n: int, batch_size: int):
+    """Tam batch'lerin başlangıçları (XLA her yeni şekli yeniden derler)"""
+    return range(0, n - batch_size + 1, batch_size)
+
+
+def run_config(name: str, X: np.ndarray, y: np.ndarray, args) -> dict:
+    """Bir yapılandırmada eğitim, toplu tahmin ve tek pencere gecikmesini ölç"""
+    jit_compile, unroll = CONFIGS[name]
+    gru_model = GRUSepsisModel(
+        input_shape=X.shape[1:],
+        gru_units=args.gru_units,
+        dense_units=args.dense_units,
+        unroll=unroll
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        gru_model.build_model()
+        gru_model.compile_model(jit_compile=jit_compile)
+    model = gru_model.model
+    result = {'config': describe(jit_compile, unroll)}
+
+    # Eğitim betiğinin Sequence yolu; tam batch'ler XLA'nın yeniden derlemesini önler
+    n_train = len(batches(len(y), args.batch_size)) * args.batch_size
+    train_data = sequence_dataset(
+        WindowBatchSequence(X[:n_train], y[:n_train], args.batch_size, shuffle=True), X.shape[1:]
+    )
+    first_batch = sequence_dataset(
+        WindowBatchSequence(X[:args.batch_size], y[:args.batch_size], args.batch_size), X.shape[1:]
+    )
+    start = time.perf_counter()
+    model.fit(first_batch, verbose=0)
+    result['train_first_step_s'] = time.perf_counter() - start
+    start = time.perf_counter()
+    model.fit(train_data, epochs=args.epochs, verbose=0)
+    seconds = time.perf_counter() - start
+    result['train_samples_per_s'] = args.epochs * n_train / seconds
+
+    predict_starts = batches(len(y), args.predict_batch_size)
+    start = time.perf_counter()
+    model.predict_on_batch(X[:args.predict_batch_size])
+    result['predict_first_step_s'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in predict_starts:
+        model.predict_on_batch(X[i:i + args.predict_batch_size])
+    seconds = time.perf_counter() - start
+    result['predict_samples_per_s'] = len(predict_starts) * args.predict_batch_size / seconds
+
+    model.predict_on_batch(X[:1])
+    start = time.perf_counter()
+    for i in range(args.single_windows):
+        model.predict_on_batch(X[i % len(X):i % len(X) + 1])
+    seconds = time.perf_counter() - start
+    result['single_window_ms'] = 1000 * seconds / args.single_windows
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='GRU modelinin XLA / unroll yapılandırmalarında eğitim ve tahmin hızını ölç'
+    )
+    parser.add_argument('--data', type=str, default=None,
+                        help='Hazırlanmış veri dizini (verilmezse sentetik veri)')
+    parser.add_argument('--samples', type=int, default=32_768,
+                        help='Ölçümde kullanılan pencere sayısı (varsayılan: 32768)')
+    parser.add_argument('--window', type=int, default=6, help='Sentetik veri pencere boyutu')
+    parser.add_argument('--features', type=int, default=63, help='Sentetik veri özellik sayısı')
+    parser.add_argument('--batch-size', type=int, default=512, help='Eğitim batch boyutu')
+    parser.add_argument('--predict-batch-size', type=int, default=1024,
+                        help='Toplu tahmin batch boyutu')
+    parser.add_argument('--epochs', type=int, default=2, help='Ölçülen eğitim geçişi sayısı')
+    parser.add_argument('--single-windows', type=int, default=200,
+                        help='Tek pencere gecikmesi için tahmin sayısı')
+    parser.add_argument('--gru-units', type=int, default=64, help='GRU ünite sayısı')
+    parser.add_argument('--dense-units', type=int, default=32, help='Dense katman ünite sayısı')
+    parser.add_argument('--configs', type=str, nargs='+', choices=list(CONFIGS),
+                        default=list(CONFIGS), help='Ölçülecek yapılandırmalar')
+    parser.add_argument('--output', type=str, default=None, help='Sonuçlar için JSON dosyası')
+    cpu_config.add_arguments(parser)
+    args = parser.parse_args()
+    cpu_settings = cpu_config.apply(cpu_config.resolve(args))
+
+    X, y = load_inputs(args)
+    if len(y) < max(args.batch_size, args.predict_batch_size):
+        parser.error(f"En az {max(args.batch_size, args.predict_batch_size)} pencere gerekli "
+                     f"({len(y)} bulundu)")
+
+    print("="*60)
+    print("XLA / UNROLL KARŞILAŞTIRMASI")
+    print("="*60)
+    print(f"Veri: {args.data or 'sentetik'} {X.shape} {X.dtype}")
+    print(f"Model: GRU({args.gru_units}) + Dense({args.dense_units})")
+    print(f"CPU: {cpu_config.describe(cpu_settings)}")
+
+    results = {
+        'data': args.data,
+        'shape': list(X.shape),
+        'batch_size': args.batch_size,
+        'predict_batch_size': args.predict_batch_size,
+        'cpu': cpu_settings,
+        'runs': []
+    }
+    for name in args.configs:
+        print(f"\n{name} ölçülüyor...")
+        results['runs'].append(run_config(name, X, y, args))
+
+    print(f"\n  {'Yapılandırma':<14} {'Eğitim (örnek/sn)':>18} {'Tahmin (örnek/sn)':>18} "
+          f"{'Tek pencere (ms)':>17} {'İlk adım (sn)':>14}")
+    for run in results['runs']:
+        print(f"  {run['config']:<14} {run['train_samples_per_s']:>18,.0f} "
+              f"{run['predict_samples_per_s']:>18,.0f} {run['single_window_ms']:>17.2f} "
+              f"{run['train_first_step_s']:>14.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Sonuçlar kaydedildi: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Sıkıştırılmış Depolama Karşılaştırması
+======================================
+
+prepare_sequence_dataset_v23.py --compress ile hazırlanmış bir split'i düz
+.npy dosyasıyla karşılaştırır: disk boyutu / sıkıştırma oranı ve açılmış veri
+MB/sn cinsinden okuma hızı:
+
+- sıralı: tüm split ardışık batch'lerle (değerlendirme/tahmin)
+- rastgele: tamamen rastgele batch'ler, parça önbelleği kapalı (en kötü durum)
+- parça-karışık: eğitimin kullandığı parça bazında karıştırılmış sıra
+
+--baseline verilmezse karşılaştırma için split geçici bir dizine düz .npy
+olarak yazılır. Düz .npy memmap ile okunur; dosya sistemi önbelleği sıcak
+olabileceğinden sonuçlar disk yerine bellek hızını yansıtabilir.
+
+Kullanım:
+    python scripts/benchmark_storage.py --data data/processed_zlib/
+    python scripts/benchmark_storage.py --data data/processed_zlib/ --baseline data/processed/ --workers 1 4 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compressed_store import COMPRESSED_SUFFIX, CompressedArray, chunk_shuffled_order
+from sequence_store import load_dataset_info
+
+
+def read_sequential(X, batch_size: int) -> float:
+    """Tüm diziyi batch batch oku; süre (sn)"""
+    start = time.perf_counter()
+    for i in range(0, len(X), batch_size):
+        np.asarray(X[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+def read_random(X, batches: list) -> float:
+    """Sıralanmış rastgele indeks batch'lerini oku; süre (sn)"""
+    start = time.perf_counter()
+    for batch_ids in batches:
+        np.asarray(X[batch_ids])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sıkıştırılmış ve düz .npy pencere depolamasını karşılaştır'
+    )
+    parser.add_argument('--data', type=str, required=True,
+                        help='--compress ile hazırlanmış veri dizini')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Aynı veri için düz X_<split>.npy içeren dizin '
+                             '(verilmezse geçici olarak oluşturulur)')
+    parser.add_argument('--split', type=str, default='train',
+                        choices=['train', 'val', 'test'], help='Split (varsayılan: train)')
+    parser.add_argument('--batch-size', type=int, default=512, help='Batch boyutu')
+    parser.add_argument('--batches', type=int, default=50,
+                        help='Rastgele okuma için batch sayısı (varsayılan: 50)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Denenecek açma iş parçacığı sayıları')
+    parser.add_argument('--output', type=str, default=None, help='Sonuçlar için JSON dosyası')
+    args = parser.parse_args()
+    args.workers = sorted(set(args.workers))
+
+    info = load_dataset_info(args.data)
+    if not info.get('compression'):
+        parser.error(f"{args.data} sıkıştırılmış değil (dataset_info.json: compression yok)")
+
+    print("="*60)
+    print("SIKIŞTIRILMIŞ DEPOLAMA KARŞILAŞTIRMASI")
+    print("="*60)
+
+    compressed_path = os.path.join(args.data, f'X_{args.split}{COMPRESSED_SUFFIX}')
+    compressed = CompressedArray(compressed_path, cache_mb=0)
+    print(f"Veri: {compressed_path} {compressed.shape} {compressed.dtype}")
+    print(f"Codec: {info['compression']['codec']} (seviye {info['compression']['level']}, "
+          f"{info['compression']['chunk_windows']} pencere/parça)")
+
+    tmp_dir = None
+    if args.baseline:
+        baseline_path = os.path.join(args.baseline, f'X_{args.split}.npy')
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        baseline_path = os.path.join(tmp_dir.name, f'X_{args.split}.npy')
+        out = np.lib.format.open_memmap(
+            baseline_path, mode='w+', dtype=compressed.dtype, shape=compressed.shape
+        )
+        for i in range(0, len(compressed), 100_000):
+            out[i:i + 100_000] = compressed[i:i + 100_000]
+        out.flush()
+        del out
+    plain = np.load(baseline_path, mmap_mode='r')
+    if plain.shape != compressed.shape:
+        parser.error(f"Şekiller farklı: {plain.shape} != {compressed.shape}")
+
+    raw_mb = compressed.nbytes / 1024**2
+    rng = np.random.default_rng(42)
+    n_batches = min(args.batches, max(1, len(plain) // args.batch_size))
+    batches = [
+        np.sort(rng.choice(len(plain), size=min(args.batch_size, len(plain)), replace=False))
+        for _ in range(n_batches)
+    ]
+    random_mb = sum(len(batch_ids) for batch_ids in batches) * \
+        compressed.nbytes / max(len(compressed), 1) / 1024**2
+
+    results = {
+        'data': args.data,
+        'split': args.split,
+        'shape': list(compressed.shape),
+        'compression': info['compression'],
+        'npy_bytes': os.path.getsize(baseline_path),
+        'compressed_bytes': os.path.getsize(compressed_path),
+        'reads': []
+    }
+    results['ratio'] = results['npy_bytes'] / max(results['compressed_bytes'], 1)
+
+    seconds = read_sequential(plain, args.batch_size)
+    results['reads'].append({'storage': 'npy', 'workers': None, 'pattern': 'sequential',
+                             'mb_per_s': raw_mb / seconds})
+    seconds = read_random(plain, batches)
+    results['reads'].append({'storage': 'npy', 'workers': None, 'pattern': 'random',
+                             'mb_per_s': random_mb / seconds})
+    chunk_order = chunk_shuffled_order(compressed.chunk_row_starts, rng)
+    chunk_batches = [
+        np.sort(chunk_order[i:i + args.batch_size])
+        for i in range(0, len(chunk_order), args.batch_size)
+    ]
+    seconds = read_random(plain, chunk_batches)
+    results['reads'].append({'storage': 'npy', 'workers': None, 'pattern': 'chunk_shuffled',
+                             'mb_per_s': raw_mb / seconds})
+
+    for workers in args.workers:
+        # Önbelleksiz: her okuma parçaları yeniden açar
+        reader = CompressedArray(compressed_path, workers=workers, cache_mb=0)
+        seconds = read_sequential(reader, args.batch_size)
+        results['reads'].append({'storage': 'compressed', 'workers': workers,
+                                 'pattern': 'sequential', 'mb_per_s': raw_mb / seconds})
+        seconds = read_random(reader, batches)
+        results['reads'].append({'storage': 'compressed', 'workers': workers,
+                                 'pattern': 'random', 'mb_per_s': random_mb / seconds})
+        reader.close()
+        # Eğitim sırası: varsayılan LRU önbellekle
+        reader = CompressedArray(compressed_path, workers=workers)
+        seconds = read_random(reader, chunk_batches)
+        results['reads'].append({'storage': 'compressed', 'workers': workers,
+                                 'pattern': 'chunk_shuffled', 'mb_per_s': raw_mb / seconds})
+        reader.close()
+
+    print(f"\nDisk boyutu:")
+    print(f"  .npy:          {results['npy_bytes'] / 1024**2:>10,.1f} MB")
+    print(f"  {COMPRESSED_SUFFIX}:          {results['compressed_bytes'] / 1024**2:>10,.1f} MB")
+    print(f"  Oran:          {results['ratio']:>10.1f}x")
+    print(f"\nOkuma hızı (açılmış veri, MB/sn):")
+    print(f"  {'Depolama':<22} {'Sıralı':>10} {'Rastgele':>10} {'Parça-karışık':>14}")
+    for storage, workers in [('npy', None)] + [('compressed', w) for w in args.workers]:
+        rows = {r['pattern']: r['mb_per_s'] for r in results['reads']
+                if r['storage'] == storage and r['workers'] == workers}
+        label = '.npy (memmap)' if storage == 'npy' else f'{COMPRESSED_SUFFIX} ({workers} thread)'
+        print(f"  {label:<22} {rows['sequential']:>10,.1f} {rows['random']:>10,.1f} "
+              f"{rows['chunk_shuffled']:>14,.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Sonuçlar kaydedildi: {args.output}")
+
+    del plain
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
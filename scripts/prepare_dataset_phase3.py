@@ -28,6 +28,8 @@ def main():
         '--window', '6',
         '--step', '1'
     ]
+    # Ek argümanları ilet (ör. --no-cache, --cache-dir)
+    args += sys.argv[1:]
     
     # Patch sys.argv
     with patch.object(sys, 'argv', args):
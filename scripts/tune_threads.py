@@ -0,0 +1,148 @@
+"""
+CPU İş Parçacığı Ayarı (Auto-tune)
+==================================
+
+Birkaç intra-op / inter-op iş parçacığı ayarında GRU eğitim (veya tahmin)
+hızını ölçer ve en iyi ayarı JSON olarak kaydeder. TensorFlow thread
+havuzları süreç başında bir kez kurulduğundan her ayar ayrı bir alt süreçte
+scripts/benchmark_compile.py ile ölçülür.
+
+Kaydedilen dosya diğer script'lere --cpu-config (veya SEPSIS_CPU_CONFIG)
+ile verilir:
+
+    python scripts/tune_threads.py --cpu-affinity 0-15 --output cpu_threads.json
+    python train_gru_v23.py --data data/processed/ --cpu-config cpu_threads.json
+
+Varsayılan adaylar: intra-op için kullanılabilir çekirdek sayısına kadar
+ikinin kuvvetleri ve çekirdek sayısı, inter-op için 1 ve 2. Ölçüm kısa
+tutulur (varsayılan 8192 pencere, 1 geçiş); sonuçlar yaklaşık sıralama
+içindir.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cpu_config
+
+BENCHMARK_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_compile.py')
+METRICS = {'train': 'train_samples_per_s', 'predict': 'predict_samples_per_s'}
+
+
+def default_intra_candidates(n_cpus: int) -> list:
+    """1, 2, 4, ... ve n_cpus"""
+    candidates = []
+    threads = 1
+    while threads < n_cpus:
+        candidates.append(threads)
+        threads *= 2
+    candidates.append(n_cpus)
+    return candidates
+
+
+def measure(intra: int, inter: int, args) -> dict:
+    """Bir ayarı alt süreçte ölç; benchmark_compile.py sonucunu döndür"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, 'result.json')
+        command = [
+            sys.executable, BENCHMARK_SCRIPT,
+            '--configs', args.config,
+            '--samples', str(args.samples),
+            '--epochs', str(args.epochs),
+            '--single-windows', '20',
+            '--intra-op-threads', str(intra),
+            '--inter-op-threads', str(inter),
+            '--output', output
+        ]
+        if args.data:
+            command += ['--data', args.data]
+        if args.cpu_affinity:
+            command += ['--cpu-affinity', args.cpu_affinity]
+        completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Ölçüm başarısız (intra={intra}, inter={inter}):\n"
+                               f"{completed.stderr[-2000:]}")
+        with open(output, encoding='utf-8') as f:
+            return json.load(f)['runs'][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='İntra-op / inter-op iş parçacığı sayısını ölçerek en iyi ayarı seç'
+    )
+    parser.add_argument('--data', type=str, default=None,
+                        help='Hazırlanmış veri dizini (verilmezse sentetik veri)')
+    parser.add_argument('--intra', type=int, nargs='+', default=None,
+                        help='Denenecek intra-op değerleri (varsayılan: 1, 2, 4, ... çekirdek sayısı)')
+    parser.add_argument('--inter', type=int, nargs='+', default=[1, 2],
+                        help='Denenecek inter-op değerleri (varsayılan: 1 2)')
+    parser.add_argument('--cpu-affinity', type=str, default=None,
+                        help='Ölçümü ve kaydedilen ayarı bu çekirdeklerle sınırla, ör. "0-15"')
+    parser.add_argument('--metric', type=str, choices=list(METRICS), default='train',
+                        help='Karşılaştırma ölçütü: eğitim veya toplu tahmin hızı')
+    parser.add_argument('--config', type=str, default='default',
+                        choices=['default', 'xla', 'unroll', 'xla+unroll'],
+                        help='Model çalıştırma yapılandırması (bkz. benchmark_compile.py)')
+    parser.add_argument('--samples', type=int, default=8192, help='Ölçüm pencere sayısı')
+    parser.add_argument('--epochs', type=int, default=1, help='Ölçülen eğitim geçişi sayısı')
+    parser.add_argument('--output', type=str, default='cpu_threads.json',
+                        help='En iyi ayarın kaydedileceği JSON (varsayılan: cpu_threads.json)')
+    args = parser.parse_args()
+
+    if args.cpu_affinity:
+        n_cpus = len(cpu_config.parse_cpu_list(args.cpu_affinity))
+    else:
+        n_cpus = cpu_config.usable_cpus()
+    intra_candidates = sorted(set(args.intra or default_intra_candidates(n_cpus)))
+    inter_candidates = sorted(set(args.inter))
+
+    print("="*60)
+    print("CPU İŞ PARÇACIĞI AYARI")
+    print("="*60)
+    print(f"Çekirdek: {n_cpus}, ölçüt: {args.metric}, yapılandırma: {args.config}")
+    print(f"Adaylar: intra-op {intra_candidates} × inter-op {inter_candidates}")
+
+    candidates = []
+    for intra in intra_candidates:
+        for inter in inter_candidates:
+            run = measure(intra, inter, args)
+            candidates.append({
+                'intra_op_threads': intra,
+                'inter_op_threads': inter,
+                'samples_per_s': run[METRICS[args.metric]],
+                'run': run
+            })
+            print(f"  intra={intra:<4} inter={inter:<3} "
+                  f"{run[METRICS[args.metric]]:>12,.0f} örnek/sn")
+
+    best = max(candidates, key=lambda candidate: candidate['samples_per_s'])
+    results = {
+        'metric': args.metric,
+        'config': args.config,
+        'data': args.data,
+        'n_cpus': n_cpus,
+        'candidates': candidates,
+        'best': {
+            'intra_op_threads': best['intra_op_threads'],
+            'inter_op_threads': best['inter_op_threads'],
+            'omp_threads': best['intra_op_threads'],
+            'cpu_affinity': args.cpu_affinity,
+            'samples_per_s': best['samples_per_s']
+        }
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n✓ En iyi ayar: intra-op {best['intra_op_threads']}, "
+          f"inter-op {best['inter_op_threads']} ({best['samples_per_s']:,.0f} örnek/sn)")
+    print(f"✓ Kaydedildi: {args.output} (kullanım: --cpu-config {args.output})")
+
+
+if __name__ == '__main__':
+    main()
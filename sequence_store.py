@@ -0,0 +1,354 @@
+"""
+Sepsis Tahmin Sistemi - Sekans Veri Seti Depolama
+=================================================
+
+prepare_sequence_dataset_v23.py çıktılarını okumak ve pencereleri ihtiyaç
+anında üretmek için yardımcılar.
+
+İki depolama formatı desteklenir:
+
+- windows: Her split için tam materyalize edilmiş (N, window, F) dizileri
+  (X_train.npy, X_val.npy, X_test.npy). Varsayılan ve eski format.
+- index: Önişlenmiş (satır, F) özellik matrisi tek kez saklanır
+  (features.npy); her split için pencere son satırı indeksleri
+  (<split>_ends.npy, int32) ve etiketleri (y_<split>.npy) tutulur.
+  Pencereler okuma sırasında batch batch toplanır, böylece disk ve RAM
+  kullanımı yaklaşık pencere boyutu kadar azalır. Birden fazla pencere
+  boyutu üretildiğinde features.npy üst dizinde bir kez saklanır ve
+  dataset_info.json içindeki features_file ile gösterilir.
+- shards: Her split boyutu sınırlı NPZ shard'larına (shards/<split>-NNNNN.npz,
+  X ve y dizileri) bölünür; shards_manifest.json her shard'ın satır sayısını
+  ve sınıf dengesini tutar. Eğitimde input_pipeline.py ile paralel okunur.
+
+windows formatı isteğe bağlı olarak sıkıştırılmış saklanabilir (X_<split>.npc,
+bkz. compressed_store.py); dataset_info.json içindeki compression alanı codec
+ve parça boyutunu tutar.
+
+Format bilgisi dataset_info.json dosyasında saklanır; dosya yoksa veri
+seti windows formatında kabul edilir. patient_ids.npy veri setindeki hasta
+ID'lerini tutar; artımlı eklemede (--append) zaten bulunan hastalar atlanır.
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+
+
+FORMAT_WINDOWS = 'windows'
+FORMAT_INDEX = 'index'
+FORMAT_SHARDS = 'shards'
+DATASET_INFO_FILE = 'dataset_info.json'
+FEATURES_FILE = 'features.npy'
+SHARDS_DIR = 'shards'
+SHARDS_MANIFEST_FILE = 'shards_manifest.json'
+PATIENTS_FILE = 'patient_ids.npy'
+SPLITS = ('train', 'val', 'test')
+
+
+def index_dtype(n_rows: int):
+    """Pencere indeksleri için en küçük uygun tamsayı tipi"""
+    return np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+
+
+def gather_windows(features: np.ndarray, ends: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Son satır indekslerinden (n, window, F) pencereleri topla
+
+    Args:
+        features: (satır, F) özellik matrisi (hasta bazında gruplu)
+        ends: Her pencerenin son satırının indeksi
+        window_size: Pencere boyutu
+    """
+    offsets = np.arange(1 - window_size, 1)
+    return features[np.asarray(ends)[:, None] + offsets]
+
+
+class WindowDataset:
+    """
+    Index formatındaki bir split için tembel (lazy) pencere görünümü
+
+    NumPy dizisi gibi len(), shape ve dilim/indeks erişimi destekler;
+    her erişimde yalnızca istenen pencereler kopyalanır.
+    """
+
+    def __init__(self, features: np.ndarray, ends: np.ndarray, window_size: int):
+        self.features = features
+        self.ends = ends
+        self.window_size = window_size
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.ends), self.window_size, self.features.shape[1])
+
+    @property
+    def dtype(self):
+        return self.features.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Materyalize edilseydi kaplayacağı bellek (byte)"""
+        return int(np.prod(self.shape)) * self.features.dtype.itemsize
+
+    def __getitem__(self, key) -> np.ndarray:
+        if isinstance(key, (int, np.integer)):
+            return gather_windows(self.features, self.ends[[key]], self.window_size)[0]
+        return gather_windows(self.features, self.ends[key], self.window_size)
+
+    def materialize(self) -> np.ndarray:
+        """Tüm pencereleri (n, window, F) dizisi olarak üret"""
+        return self[:]
+
+
+def load_dataset_info(data_dir: str) -> dict:
+    """dataset_info.json dosyasını oku (yoksa windows formatı varsayılır)"""
+    path = os.path.join(data_dir, DATASET_INFO_FILE)
+    if not os.path.exists(path):
+        return {'format': FORMAT_WINDOWS}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_dataset_info(data_dir: str, info: dict):
+    """dataset_info.json dosyasını yaz"""
+    with open(os.path.join(data_dir, DATASET_INFO_FILE), 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+
+
+def write_windows(path: str, features: np.ndarray, ends: np.ndarray,
+                  window_size: int, chunk_windows: int = 100_000) -> int:
+    """
+    Pencereleri .npy dosyasına parça parça yaz
+
+    Çıktı np.lib.format.open_memmap ile önceden ayrılır ve en fazla
+    chunk_windows pencerelik parçalarla doldurulur; böylece tüm
+    (n, window, F) dizisi hiçbir zaman bellekte tutulmaz.
+
+    Returns:
+        Yazılan veri boyutu (byte)
+    """
+    shape = (len(ends), window_size, features.shape[1])
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=features.dtype, shape=shape)
+    for start in range(0, len(ends), chunk_windows):
+        stop = min(start + chunk_windows, len(ends))
+        out[start:stop] = gather_windows(features, ends[start:stop], window_size)
+    out.flush()
+    nbytes = out.nbytes
+    del out
+    return nbytes
+
+
+def append_npy(path: str, array: np.ndarray) -> tuple:
+    """
+    .npy dosyasına ilk eksen boyunca satır ekle (yerinde)
+
+    Yeni veri dosya sonuna yazılır ve yalnızca başlıktaki shape güncellenir;
+    mevcut veri okunmaz. NumPy başlığı ilk eksenin büyümesi için boşlukla
+    doldurduğundan başlık uzunluğu normalde değişmez; değişirse (veya dosya
+    Fortran sıralıysa) dosya bir kez yeniden yazılır.
+
+    Returns:
+        Yeni shape
+    """
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+    
+    array = np.asarray(array)
+    if dtype.hasobject or array.shape[1:] != shape[1:]:
+        raise ValueError(f"{path}: {array.shape} şekilli veri {shape} dizisine eklenemez")
+    values = np.ascontiguousarray(array, dtype=dtype)
+    if array.dtype.kind in 'iu' and np.any(values != array):
+        raise ValueError(f"{path}: değerler {dtype} tipine sığmıyor")
+    
+    new_shape = (shape[0] + len(values),) + tuple(shape[1:])
+    header = io.BytesIO()
+    header_dict = {
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': new_shape
+    }
+    if version == (1, 0):
+        np.lib.format.write_array_header_1_0(header, header_dict)
+    else:
+        np.lib.format.write_array_header_2_0(header, header_dict)
+    
+    if fortran_order or header.tell() != data_offset:
+        # Fortran sıralı veya başlık büyümüyor: dosyayı C sırasıyla yeniden yaz
+        existing = np.load(path, mmap_mode='r')
+        tmp_path = path + '.tmp'
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=new_shape)
+        out[:shape[0]] = existing
+        out[shape[0]:] = values
+        out.flush()
+        del out, existing
+        os.replace(tmp_path, path)
+        return new_shape
+    
+    # Önce veri, sonra başlık: yarıda kalırsa dosya eski shape ile okunabilir
+    with open(path, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        f.write(values.tobytes())
+        f.seek(0)
+        f.write(header.getvalue())
+    return new_shape
+
+
+def append_windows(path: str, features: np.ndarray, ends: np.ndarray,
+                   window_size: int, chunk_windows: int = 100_000) -> int:
+    """
+    Pencereleri mevcut X_<split>.npy dosyasına parça parça ekle
+
+    Returns:
+        Eklenen veri boyutu (byte)
+    """
+    nbytes = 0
+    for start in range(0, len(ends), chunk_windows):
+        windows = gather_windows(features, ends[start:start + chunk_windows], window_size)
+        append_npy(path, windows)
+        nbytes += windows.nbytes
+    return nbytes
+
+
+def write_shards(data_dir: str, split: str, features: np.ndarray, ends: np.ndarray,
+                 labels: np.ndarray, window_size: int, shard_mb: float = 256,
+                 start_index: int = 0) -> list:
+    """
+    Bir split'i boyutu sınırlı NPZ shard'ları olarak yaz
+
+    Her shard en fazla shard_mb MB pencere verisi içerir; bellekte aynı anda
+    yalnızca bir shard tutulur. Shard numaraları start_index'ten başlar
+    (artımlı eklemede mevcut shard'ların ardından).
+
+    Returns:
+        Manifest girdileri (dosya, satır sayısı, pozitif sayısı, oran, boyut)
+    """
+    window_bytes = window_size * features.shape[1] * features.dtype.itemsize
+    shard_windows = max(1, int(shard_mb * 1024**2 // window_bytes))
+    os.makedirs(os.path.join(data_dir, SHARDS_DIR), exist_ok=True)
+
+    entries = []
+    for i, start in enumerate(range(0, len(ends), shard_windows), start=start_index):
+        stop = min(start + shard_windows, len(ends))
+        file_name = f'{SHARDS_DIR}/{split}-{i:05d}.npz'
+        path = os.path.join(data_dir, file_name)
+        y = labels[start:stop]
+        np.savez(path, X=gather_windows(features, ends[start:stop], window_size), y=y)
+        entries.append({
+            'file': file_name,
+            'rows': int(stop - start),
+            'positives': int(y.sum()),
+            'positive_rate': float(y.mean()),
+            'bytes': os.path.getsize(path)
+        })
+    return entries
+
+
+def load_shard_manifest(data_dir: str) -> dict:
+    """shards_manifest.json dosyasını oku"""
+    with open(os.path.join(data_dir, SHARDS_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def shard_paths(data_dir: str, split: str) -> list:
+    """Bir split'in shard dosyaları (manifest sırasıyla)"""
+    manifest = load_shard_manifest(data_dir)
+    return [os.path.join(data_dir, entry['file']) for entry in manifest['splits'][split]]
+
+
+def iter_shards(data_dir: str, split: str):
+    """Bir split'in shard'larını sırayla (X, y) olarak oku"""
+    for path in shard_paths(data_dir, split):
+        with np.load(path) as shard:
+            yield shard['X'], shard['y']
+
+
+def load_patient_ids(data_dir: str):
+    """Veri setindeki hasta ID'leri (patient_ids.npy yoksa None)"""
+    path = os.path.join(data_dir, PATIENTS_FILE)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, allow_pickle=True)
+
+
+def load_shard_labels(data_dir: str, split: str) -> np.ndarray:
+    """Bir split'in tüm etiketleri (yalnızca y dizileri okunur)"""
+    labels = []
+    for path in shard_paths(data_dir, split):
+        with np.load(path) as shard:
+            labels.append(shard['y'])
+    return np.concatenate(labels) if labels else np.empty(0)
+
+
+def save_index_split(data_dir: str, split: str, ends: np.ndarray, labels: np.ndarray):
+    """Bir split'in pencere indekslerini ve etiketlerini kaydet"""
+    np.save(os.path.join(data_dir, f'{split}_ends.npy'), ends)
+    np.save(os.path.join(data_dir, f'y_{split}.npy'), labels)
+
+
+def load_split(data_dir: str, split: str, mmap_mode=None):
+    """
+    Bir split'i formatından bağımsız olarak yükle
+
+    Args:
+        data_dir: prepare_sequence_dataset_v23.py çıktı dizini
+        split: 'train', 'val' veya 'test'
+        mmap_mode: np.load'a iletilir (ör. 'r')
+
+    Returns:
+        X: np.ndarray (windows), CompressedArray (sıkıştırılmış windows)
+            veya WindowDataset (index)
+        y: Etiketler
+    """
+    info = load_dataset_info(data_dir)
+    if info['format'] == FORMAT_SHARDS:
+        raise ValueError("shards formatı bütün olarak yüklenmez; iter_shards veya "
+                         "input_pipeline.shard_dataset kullanın")
+    y = np.load(os.path.join(data_dir, f'y_{split}.npy'), mmap_mode=mmap_mode)
+
+    if info['format'] == FORMAT_INDEX:
+        # Çoklu pencere çıktısında özellik matrisi üst dizinde paylaşılır
+        features_file = info.get('features_file', FEATURES_FILE)
+        features = np.load(os.path.join(data_dir, features_file), mmap_mode=mmap_mode)
+        ends = np.load(os.path.join(data_dir, f'{split}_ends.npy'))
+        return WindowDataset(features, ends, info['window_size']), y
+
+    if info.get('compression'):
+        from compressed_store import COMPRESSED_SUFFIX, CompressedArray
+        return CompressedArray(os.path.join(data_dir, f'X_{split}{COMPRESSED_SUFFIX}')), y
+    
+    X = np.load(os.path.join(data_dir, f'X_{split}.npy'), mmap_mode=mmap_mode)
+    return X, y
+
+
+def predict_in_batches(model, X, batch_size: int = 1024) -> np.ndarray:
+    """
+    Modeli X üzerinde batch batch çalıştır
+
+    X bir np.ndarray veya WindowDataset olabilir; pencereler yalnızca
+    batch boyutu kadar materyalize edilir. Çıktı model.predict ile aynı
+    (n, 1) şeklindedir.
+    """
+    outputs = []
+    for start in range(0, len(X), batch_size):
+        batch = np.asarray(X[start:start + batch_size])
+        outputs.append(np.asarray(model.predict_on_batch(batch)))
+    if not outputs:
+        return np.empty((0, 1), dtype=np.float32)
+    return np.concatenate(outputs, axis=0)
+
+
+def predict_shards(model, data_dir: str, split: str, batch_size: int = 1024) -> np.ndarray:
+    """Shard formatındaki bir split'i shard shard tahmin et (load_shard_labels sırasıyla)"""
+    outputs = [predict_in_batches(model, X, batch_size) for X, _ in iter_shards(data_dir, split)]
+    if not outputs:
+        return np.empty((0, 1), dtype=np.float32)
+    return np.concatenate(outputs, axis=0)
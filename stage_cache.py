@@ -0,0 +1,151 @@
+"""
+Sepsis Tahmin Sistemi - Aşama Önbelleği
+=======================================
+
+Veri hazırlama aşamalarının (temizleme, fit, dönüştürme, pencereleme)
+çıktılarını içerik hash'ine dayalı anahtarlarla diskte saklar.
+
+Bir aşamanın anahtarı; önceki aşamanın anahtarı, aşama parametreleri ve kod
+sürümünden (ilgili kaynak dosyaların hash'i) türetilir. Zincirin başı girdi
+dosyasının SHA-256 hash'idir. Böylece yalnızca --window değiştiğinde
+temizleme/fit/dönüştürme aşamaları önbellekten okunur.
+
+Önbellek toplam boyutu max_bytes ile sınırlıdır; aşıldığında en uzun süredir
+kullanılmayan (LRU) girdiler silinir.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+
+from file_utils import file_sha256
+
+
+def code_version(paths) -> str:
+    """Kaynak dosyaların içeriğinden kısa kod sürümü hash'i"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class StageCache:
+    """İçerik hash'li, boyut sınırlı (LRU) aşama önbelleği"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 20 * 1024**3,
+                 code_version: str = '', enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.code_version = code_version
+        self.enabled = enabled
+        self.hits = []
+        self.misses = []
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def input_key(self, input_path: str) -> str:
+        """
+        Girdi dosyasının içerik hash'i
+
+        Hash, (yol, boyut, değişiklik zamanı) ile file_hashes.json içinde
+        saklanır; değişmemiş dosyalar yeniden okunmaz.
+        """
+        stat = os.stat(input_path)
+        memo_key = f"{os.path.abspath(input_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        memo_path = os.path.join(self.cache_dir, 'file_hashes.json')
+
+        memo = {}
+        if self.enabled and os.path.exists(memo_path):
+            with open(memo_path, 'r', encoding='utf-8') as f:
+                memo = json.load(f)
+        if memo_key not in memo:
+            memo[memo_key] = file_sha256(input_path)
+            if self.enabled:
+                with open(memo_path, 'w', encoding='utf-8') as f:
+                    json.dump(memo, f, indent=2)
+        return memo[memo_key]
+
+    def key(self, stage: str, parent_key: str, params: dict) -> str:
+        """Aşama anahtarı: önceki anahtar + parametreler + kod sürümü"""
+        source = json.dumps({
+            'stage': stage,
+            'parent': parent_key,
+            'params': params,
+            'code_version': self.code_version
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()[:24]
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{stage}-{key}.pkl')
+
+    def has(self, stage: str, key: str) -> bool:
+        """Aşama çıktısı önbellekte var mı"""
+        return self.enabled and os.path.exists(self._path(stage, key))
+
+    def load(self, stage: str, key: str):
+        """Önbellekteki çıktıyı döndür; yoksa None"""
+        if not self.enabled:
+            return None
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+        # LRU için son kullanım zamanını güncelle
+        os.utime(path, None)
+        return value
+
+    def save(self, stage: str, key: str, value):
+        """Çıktıyı atomik olarak yaz ve boyut sınırını uygula"""
+        if not self.enabled:
+            return
+        path = self._path(stage, key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def run(self, stage: str, key: str, compute):
+        """Önbellekte varsa yükle, yoksa compute() ile üret ve sakla"""
+        value = self.load(stage, key)
+        if value is not None:
+            self.hits.append(stage)
+            print(f"  ✓ {stage}: önbellekten okundu ({key[:12]})")
+            return value
+
+        start = time.perf_counter()
+        value = compute()
+        self.misses.append(stage)
+        self.save(stage, key, value)
+        if self.enabled:
+            print(f"  ✓ {stage}: hesaplandı ve önbelleğe yazıldı "
+                  f"({time.perf_counter() - start:.2f} sn, {key[:12]})")
+        return value
+
+    def entries(self):
+        """(yol, boyut, son kullanım) listesi, en eskiden yeniye"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep: str = None):
+        """Toplam boyut max_bytes altına inene kadar LRU girdileri sil"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+            print(f"  - Önbellekten silindi (LRU): {os.path.basename(path)}")
@@ -0,0 +1,378 @@
+"""
+Sepsis Tahmin Sistemi - Streaming İstatistikler
+===============================================
+
+Veri bellekte tutulmadan, parça parça güncellenen ve shard/worker'lar
+arasında birleştirilebilen özet istatistikler.
+
+- HistogramSketch: [0, 1] aralığındaki skorlar için sabit bölmeli,
+  birleştirilebilir quantile sketch'i (hata en fazla yarım bölme genişliği)
+- RunStatistics: satır sayıları, ortalama, pozitif oranı, min/max, risk
+  skoru dağılımı ve risk bandı histogramları
+- RunningMoments: sütun bazlı, NaN atlayan ortalama/varyans (Chan birleştirme)
+- QuantileSketch: sınırsız değer aralığı için birleştirilebilir compactor
+  (KLL benzeri) quantile sketch'i; rank hatası en fazla eps * n
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+# app.get_risk_level ile aynı bant sınırları
+RISK_BANDS = [
+    ('Çok Düşük', 0.0, 0.1),
+    ('Düşük', 0.1, 0.3),
+    ('Orta', 0.3, 0.5),
+    ('Yüksek', 0.5, 0.7),
+    ('Çok Yüksek', 0.7, 1.0)
+]
+
+
+class HistogramSketch:
+    """[low, high] aralığı için sabit bölmeli, birleştirilebilir quantile sketch'i"""
+
+    def __init__(self, n_bins: int = 1000, low: float = 0.0, high: float = 1.0):
+        self.n_bins = n_bins
+        self.low = low
+        self.high = high
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, values: np.ndarray):
+        """Değerleri sketch'e ekle (aralık dışındakiler uç bölmelere yazılır)"""
+        scaled = (np.asarray(values, dtype=float) - self.low) / (self.high - self.low)
+        bins = np.clip((scaled * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.counts += np.bincount(bins, minlength=self.n_bins)
+
+    def merge(self, other: 'HistogramSketch') -> 'HistogramSketch':
+        if (other.n_bins, other.low, other.high) != (self.n_bins, self.low, self.high):
+            raise ValueError("Farklı bölmelere sahip sketch'ler birleştirilemez")
+        self.counts += other.counts
+        return self
+
+    def quantile(self, q: float) -> float:
+        """q quantile'ının yaklaşık değeri (bölme içinde doğrusal interpolasyon)"""
+        total = self.count
+        if total == 0:
+            return float('nan')
+        target = q * total
+        cumulative = np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, target, side='left'))
+        i = min(i, self.n_bins - 1)
+        below = cumulative[i] - self.counts[i]
+        fraction = (target - below) / self.counts[i] if self.counts[i] > 0 else 0.0
+        width = (self.high - self.low) / self.n_bins
+        return float(self.low + (i + min(max(fraction, 0.0), 1.0)) * width)
+
+    def to_dict(self) -> dict:
+        """Seyrek JSON gösterimi (yalnızca dolu bölmeler)"""
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            'n_bins': self.n_bins,
+            'low': self.low,
+            'high': self.high,
+            'bins': nonzero.tolist(),
+            'counts': self.counts[nonzero].tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'HistogramSketch':
+        sketch = cls(data['n_bins'], data['low'], data['high'])
+        sketch.counts[np.asarray(data['bins'], dtype=np.int64)] = data['counts']
+        return sketch
+
+
+class RunStatistics:
+    """Tahmin sonuçları için online, birleştirilebilir özet istatistikler"""
+
+    def __init__(self, threshold: float = 0.1799, n_bins: int = 1000):
+        self.threshold = threshold
+        self.total_rows = 0
+        self.valid_rows = 0
+        self.positive_rows = 0
+        self.proba_sum = 0.0
+        self.proba_min = float('inf')
+        self.proba_max = float('-inf')
+        self.sketch = HistogramSketch(n_bins)
+        self.band_rows = np.zeros(len(RISK_BANDS), dtype=np.int64)
+        self.band_positive = np.zeros(len(RISK_BANDS), dtype=np.int64)
+        self.band_proba_sum = np.zeros(len(RISK_BANDS))
+
+    def update(self, results: pd.DataFrame) -> 'RunStatistics':
+        """Bir sonuç parçasını istatistiklere ekle"""
+        valid_proba = results.loc[~results['insufficient_history'], 'proba'].to_numpy(dtype=float)
+        self.total_rows += len(results)
+        self.valid_rows += len(valid_proba)
+        if len(valid_proba) == 0:
+            return self
+
+        positive = valid_proba >= self.threshold
+        self.positive_rows += int(positive.sum())
+        self.proba_sum += float(valid_proba.sum())
+        self.proba_min = min(self.proba_min, float(valid_proba.min()))
+        self.proba_max = max(self.proba_max, float(valid_proba.max()))
+        self.sketch.update(valid_proba)
+
+        edges = [upper for _, _, upper in RISK_BANDS[:-1]]
+        bands = np.searchsorted(edges, valid_proba, side='right')
+        self.band_rows += np.bincount(bands, minlength=len(RISK_BANDS))
+        self.band_positive += np.bincount(bands, weights=positive, minlength=len(RISK_BANDS)).astype(np.int64)
+        self.band_proba_sum += np.bincount(bands, weights=valid_proba, minlength=len(RISK_BANDS))
+        return self
+
+    def merge(self, other: 'RunStatistics') -> 'RunStatistics':
+        """Başka bir shard/worker'ın istatistiklerini birleştir"""
+        self.total_rows += other.total_rows
+        self.valid_rows += other.valid_rows
+        self.positive_rows += other.positive_rows
+        self.proba_sum += other.proba_sum
+        self.proba_min = min(self.proba_min, other.proba_min)
+        self.proba_max = max(self.proba_max, other.proba_max)
+        self.sketch.merge(other.sketch)
+        self.band_rows += other.band_rows
+        self.band_positive += other.band_positive
+        self.band_proba_sum += other.band_proba_sum
+        return self
+
+    def to_dict(self) -> dict:
+        """Checkpoint'lerde saklanabilen tam durum"""
+        return {
+            'threshold': self.threshold,
+            'total_rows': self.total_rows,
+            'valid_rows': self.valid_rows,
+            'positive_rows': self.positive_rows,
+            'proba_sum': self.proba_sum,
+            'proba_min': self.proba_min if self.valid_rows else None,
+            'proba_max': self.proba_max if self.valid_rows else None,
+            'sketch': self.sketch.to_dict(),
+            'band_rows': self.band_rows.tolist(),
+            'band_positive': self.band_positive.tolist(),
+            'band_proba_sum': self.band_proba_sum.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RunStatistics':
+        stats = cls(data['threshold'], data['sketch']['n_bins'])
+        stats.total_rows = data['total_rows']
+        stats.valid_rows = data['valid_rows']
+        stats.positive_rows = data['positive_rows']
+        stats.proba_sum = data['proba_sum']
+        if data['valid_rows']:
+            stats.proba_min = data['proba_min']
+            stats.proba_max = data['proba_max']
+        stats.sketch = HistogramSketch.from_dict(data['sketch'])
+        stats.band_rows = np.asarray(data['band_rows'], dtype=np.int64)
+        stats.band_positive = np.asarray(data['band_positive'], dtype=np.int64)
+        stats.band_proba_sum = np.asarray(data['band_proba_sum'], dtype=float)
+        return stats
+
+    def summary(self) -> dict:
+        """Rapor (JSON sidecar) için özet"""
+        valid = self.valid_rows
+        bands = []
+        for i, (name, low, high) in enumerate(RISK_BANDS):
+            rows = int(self.band_rows[i])
+            bands.append({
+                'band': name,
+                'range': [low, high],
+                'rows': rows,
+                'fraction': rows / valid if valid else None,
+                'positive_rows': int(self.band_positive[i]),
+                'mean_proba': float(self.band_proba_sum[i] / rows) if rows else None
+            })
+
+        return {
+            'threshold': self.threshold,
+            'total_rows': self.total_rows,
+            'valid_rows': valid,
+            'insufficient_history_rows': self.total_rows - valid,
+            'positive_rows': self.positive_rows,
+            'positive_rate': self.positive_rows / valid if valid else None,
+            'mean_proba': self.proba_sum / valid if valid else None,
+            'min_proba': self.proba_min if valid else None,
+            'max_proba': self.proba_max if valid else None,
+            'quantiles': {
+                f"{q:.2f}": self.sketch.quantile(q) if valid else None
+                for q in [0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+            },
+            'quantile_max_error': (self.sketch.high - self.sketch.low) / self.sketch.n_bins / 2,
+            'risk_bands': bands
+        }
+
+    def save(self, path: str):
+        """Özeti JSON dosyasına yaz"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+    def print_report(self):
+        """İstatistikleri konsola yazdır"""
+        if self.valid_rows == 0:
+            return
+        summary = self.summary()
+        print(f"\nTahmin İstatistikleri:")
+        print(f"  Toplam satır: {self.total_rows:,}")
+        print(f"  Geçerli tahmin: {self.valid_rows:,}")
+        print(f"  Yetersiz geçmiş: {summary['insufficient_history_rows']:,}")
+        print(f"  Ortalama risk skoru: {summary['mean_proba']:.4f}")
+        print(f"  Pozitif tahminler: {self.positive_rows:,} ({100*summary['positive_rate']:.2f}%)")
+        print(f"  Risk skoru dağılımı:")
+        print(f"    Min:  {self.proba_min:.4f}")
+        print(f"    25%:  {self.sketch.quantile(0.25):.4f}")
+        print(f"    50%:  {self.sketch.quantile(0.50):.4f}")
+        print(f"    75%:  {self.sketch.quantile(0.75):.4f}")
+        print(f"    Max:  {self.proba_max:.4f}")
+        print(f"  Risk bantları:")
+        for band in summary['risk_bands']:
+            print(f"    {band['band']:<11} {band['rows']:>10,} ({100*band['fraction']:.2f}%)")
+
+
+class RunningMoments:
+    """Sütun bazlı, NaN değerleri atlayan online ortalama/varyans"""
+
+    def __init__(self, n_columns: int):
+        self.count = np.zeros(n_columns, dtype=np.int64)
+        self.n_missing = np.zeros(n_columns, dtype=np.int64)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    def update(self, X: np.ndarray) -> 'RunningMoments':
+        """(satır, sütun) bir parçayı ekle; parça içi iki geçiş, parçalar arası Chan birleştirme"""
+        X = np.asarray(X, dtype=float)
+        n_batch = (~np.isnan(X)).sum(axis=0)
+        self.n_missing += len(X) - n_batch
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_batch = np.where(n_batch > 0, np.nansum(X, axis=0) / n_batch, 0.0)
+        m2_batch = np.nansum((X - mean_batch) ** 2, axis=0)
+        self._combine(n_batch, mean_batch, m2_batch)
+        return self
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        self.n_missing += other.n_missing
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, n_other, mean_other, m2_other):
+        total = self.count + n_other
+        safe_total = np.maximum(total, 1)
+        delta = mean_other - self.mean
+        self.mean = self.mean + delta * n_other / safe_total
+        self.m2 = self.m2 + m2_other + delta ** 2 * self.count * n_other / safe_total
+        self.count = total
+
+    def filled_moments(self, fill_values: np.ndarray):
+        """
+        Eksik değerler fill_values ile doldurulmuş olsaydı oluşacak moment'ler
+
+        Doldurulan değerler kendi aralarında özdeş olduğundan katkıları
+        yalnızca birleştirme terimindedir. Varyans ddof=0 (StandardScaler ile aynı).
+
+        Returns:
+            n, mean, var (hiç gözlemi olmayan sütunlarda NaN)
+        """
+        n = self.count + self.n_missing
+        safe_n = np.maximum(n, 1)
+        delta = fill_values - self.mean
+        mean = self.mean + delta * self.n_missing / safe_n
+        m2 = self.m2 + delta ** 2 * self.count * self.n_missing / safe_n
+        observed = self.count > 0
+        return n, np.where(observed, mean, np.nan), np.where(observed, m2 / safe_n, np.nan)
+
+
+class QuantileSketch:
+    """
+    Birleştirilebilir compactor (KLL benzeri) quantile sketch'i
+
+    Seviye h'deki her eleman 2^h ağırlık taşır. Bir seviye k elemanı aşınca
+    sıralanır, rastgele ofsetle her ikinci eleman üst seviyeye taşınır. Her
+    sıkıştırma rank hatasına en fazla 2^h ekler; gerçekleşen toplam hata
+    izlenir (rank_error_bound) ve k, max_items elemana kadar eps'i
+    garanti edecek şekilde seçilir. Hiç sıkıştırma olmadıysa sonuç kesindir.
+    """
+
+    def __init__(self, eps: float = 0.001, max_items: int = 2 ** 32, seed: int = 0):
+        self.eps = eps
+        self.k = self.capacity_for(eps, max_items)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.rank_error = 0
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def capacity_for(eps: float, max_items: int) -> int:
+        """depth / k <= eps olacak en küçük seviye kapasitesi"""
+        k = int(np.ceil(1 / eps))
+        while True:
+            depth = max(1, int(np.ceil(np.log2(max(max_items / k, 2)))))
+            needed = int(np.ceil(depth / eps))
+            if needed <= k:
+                return k
+            k = needed
+
+    @property
+    def rank_error_bound(self) -> float:
+        """Gerçekleşen en kötü durum rank hatası (n'e oranla)"""
+        return self.rank_error / self.count if self.count else 0.0
+
+    def update(self, values: np.ndarray) -> 'QuantileSketch':
+        """Değerleri ekle (NaN'lar atlanır)"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        if other.k != self.k:
+            raise ValueError("Farklı kapasiteye sahip sketch'ler birleştirilemez")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self.rank_error += other.rank_error
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self.k:
+                self._compact(h)
+            h += 1
+
+    def _compact(self, h: int):
+        items = np.sort(self.levels[h])
+        # Tek sayıda eleman varsa en büyüğü bu seviyede kalır
+        n_pairs = len(items) // 2
+        offset = int(self.rng.integers(2))
+        promoted = items[offset:2 * n_pairs:2]
+        self.levels[h] = items[2 * n_pairs:]
+        if h + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+        self.rank_error += 2 ** h
+
+    def quantile(self, q: float) -> float:
+        """q quantile'ının değeri (sıkıştırma olmadıysa np.quantile ile aynı)"""
+        if self.count == 0:
+            return float('nan')
+        if self.rank_error == 0:
+            return float(np.quantile(self.levels[0], q))
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(items), 2 ** h, dtype=np.int64) for h, items in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        i = int(np.searchsorted(cumulative, q * cumulative[-1], side='left'))
+        return float(values[order[min(i, len(values) - 1)]])
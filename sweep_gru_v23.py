@@ -0,0 +1,371 @@
+"""
+Sepsis Tahmin Sistemi - GRU Hiperparametre Taraması (v23)
+=========================================================
+
+train_gru_v23.py hiperparametreleri (--gru-units, --dense-units, --dropout,
+--lr, --batch-size) için grid veya rastgele arama yapar.
+
+- Denemeler sınırlı bir süreç havuzunda (--parallel) çalışır; her deneme
+  yeni bir süreçte başlar ve --threads-per-trial iş parçacığıyla sınırlanır
+  (bkz. cpu_config.py).
+- Veri her süreçte mmap_mode='r' ile açılır; tüm denemeler aynı
+  memory-mapped dosyaları ve dolayısıyla aynı sayfa önbelleğini paylaşır,
+  veri setinin kopyası süreç başına RAM'e alınmaz.
+- Budama: --prune-warmup epoch'tan sonra bir denemenin val_pr_auc değeri,
+  aynı epoch'ta en az --prune-min-trials diğer denemenin --prune-percentile
+  yüzdelik değerinin altındaysa deneme durdurulur.
+- Tüm sonuçlar (parametreler, en iyi val_pr_auc / val_roc_auc, epoch, süre,
+  durum) tek bir JSON tablosunda toplanır; tablo her deneme bittiğinde
+  güncellenir.
+
+Arama uzayı JSON dosyası (--space); listeler grid/rastgele seçim için değer
+kümesi, {"uniform": [a, b]} ve {"log_uniform": [a, b]} yalnızca rastgele
+arama için aralıktır:
+
+    {"gru_units": [32, 64], "dense_units": [16, 32], "dropout": [0.2, 0.3],
+     "lr": {"log_uniform": [1e-4, 3e-3]}, "batch_size": [256, 512]}
+
+Kullanım:
+    python sweep_gru_v23.py --data data/processed/ --space space.json --mode random --trials 40 \\
+        --parallel 8 --threads-per-trial 8 --output sweeps/
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+import traceback
+from datetime import datetime
+
+import numpy as np
+
+import cpu_config
+from sequence_store import FORMAT_SHARDS, load_dataset_info
+
+# Aranabilir parametreler ve train_gru_v23.py karşılıkları
+PARAMS = {
+    'gru_units': ('--gru-units', int),
+    'dense_units': ('--dense-units', int),
+    'dropout': ('--dropout', float),
+    'lr': ('--lr', float),
+    'batch_size': ('--batch-size', int),
+}
+DEFAULT_SPACE = {
+    'gru_units': [32, 64],
+    'dense_units': [16, 32],
+    'dropout': [0.2, 0.3],
+    'lr': [1e-3, 3e-4],
+    'batch_size': [512],
+}
+# train_gru_v23.py varsayılanları (uzayda olmayan parametreler için)
+DEFAULT_PARAMS = {'gru_units': 64, 'dense_units': 32, 'dropout': 0.3, 'lr': 0.001, 'batch_size': 512}
+
+
+def load_space(path: str = None) -> dict:
+    """Arama uzayını oku ve doğrula"""
+    if path is None:
+        return dict(DEFAULT_SPACE)
+    with open(path, encoding='utf-8') as f:
+        space = json.load(f)
+    unknown = set(space) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen parametreler: {sorted(unknown)} (geçerli: {list(PARAMS)})")
+    for name, values in space.items():
+        if isinstance(values, dict):
+            if len(values) != 1 or next(iter(values)) not in ('uniform', 'log_uniform'):
+                raise ValueError(f"{name}: aralık {{'uniform' | 'log_uniform': [a, b]}} olmalı")
+        elif not isinstance(values, list) or not values:
+            raise ValueError(f"{name}: değer listesi veya aralık olmalı")
+    return space
+
+
+def _cast(name: str, value):
+    return PARAMS[name][1](value)
+
+
+def grid_trials(space: dict) -> list:
+    """Uzaydaki tüm değer kombinasyonları"""
+    ranges = [name for name, values in space.items() if isinstance(values, dict)]
+    if ranges:
+        raise ValueError(f"Grid araması yalnızca değer listeleriyle çalışır: {ranges}")
+    names = list(space)
+    return [
+        {**DEFAULT_PARAMS, **{name: _cast(name, value) for name, value in zip(names, combo)}}
+        for combo in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def random_trials(space: dict, n_trials: int, seed: int = 42) -> list:
+    """Uzaydan n_trials rastgele yapılandırma (tekrarlar atlanır)"""
+    rng = np.random.default_rng(seed)
+    trials, seen = [], set()
+    for _ in range(n_trials * 20):
+        params = dict(DEFAULT_PARAMS)
+        for name, values in space.items():
+            if isinstance(values, dict):
+                kind, (low, high) = next(iter(values.items()))
+                if kind == 'log_uniform':
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                if PARAMS[name][1] is int:
+                    value = round(value)
+            else:
+                value = values[rng.integers(len(values))]
+            params[name] = _cast(name, value)
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            trials.append(params)
+        if len(trials) == n_trials:
+            break
+    return trials
+
+
+def should_prune(progress, trial_id: int, epoch: int, value: float,
+                 warmup: int, min_trials: int, percentile: float) -> bool:
+    """Deneme aynı epoch'taki diğer denemelerin alt yüzdeliğinde mi"""
+    if epoch + 1 < warmup:
+        return False
+    others = [
+        history[epoch] for other_id, history in progress.items()
+        if other_id != trial_id and len(history) > epoch
+    ]
+    if len(others) < min_trials:
+        return False
+    return value < np.percentile(others, percentile)
+
+
+def _init_worker(threads: int):
+    """Worker süreci: thread bütçesini TensorFlow import edilmeden uygula"""
+    cpu_config.apply({
+        'intra_op_threads': threads,
+        'inter_op_threads': min(2, threads),
+        'omp_threads': threads,
+        'cpu_affinity': None
+    })
+
+
+def _run_trial(task: dict) -> dict:
+    """Worker süreci: bir yapılandırmayı eğit ve doğrulama sonuçlarını döndür"""
+    start = time.perf_counter()
+    record = {
+        'trial': task['trial'],
+        'params': task['params'],
+        'threads': task['threads'],
+        'status': 'failed'
+    }
+    try:
+        import tensorflow as tf
+        from tensorflow.keras import callbacks
+        from sequence_store import load_split
+        from train_gru_v23 import GRUSepsisModel, WindowBatchSequence
+
+        tf.keras.utils.set_random_seed(task['seed'] + task['trial'])
+        params = task['params']
+        X_train, y_train = load_split(task['data'], 'train', mmap_mode='r')
+        X_val, y_val = load_split(task['data'], 'val', mmap_mode='r')
+
+        gru_model = GRUSepsisModel(
+            input_shape=(X_train.shape[1], X_train.shape[2]),
+            gru_units=params['gru_units'],
+            dense_units=params['dense_units'],
+            dropout_rate=params['dropout']
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            gru_model.build_model()
+            gru_model.compile_model(learning_rate=params['lr'])
+            class_weight = gru_model.calculate_class_weights(y_train)
+
+        progress = task['progress']
+        pruning = task['pruning']
+
+        class Pruner(callbacks.Callback):
+            """val_pr_auc'u paylaşılan tabloya yaz, alt yüzdelikte kalırsa durdur"""
+
+            pruned_at = None
+
+            def on_epoch_end(self, epoch, logs=None):
+                value = float(logs['val_pr_auc'])
+                progress[task['trial']] = list(progress.get(task['trial'], [])) + [value]
+                if should_prune(progress, task['trial'], epoch, value, **pruning):
+                    self.pruned_at = epoch + 1
+                    self.model.stop_training = True
+
+        pruner = Pruner()
+        history = gru_model.model.fit(
+            WindowBatchSequence(X_train, y_train, params['batch_size'], shuffle=True),
+            validation_data=WindowBatchSequence(X_val, y_val, params['batch_size']),
+            epochs=task['epochs'],
+            class_weight=class_weight,
+            callbacks=[
+                callbacks.EarlyStopping(monitor='val_pr_auc', patience=task['patience'], mode='max'),
+                pruner
+            ],
+            verbose=0
+        ).history
+
+        best_epoch = int(np.argmax(history['val_pr_auc']))
+        record.update({
+            'status': 'pruned' if pruner.pruned_at else 'complete',
+            'best_val_pr_auc': float(history['val_pr_auc'][best_epoch]),
+            'best_val_roc_auc': float(history['val_roc_auc'][best_epoch]),
+            'best_epoch': best_epoch + 1,
+            'epochs': len(history['val_pr_auc']),
+            'val_pr_auc': [float(v) for v in history['val_pr_auc']]
+        })
+        record['train_samples_per_s'] = (
+            record['epochs'] * len(y_train) / (time.perf_counter() - start)
+        )
+    except Exception:
+        record['error'] = traceback.format_exc()
+    record['wall_s'] = time.perf_counter() - start
+    return record
+
+
+def save_results(path: str, header: dict, records: list):
+    """Sonuç tablosunu en iyi val_pr_auc'a göre sıralı yaz"""
+    ranked = sorted(records, key=lambda r: r.get('best_val_pr_auc', -1.0), reverse=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({**header, 'trials': ranked}, f, indent=2)
+
+
+def print_table(records: list, top: int = 20):
+    """En iyi denemeleri tablo olarak yazdır"""
+    ranked = sorted(records, key=lambda r: r.get('best_val_pr_auc', -1.0), reverse=True)
+    print(f"\n  {'#':>4} {'GRU':>5} {'Dense':>6} {'Dropout':>8} {'LR':>10} {'Batch':>6} "
+          f"{'val PR-AUC':>11} {'val ROC-AUC':>12} {'Epoch':>6} {'Süre (sn)':>10}  Durum")
+    for record in ranked[:top]:
+        p = record['params']
+        pr_auc = f"{record['best_val_pr_auc']:.4f}" if 'best_val_pr_auc' in record else '-'
+        roc_auc = f"{record['best_val_roc_auc']:.4f}" if 'best_val_roc_auc' in record else '-'
+        epochs = f"{record.get('best_epoch', '-')}/{record.get('epochs', '-')}"
+        print(f"  {record['trial']:>4} {p['gru_units']:>5} {p['dense_units']:>6} "
+              f"{p['dropout']:>8.2f} {p['lr']:>10.2e} {p['batch_size']:>6} {pr_auc:>11} "
+              f"{roc_auc:>12} {epochs:>6} {record['wall_s']:>10.1f}  {record['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='GRU hiperparametre taraması (paralel, ortak memory-mapped veri)'
+    )
+    parser.add_argument('--data', type=str, required=True,
+                        help='prepare_sequence_dataset_v23.py çıktı dizini (windows veya index)')
+    parser.add_argument('--space', type=str, default=None,
+                        help='Arama uzayı JSON dosyası (varsayılan: küçük bir grid)')
+    parser.add_argument('--mode', type=str, choices=['grid', 'random'], default='grid',
+                        help='Arama türü (varsayılan: grid)')
+    parser.add_argument('--trials', type=int, default=20,
+                        help='Rastgele aramada deneme sayısı (varsayılan: 20)')
+    parser.add_argument('--epochs', type=int, default=20,
+                        help='Deneme başına maksimum epoch (varsayılan: 20)')
+    parser.add_argument('--patience', type=int, default=5,
+                        help='Deneme başına EarlyStopping sabrı (varsayılan: 5)')
+    parser.add_argument('--parallel', type=int, default=2,
+                        help='Aynı anda çalışan deneme sayısı (varsayılan: 2)')
+    parser.add_argument('--threads-per-trial', type=int, default=None,
+                        help='Deneme başına iş parçacığı (varsayılan: çekirdek sayısı / --parallel)')
+    parser.add_argument('--prune-warmup', type=int, default=3,
+                        help='Budama kontrolünden önceki epoch sayısı (varsayılan: 3)')
+    parser.add_argument('--prune-min-trials', type=int, default=4,
+                        help='Budama için aynı epoch\'a ulaşmış en az deneme sayısı (varsayılan: 4)')
+    parser.add_argument('--prune-percentile', type=float, default=25.0,
+                        help='Bu yüzdeliğin altındaki denemeler budanır; 0 budamayı kapatır '
+                             '(varsayılan: 25)')
+    parser.add_argument('--seed', type=int, default=42, help='Rastgele arama ve eğitim tohumu')
+    parser.add_argument('--output', type=str, default='sweeps',
+                        help='Sonuç dizini (sweep_results.json)')
+    args = parser.parse_args()
+
+    info = load_dataset_info(args.data)
+    if info['format'] == FORMAT_SHARDS:
+        parser.error("Tarama memory-mapped veri gerektirir; shards yerine windows veya index "
+                     "formatı kullanın")
+
+    space = load_space(args.space)
+    if args.mode == 'grid':
+        trials = grid_trials(space)
+    else:
+        trials = random_trials(space, args.trials, args.seed)
+    threads = args.threads_per_trial or max(1, cpu_config.usable_cpus() // args.parallel)
+    pruning = {
+        'warmup': args.prune_warmup,
+        'min_trials': args.prune_min_trials if args.prune_percentile > 0 else len(trials) + 1,
+        'percentile': args.prune_percentile
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    results_path = os.path.join(args.output, 'sweep_results.json')
+    header = {
+        'data': args.data,
+        'mode': args.mode,
+        'space': space,
+        'epochs': args.epochs,
+        'patience': args.patience,
+        'parallel': args.parallel,
+        'threads_per_trial': threads,
+        'pruning': pruning,
+        'started': datetime.now().isoformat(timespec='seconds')
+    }
+
+    print("="*60)
+    print("GRU HİPERPARAMETRE TARAMASI - v23")
+    print("="*60)
+    print(f"Veri: {args.data} (format: {info['format']})")
+    print(f"Arama: {args.mode}, {len(trials)} deneme, {args.parallel} paralel, "
+          f"{threads} thread/deneme")
+    print(f"Budama: {args.prune_percentile:g}. yüzdelik, {args.prune_warmup} epoch sonra")
+
+    records = []
+    start = time.perf_counter()
+    with mp.Manager() as manager:
+        progress = manager.dict()
+        tasks = [
+            {
+                'trial': i,
+                'params': params,
+                'data': args.data,
+                'epochs': args.epochs,
+                'patience': args.patience,
+                'seed': args.seed,
+                'threads': threads,
+                'progress': progress,
+                'pruning': pruning
+            }
+            for i, params in enumerate(trials)
+        ]
+        # maxtasksperchild=1: her deneme temiz bir TensorFlow süreciyle başlar
+        with mp.get_context('spawn').Pool(
+            processes=args.parallel, initializer=_init_worker, initargs=(threads,),
+            maxtasksperchild=1
+        ) as pool:
+            for record in pool.imap_unordered(_run_trial, tasks):
+                records.append(record)
+                save_results(results_path, header, records)
+                score = (f"val PR-AUC {record['best_val_pr_auc']:.4f}"
+                         if 'best_val_pr_auc' in record else 'hata')
+                print(f"  [{len(records)}/{len(tasks)}] deneme {record['trial']}: "
+                      f"{record['status']}, {score}, {record['wall_s']:.0f} s")
+                if record['status'] == 'failed':
+                    print(record['error'])
+
+    header['wall_s'] = time.perf_counter() - start
+    save_results(results_path, header, records)
+    print_table(records)
+
+    completed = [r for r in records if 'best_val_pr_auc' in r]
+    if completed:
+        best = max(completed, key=lambda r: r['best_val_pr_auc'])
+        flags = ' '.join(f"{PARAMS[name][0]} {value}" for name, value in best['params'].items())
+        print(f"\nEn iyi deneme: {best['trial']} (val PR-AUC {best['best_val_pr_auc']:.4f})")
+        print(f"  python train_gru_v23.py --data {args.data} {flags}")
+    print(f"\n✓ Sonuçlar kaydedildi: {results_path} ({header['wall_s']:.0f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Batch inference (run_gru_on_csv_v23.py) modlarının aynı çıktıyı ürettiğini
+doğrular: varsayılan (bellekte), --chunk-rows (streaming) ve --workers ile
+paralel (bellekte ve parça parça) çalıştırmalar satır sırası ve değerleriyle
+aynı olmalı. Kesintiye uğrayan çalıştırmaların --resume ile (commit edilmemiş
+part dosyaları geride kalmış olsa bile) aynı çıktıyı ürettiği ve değişen
+girdide devam etmenin reddedildiği de doğrulanır.
+"""
+
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+from tensorflow import keras
+
+from run_gru_on_csv_v23 import RunCheckpoint, SepsisInferencePipeline
+
+WINDOW = 6
+CHUNK_ROWS = 37
+FEATURES = ['HR', 'MAP', 'Temp']
+
+
+def make_frame(seed=0, n_patients=40):
+    """(Patient_ID, ICULOS) sıralı sentetik veri; bazı hastalar pencereden kısa"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for patient_id in range(n_patients):
+        for iculos in range(1, rng.integers(2, 25)):
+            rows.append({
+                'Patient_ID': patient_id * 3 + 1,
+                'ICULOS': iculos,
+                'HR': rng.normal(85, 12) if rng.random() > 0.2 else np.nan,
+                'MAP': rng.normal(75, 8) if rng.random() > 0.3 else np.nan,
+                'Temp': rng.normal(37, 0.6)
+            })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope='module')
+def artifacts(tmp_path_factory):
+    """Girdi CSV'si, küçük bir GRU modeli ve preprocessing nesneleri"""
+    root = tmp_path_factory.mktemp('inference')
+    df = make_frame()
+    input_path = str(root / 'input.csv')
+    df.to_csv(input_path, index=False)
+
+    preprocessing_dir = root / 'preprocessing'
+    preprocessing_dir.mkdir()
+    imputer = SimpleImputer(strategy='median').fit(df[FEATURES].values)
+    scaler = StandardScaler().fit(imputer.transform(df[FEATURES].values))
+    for name, obj in [('imputer.pkl', imputer), ('scaler.pkl', scaler),
+                      ('column_info.pkl', {'numerical_columns': FEATURES,
+                                           'categorical_columns': []})]:
+        with open(preprocessing_dir / name, 'wb') as f:
+            pickle.dump(obj, f)
+
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.layers.Input(shape=(WINDOW, len(FEATURES))),
+        keras.layers.GRU(4),
+        keras.layers.Dense(1, activation='sigmoid')
+    ])
+    model_path = str(root / 'model.keras')
+    model.save(model_path)
+
+    return {'input': input_path, 'model': model_path,
+            'preprocessing': str(preprocessing_dir), 'root': root}
+
+
+def make_pipeline(artifacts, load=True):
+    pipeline = SepsisInferencePipeline(
+        model_path=artifacts['model'],
+        preprocessing_dir=artifacts['preprocessing'],
+        window_size=WINDOW,
+        batch_size=64
+    )
+    if load:
+        pipeline.load_model()
+        pipeline.load_preprocessing_objects()
+    return pipeline
+
+
+@pytest.fixture(scope='module')
+def reference(artifacts):
+    """Varsayılan (tek süreç, bellekte) çalıştırmanın çıktısı"""
+    output_path = str(artifacts['root'] / 'reference.csv')
+    make_pipeline(artifacts).predict_csv(artifacts['input'], output_path, block_rows=50)
+    return output_path
+
+
+def assert_same_output(output_path, reference_path):
+    """
+    Satır sırası ve tüm sütunlar aynı; proba batch bileşimine bağlı float32
+    yuvarlaması kadar (~1 ulp) farklı olabilir
+    """
+    output = pd.read_csv(output_path)
+    expected = pd.read_csv(reference_path)
+    pd.testing.assert_frame_equal(output.drop(columns='proba'),
+                                  expected.drop(columns='proba'), check_exact=True)
+    np.testing.assert_allclose(output['proba'], expected['proba'], rtol=0, atol=1e-6)
+
+
+def test_reference_covers_every_row(artifacts, reference):
+    output = pd.read_csv(reference)
+    expected = pd.read_csv(artifacts['input'])
+    assert len(output) == len(expected)
+    np.testing.assert_array_equal(output['Patient_ID'], expected['Patient_ID'])
+    np.testing.assert_array_equal(output['ICULOS'], expected['ICULOS'])
+    assert (output['insufficient_history'] == (output['row_index'] < WINDOW - 1)).all()
+
+
+@pytest.mark.parametrize('chunk_rows', [None, CHUNK_ROWS])
+def test_parallel_output_matches_default(artifacts, reference, tmp_path, chunk_rows):
+    output_path = str(tmp_path / 'parallel.csv')
+    make_pipeline(artifacts, load=False).run(
+        artifacts['input'], output_path, chunk_rows=chunk_rows, n_workers=2
+    )
+    assert_same_output(output_path, reference)
+    assert not os.path.exists(output_path + '.parts')
+
+
+def fail_after(pipeline, n_calls):
+    """score_chunk'ı n_calls başarılı çağrıdan sonra hata verecek şekilde sar (kesinti)"""
+    score_chunk = pipeline.score_chunk
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        if len(calls) >= n_calls:
+            raise KeyboardInterrupt
+        calls.append(1)
+        return score_chunk(*args, **kwargs)
+
+    pipeline.score_chunk = interrupted
+    return calls
+
+
+def leave_uncommitted_parts(output_path, shard, seq):
+    """Commit'ten önce öldürülmüş bir yazımın artıklarını bırak"""
+    parts_dir = output_path + '.parts'
+    for name in [f".tmp-part-{shard:05d}-{seq:06d}.csv", f"part-{shard:05d}-{seq:06d}.csv"]:
+        with open(os.path.join(parts_dir, name), 'w') as f:
+            f.write('row_index,proba\n0,0.5\n')
+
+
+def test_streaming_output_matches_default(artifacts, reference, tmp_path):
+    output_path = str(tmp_path / 'streaming.csv')
+    make_pipeline(artifacts).predict_csv_streaming(artifacts['input'], output_path, CHUNK_ROWS)
+    assert_same_output(output_path, reference)
+    assert not os.path.exists(output_path + '.parts')
+
+
+def test_streaming_resume_skips_committed_chunks(artifacts, reference, tmp_path):
+    output_path = str(tmp_path / 'streaming.csv')
+    pipeline = make_pipeline(artifacts)
+    fail_after(pipeline, 3)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.predict_csv_streaming(artifacts['input'], output_path, CHUNK_ROWS)
+    assert len(RunCheckpoint(output_path).part_paths(0)) == 3
+    leave_uncommitted_parts(output_path, shard=0, seq=3)
+    leave_uncommitted_parts(output_path, shard=0, seq=40)
+
+    # Progress'te kayıtlı olmayan part dosyaları yüklenirken silinir
+    checkpoint = RunCheckpoint(output_path)
+    assert len(checkpoint.load_progress(0)['parts']) == 3
+    assert sorted(os.listdir(checkpoint.parts_dir)) == [
+        'manifest.json', 'part-00000-000000.csv', 'part-00000-000001.csv',
+        'part-00000-000002.csv', 'progress-00000.json'
+    ]
+    leave_uncommitted_parts(output_path, shard=0, seq=3)
+
+    pipeline = make_pipeline(artifacts)
+    calls = fail_after(pipeline, 1_000)
+    pipeline.predict_csv_streaming(artifacts['input'], output_path, CHUNK_ROWS, resume=True)
+
+    n_chunks = int(np.ceil(len(pd.read_csv(artifacts['input'])) / CHUNK_ROWS))
+    assert len(calls) == n_chunks - 3
+    assert_same_output(output_path, reference)
+    assert not os.path.exists(output_path + '.parts')
+
+
+def test_resume_refuses_changed_input(artifacts, tmp_path):
+    input_path = str(tmp_path / 'input.csv')
+    shutil.copyfile(artifacts['input'], input_path)
+    output_path = str(tmp_path / 'streaming.csv')
+    pipeline = make_pipeline(artifacts)
+    fail_after(pipeline, 2)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.predict_csv_streaming(input_path, output_path, CHUNK_ROWS)
+
+    df = pd.read_csv(input_path)
+    df.loc[len(df) - 1, 'HR'] = 200.0
+    df.to_csv(input_path, index=False)
+    with pytest.raises(ValueError, match='input_sha256'):
+        make_pipeline(artifacts).predict_csv_streaming(
+            input_path, output_path, CHUNK_ROWS, resume=True
+        )
+    # Reddedilen devam commit edilmiş parçalara dokunmaz
+    assert len(RunCheckpoint(output_path).part_paths(0)) == 2
+
+
+def test_parallel_resume_after_interruption(artifacts, reference, tmp_path):
+    output_path = str(tmp_path / 'parallel.csv')
+    pipeline = make_pipeline(artifacts)
+    checkpoint = RunCheckpoint(output_path)
+    checkpoint.start(
+        pipeline.run_fingerprint(artifacts['input'], output_path, CHUNK_ROWS, 2), resume=False
+    )
+    # Shard 1 tamamlanmış, shard 0 iki parçadan sonra kesilmiş
+    pipeline.stream_shard(artifacts['input'], checkpoint, 1, 2, CHUNK_ROWS)
+    fail_after(pipeline, 2)
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.stream_shard(artifacts['input'], checkpoint, 0, 2, CHUNK_ROWS)
+    leave_uncommitted_parts(output_path, shard=0, seq=2)
+
+    make_pipeline(artifacts, load=False).run(
+        artifacts['input'], output_path, chunk_rows=CHUNK_ROWS, n_workers=2, resume=True
+    )
+    assert_same_output(output_path, reference)
+    assert not os.path.exists(output_path + '.parts')
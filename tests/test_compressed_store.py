@@ -0,0 +1,116 @@
+"""
+Sıkıştırılmış pencere deposunun (.npc) yazma / okuma ve journal'lı ekleme
+davranışı: yarıda kesilen bir ekleme dosyayı okunamaz bırakmamalı ve bir
+sonraki eklemede temizlenmeli.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from compressed_store import (
+    CompressedArray,
+    CompressedArrayWriter,
+    available_codecs,
+)
+
+ROW_SHAPE = (6, 4)
+
+
+def make_rows(n, seed):
+    return np.random.default_rng(seed).normal(size=(n,) + ROW_SHAPE).astype(np.float32)
+
+
+def write(path, rows, **kwargs):
+    with CompressedArrayWriter(path, dtype=np.float32, row_shape=ROW_SHAPE,
+                               chunk_rows=64, **kwargs) as writer:
+        writer.write(rows)
+
+
+def read(path):
+    array = CompressedArray(path)
+    try:
+        return array[:]
+    finally:
+        array.close()
+
+
+@pytest.mark.parametrize('codec', available_codecs())
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_round_trip(tmp_path, codec, shuffle):
+    path = str(tmp_path / 'X.npc')
+    rows = make_rows(300, seed=0)
+    write(path, rows, codec=codec, shuffle=shuffle)
+
+    array = CompressedArray(path)
+    assert array.shape == rows.shape
+    assert array.dtype == np.float32
+    np.testing.assert_array_equal(array[:], rows)
+    np.testing.assert_array_equal(array[70:200], rows[70:200])
+    np.testing.assert_array_equal(array[[299, 0, 64, 63]], rows[[299, 0, 64, 63]])
+    np.testing.assert_array_equal(array[5], rows[5])
+    array.close()
+
+
+def test_append(tmp_path):
+    path = str(tmp_path / 'X.npc')
+    first, second = make_rows(150, seed=0), make_rows(100, seed=1)
+    write(path, first)
+    with CompressedArrayWriter(path, mode='a') as writer:
+        writer.write(second)
+
+    np.testing.assert_array_equal(read(path), np.concatenate([first, second]))
+    assert not os.path.exists(path + '.journal')
+
+
+def test_failed_append_is_rolled_back(tmp_path):
+    path = str(tmp_path / 'X.npc')
+    rows = make_rows(150, seed=0)
+    write(path, rows)
+    size = os.path.getsize(path)
+
+    with pytest.raises(RuntimeError):
+        with CompressedArrayWriter(path, mode='a') as writer:
+            writer.write(make_rows(200, seed=1))
+            raise RuntimeError
+
+    assert os.path.getsize(path) == size
+    assert not os.path.exists(path + '.journal')
+    np.testing.assert_array_equal(read(path), rows)
+
+
+def test_interrupted_append_keeps_file_readable(tmp_path):
+    path = str(tmp_path / 'X.npc')
+    first, second = make_rows(150, seed=0), make_rows(100, seed=1)
+    write(path, first)
+    size = os.path.getsize(path)
+
+    # Süreç ekleme sırasında öldürülmüş gibi: parçalar yazıldı, alt bilgi yazılmadı
+    writer = CompressedArrayWriter(path, mode='a')
+    writer.write(make_rows(200, seed=2))
+    writer.file.close()
+    assert os.path.getsize(path) > size
+    assert os.path.exists(path + '.journal')
+
+    # Okuyucular journal'daki boyuttaki eski alt bilgiyi kullanır
+    np.testing.assert_array_equal(read(path), first)
+
+    # Sonraki ekleme yarım baytları kırpar ve journal'ı temizler
+    with CompressedArrayWriter(path, mode='a') as writer:
+        writer.write(second)
+    np.testing.assert_array_equal(read(path), np.concatenate([first, second]))
+    assert not os.path.exists(path + '.journal')
+
+
+def test_overwrite_discards_stale_journal(tmp_path):
+    path = str(tmp_path / 'X.npc')
+    write(path, make_rows(150, seed=0))
+    writer = CompressedArrayWriter(path, mode='a')
+    writer.write(make_rows(100, seed=1))
+    writer.file.close()
+
+    rows = make_rows(80, seed=2)
+    write(path, rows)
+    assert not os.path.exists(path + '.journal')
+    np.testing.assert_array_equal(read(path), rows)
@@ -0,0 +1,85 @@
+"""
+Damıtma kaybının öğrenciyi öğretmenin T=1 skoruna çektiğini doğrular: sıcaklık
+yalnızca öğretmen tarafına uygulansaydı öğrenci skorları 0.5'e kayar ve 0.1799
+çalışma noktası öğretmeninkiyle aynı anlamı taşımazdı. Öğretmen skor
+önbelleğinin öğretmen dosyasına bağlı olduğu da doğrulanır.
+"""
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from tensorflow import keras
+
+from distill_gru_v23 import (
+    THRESHOLD,
+    compile_student,
+    distillation_loss,
+    teacher_logits,
+    teacher_scores,
+)
+from file_utils import file_sha256
+
+
+@pytest.mark.parametrize('temperature', [1.0, 2.0, 4.0])
+def test_soft_loss_is_minimal_at_teacher_score(temperature):
+    teacher = teacher_logits(np.array([THRESHOLD, 0.02, 0.9], dtype=np.float32))
+    y_true = tf.constant(np.stack([np.zeros(3), teacher], axis=1), dtype=tf.float32)
+    student_logit = tf.Variable(teacher[:, None])
+
+    with tf.GradientTape() as tape:
+        loss = distillation_loss(0.0, temperature)(y_true, tf.sigmoid(student_logit))
+    gradient = tape.gradient(loss, student_logit).numpy()
+
+    np.testing.assert_allclose(gradient, 0.0, atol=1e-5)
+
+
+@pytest.mark.parametrize('alpha', [0.0, 0.5])
+@pytest.mark.parametrize('temperature', [1.0, 4.0])
+def test_student_is_calibrated_at_operating_point(alpha, temperature):
+    # Aynı girdili 2000 pencere: öğretmen skoru ve pozitif oranı eşik değerinde
+    n = 2_000
+    X = np.ones((n, 1), dtype=np.float32)
+    y = np.zeros(n, dtype=np.float32)
+    y[:int(round(THRESHOLD * n))] = 1
+    teacher = teacher_logits(np.full(n, THRESHOLD, dtype=np.float32))
+
+    keras.utils.set_random_seed(0)
+    student = keras.Sequential([
+        keras.layers.Input(shape=(1,)),
+        keras.layers.Dense(1, activation='sigmoid', use_bias=False)
+    ])
+    compile_student(student, learning_rate=0.05, alpha=alpha, temperature=temperature)
+    student.fit(X, np.stack([y, teacher], axis=1), batch_size=500, epochs=80, verbose=0)
+
+    proba = float(student.predict_on_batch(X[:1])[0, 0])
+    assert proba == pytest.approx(THRESHOLD, abs=0.005)
+
+
+def save_teacher(path, seed):
+    keras.utils.set_random_seed(seed)
+    teacher = keras.Sequential([
+        keras.layers.Input(shape=(6, 3)),
+        keras.layers.GRU(4),
+        keras.layers.Dense(1, activation='sigmoid')
+    ])
+    teacher.save(path)
+    return teacher
+
+
+def test_teacher_score_cache_is_keyed_on_teacher_file(tmp_path):
+    X = np.random.default_rng(0).standard_normal((50, 6, 3)).astype(np.float32)
+    cache_path = str(tmp_path / 'teacher_train.npy')
+    first_path, second_path = str(tmp_path / 'first.keras'), str(tmp_path / 'second.keras')
+    first, second = save_teacher(first_path, seed=0), save_teacher(second_path, seed=1)
+
+    first_scores = teacher_scores(first, X, cache_path, file_sha256(first_path))
+    np.testing.assert_allclose(first_scores, first.predict(X, verbose=0)[:, 0], atol=1e-6)
+    # Aynı öğretmen dosyası: önbellek kullanılır (model yeniden çalıştırılmaz)
+    cached = teacher_scores(second, X, cache_path, file_sha256(first_path))
+    np.testing.assert_array_equal(cached, first_scores)
+
+    # Aynı uzunlukta ama farklı öğretmen: skorlar yeniden hesaplanır
+    second_scores = teacher_scores(second, X, cache_path, file_sha256(second_path))
+    np.testing.assert_allclose(second_scores, second.predict(X, verbose=0)[:, 0], atol=1e-6)
+    assert not np.allclose(second_scores, first_scores)
+    np.testing.assert_array_equal(np.load(cache_path), second_scores)
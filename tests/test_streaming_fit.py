@@ -0,0 +1,103 @@
+"""
+Out-of-core imputer/scaler eğitiminin (fit_preprocessing_streaming) bellek içi
+fit_preprocessing ile karşılaştırması.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepare_sequence_dataset_v23 import SepsisDataPreprocessor
+
+
+def make_frame(seed=0, n_patients=30):
+    """(Patient_ID, ICULOS) sıralı sentetik veri"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for patient_id in range(n_patients):
+        for iculos in range(1, rng.integers(5, 15)):
+            rows.append({
+                'Patient_ID': patient_id,
+                'ICULOS': iculos,
+                'HR': rng.normal(85, 12) if rng.random() > 0.2 else np.nan,
+                'MAP': rng.normal(75, 8) if rng.random() > 0.3 else np.nan,
+                'Temp': rng.normal(37, 0.6),
+                'SepsisLabel': int(rng.random() < 0.05)
+            })
+    return pd.DataFrame(rows)
+
+
+def fit_in_memory(path):
+    """prepare_sequence_dataset_v23 ile aynı yol: load -> clean -> fit"""
+    from data_ingest import load_table
+    preprocessor = SepsisDataPreprocessor()
+    df = load_table(path, use_cache=False)
+    preprocessor.identify_columns(df)
+    preprocessor.fit_preprocessing(preprocessor.clean_data(df))
+    return preprocessor
+
+
+def fit_streaming(path, chunk_rows):
+    preprocessor = SepsisDataPreprocessor()
+    # Küçük veri setinde eps'i küçük tutarak medyanlar tam hesaplanır
+    preprocessor.fit_preprocessing_streaming(path, chunk_rows=chunk_rows, quantile_eps=1e-6)
+    return preprocessor
+
+
+def assert_same_fit(streaming, in_memory):
+    assert streaming.numerical_columns == in_memory.numerical_columns
+    np.testing.assert_allclose(streaming.imputer.statistics_, in_memory.imputer.statistics_,
+                               rtol=1e-6)
+    np.testing.assert_allclose(streaming.scaler.mean_, in_memory.scaler.mean_, rtol=1e-5)
+    np.testing.assert_allclose(streaming.scaler.var_, in_memory.scaler.var_, rtol=1e-4)
+    assert streaming.scaler.n_samples_seen_ == in_memory.scaler.n_samples_seen_
+
+
+def with_duplicates(df, rows):
+    """Verilen satırların kopyalarını hemen arkalarına ekle (sıralı kalır)"""
+    duplicates = df.iloc[rows].assign(Temp=40.0)
+    return (pd.concat([df, duplicates])
+            .sort_index(kind='stable')
+            .reset_index(drop=True))
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet', '.feather'])
+def test_streaming_fit_matches_in_memory_fit(tmp_path, suffix):
+    df = make_frame()
+    path = str(tmp_path / f'train{suffix}')
+    if suffix == '.csv':
+        df.to_csv(path, index=False)
+    elif suffix == '.parquet':
+        pytest.importorskip('pyarrow')
+        df.to_parquet(path, index=False)
+    else:
+        pytest.importorskip('pyarrow')
+        df.to_feather(path)
+
+    assert_same_fit(fit_streaming(path, chunk_rows=37), fit_in_memory(path))
+
+
+def test_duplicate_across_chunk_boundary_is_dropped(tmp_path):
+    chunk_rows = 25
+    df = make_frame(1)
+    # 3. satırın kopyasından sonra 23. satır 24'e, kopyası 25'e (sonraki parça) düşer
+    df = with_duplicates(df, [3, chunk_rows - 2])
+    assert df.iloc[chunk_rows - 1][['Patient_ID', 'ICULOS']].tolist() == \
+        df.iloc[chunk_rows][['Patient_ID', 'ICULOS']].tolist()
+    path = str(tmp_path / 'train.csv')
+    df.to_csv(path, index=False)
+
+    assert_same_fit(fit_streaming(path, chunk_rows), fit_in_memory(path))
+
+
+def test_non_adjacent_duplicate_in_unsorted_input_is_kept(tmp_path):
+    """Belgelenmiş fark: sırasız girdide uzak parçalardaki mükerrer ayıklanmaz"""
+    df = make_frame(2)
+    df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+    path = str(tmp_path / 'train.csv')
+    df.to_csv(path, index=False)
+
+    streaming = fit_streaming(path, chunk_rows=20)
+    in_memory = fit_in_memory(path)
+
+    assert streaming.scaler.n_samples_seen_ == in_memory.scaler.n_samples_seen_ + 1
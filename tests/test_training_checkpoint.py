@@ -0,0 +1,118 @@
+"""
+Tam durum checkpoint'i (training_checkpoint.py) ile kesintiye uğrayan bir
+eğitimin --resume ile kesintisiz eğitimle aynı sonuca ulaştığını doğrular:
+epoch sayacı, öğrenme oranı, EarlyStopping / ReduceLROnPlateau sayaçları,
+ağırlıklar ve birleşik geçmiş. tf.data girdisinin devam ederken ilk epoch'un
+sırasını yeniden oynatmadığı da doğrulanır.
+"""
+
+import numpy as np
+import pytest
+from tensorflow import keras
+
+from input_pipeline import window_dataset
+from training_checkpoint import TrainingCheckpoint
+
+EPOCHS = 5
+FINGERPRINT = {'data': 'synthetic', 'lr': 0.05}
+
+
+def make_data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((256, 4)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * rng.standard_normal(256) > 0).astype(np.float32)
+    return X, y
+
+
+class Interrupt(keras.callbacks.Callback):
+    """Verilen epoch başında eğitimi keser (süreç öldürülmüş gibi)"""
+
+    def __init__(self, at_epoch):
+        super().__init__()
+        self.at_epoch = at_epoch
+
+    def on_epoch_begin(self, epoch, logs=None):
+        if epoch == self.at_epoch:
+            raise KeyboardInterrupt
+
+
+def run(checkpoint_dir, resume=False, interrupt_at=None):
+    """Aynı modeli ve callback'leri kurup (gerekirse kesintiyle) eğit"""
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.layers.Input(shape=(4,)),
+        keras.layers.Dense(8, activation='relu'),
+        keras.layers.Dense(1, activation='sigmoid')
+    ])
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=0.05),
+                  loss='binary_crossentropy')
+    tracked = [
+        keras.callbacks.EarlyStopping(monitor='val_loss', patience=50,
+                                      restore_best_weights=True),
+        # min_delta büyük: her epoch iyileşmemiş sayılır, öğrenme oranı düşer
+        keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=1,
+                                          min_delta=10.0, min_lr=1e-4)
+    ]
+    checkpoint = TrainingCheckpoint(str(checkpoint_dir), FINGERPRINT, tracked)
+    checkpoint.start(resume=resume, epochs=EPOCHS)
+    callbacks_list = tracked + [checkpoint]
+    if interrupt_at is not None:
+        callbacks_list.append(Interrupt(interrupt_at))
+
+    X, y = make_data()
+    model.fit(X[:192], y[:192], validation_data=(X[192:], y[192:]), batch_size=32,
+              epochs=EPOCHS, initial_epoch=checkpoint.initial_epoch,
+              callbacks=callbacks_list, shuffle=False, verbose=0)
+    return model, tracked, checkpoint
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    model, tracked, checkpoint = run(tmp_path / 'uninterrupted')
+
+    with pytest.raises(KeyboardInterrupt):
+        run(tmp_path / 'resumed', interrupt_at=3)
+    resumed_model, resumed_tracked, resumed = run(tmp_path / 'resumed', resume=True)
+
+    assert resumed.initial_epoch == 3
+    assert resumed.state['epoch'] == checkpoint.state['epoch'] == EPOCHS
+    assert resumed.state['completed']
+    assert float(keras.backend.get_value(resumed_model.optimizer.lr)) == pytest.approx(
+        float(keras.backend.get_value(model.optimizer.lr))
+    )
+    assert resumed.state['learning_rate'] < 0.05
+    for callback, resumed_callback in zip(tracked, resumed_tracked):
+        assert resumed_callback.wait == callback.wait
+        assert resumed_callback.best == pytest.approx(callback.best)
+    assert resumed_tracked[0].best_epoch == tracked[0].best_epoch
+
+    # Geçmiş kesintiden önceki epoch'ları da içerir
+    assert sorted(resumed.history) == sorted(checkpoint.history)
+    for key, values in checkpoint.history.items():
+        assert len(resumed.history[key]) == EPOCHS
+        np.testing.assert_allclose(resumed.history[key], values, rtol=1e-5)
+    for weights, resumed_weights in zip(model.get_weights(), resumed_model.get_weights()):
+        np.testing.assert_allclose(resumed_weights, weights, rtol=1e-5, atol=1e-6)
+
+
+def test_resume_refuses_changed_fingerprint(tmp_path):
+    run(tmp_path)
+    checkpoint = TrainingCheckpoint(str(tmp_path), dict(FINGERPRINT, lr=0.01), [])
+    with pytest.raises(ValueError, match='lr'):
+        checkpoint.start(resume=True, epochs=EPOCHS)
+
+
+def epoch_batches(dataset):
+    """Bir epoch'un batch'leri (paralel map sırası değişebilir; içerikler sabit)"""
+    return sorted(tuple(y.numpy().astype(int)) for _, y in dataset)
+
+
+def test_window_dataset_resumes_epoch_order():
+    X = np.zeros((64, 6, 2), dtype=np.float32)
+    y = np.arange(64)
+    uninterrupted = window_dataset(X, y, batch_size=8, shuffle=True, seed=7)
+    epochs = [epoch_batches(uninterrupted) for _ in range(3)]
+    assert epochs[0] != epochs[1] != epochs[2]
+
+    # Epoch 1'den devam eden pipeline epoch 0'ı değil, epoch 1 ve 2'yi üretir
+    resumed = window_dataset(X, y, batch_size=8, shuffle=True, seed=7, initial_epoch=1)
+    assert [epoch_batches(resumed) for _ in range(2)] == epochs[1:]
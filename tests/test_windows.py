@@ -0,0 +1,92 @@
+"""
+Vektörleştirilmiş pencere oluşturmanın (window_starts / gather_windows), eski
+hasta bazlı döngüyle aynı pencereleri, sırayı ve tipleri ürettiğini doğrular.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prepare_sequence_dataset_v23 import SepsisDataPreprocessor
+from sequence_store import WindowDataset, gather_windows
+
+
+def reference_sequences(df, X, window_size, step_size):
+    """Vektörleştirmeden önceki create_sequences döngüsü"""
+    sequences, labels = [], []
+    for patient_id in df['Patient_ID'].unique():
+        patient_mask = (df['Patient_ID'] == patient_id).to_numpy()
+        patient_X = X[patient_mask]
+        patient_y = df.loc[patient_mask, 'SepsisLabel'].values
+        for start_idx in range(0, len(patient_X) - window_size + 1, step_size):
+            end_idx = start_idx + window_size
+            sequences.append(patient_X[start_idx:end_idx])
+            labels.append(patient_y[end_idx - 1])
+    return np.array(sequences), np.array(labels)
+
+
+def make_frame(seed, n_patients=40, nan_ids=False, string_ids=False):
+    """Satırları karışık (hasta bazında gruplu olmayan) sentetik veri"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 20, size=n_patients)
+    ids = np.repeat(rng.permutation(n_patients) * 7 + 3, lengths).astype(float)
+    if string_ids:
+        ids = np.array([f"p{int(i)}" for i in ids], dtype=object)
+    if nan_ids:
+        ids[rng.choice(len(ids), size=len(ids) // 10, replace=False)] = np.nan
+    df = pd.DataFrame({
+        'Patient_ID': ids,
+        'SepsisLabel': rng.integers(0, 2, size=len(ids))
+    })
+    order = rng.permutation(len(df))
+    df = df.iloc[order].reset_index(drop=True)
+    # Satır kimliği özellik olarak: eşleşme hataları değerlerden görülür
+    X = np.column_stack([order, rng.normal(size=(len(df), 3))]).astype(np.float32)
+    return df, X
+
+
+@pytest.mark.parametrize('window_size', [1, 3, 6])
+@pytest.mark.parametrize('step_size', [1, 2, 5])
+@pytest.mark.parametrize('nan_ids', [False, True])
+@pytest.mark.parametrize('string_ids', [False, True])
+def test_create_sequences_matches_reference_loop(window_size, step_size, nan_ids, string_ids):
+    df, X = make_frame(window_size * 100 + step_size, nan_ids=nan_ids, string_ids=string_ids)
+    preprocessor = SepsisDataPreprocessor(window_size=window_size, step_size=step_size)
+
+    X_seq, y_seq = preprocessor.create_sequences(df, X)
+    X_ref, y_ref = reference_sequences(df, X, window_size, step_size)
+
+    assert X_seq.shape == X_ref.shape
+    assert X_seq.dtype == X_ref.dtype
+    assert y_seq.dtype == y_ref.dtype
+    np.testing.assert_array_equal(X_seq, X_ref)
+    np.testing.assert_array_equal(y_seq, y_ref)
+
+
+def test_grouped_input_is_not_reordered():
+    df, X = make_frame(7)
+    order = np.argsort(pd.factorize(df['Patient_ID'])[0], kind='stable')
+    df, X = df.iloc[order].reset_index(drop=True), X[order]
+    preprocessor = SepsisDataPreprocessor(window_size=4, step_size=1)
+
+    grouped_order, _ = preprocessor.window_starts(df['Patient_ID'].to_numpy())
+
+    assert grouped_order is None
+
+
+def test_window_index_matches_reference_loop():
+    df, X = make_frame(11, nan_ids=True)
+    preprocessor = SepsisDataPreprocessor(window_size=6, step_size=2)
+
+    X_grouped, ends, labels, patients = preprocessor.create_window_index(df, X)
+    X_ref, y_ref = reference_sequences(df, X, 6, 2)
+
+    np.testing.assert_array_equal(gather_windows(X_grouped, ends, 6), X_ref)
+    np.testing.assert_array_equal(WindowDataset(X_grouped, ends, 6)[:], X_ref)
+    np.testing.assert_array_equal(labels, y_ref)
+    # Her pencere tek bir hastaya ait ve patients pencere sonundaki hasta
+    codes = pd.factorize(df['Patient_ID'])[0]
+    grouped_ids = df['Patient_ID'].to_numpy()[np.argsort(codes, kind='stable')]
+    window_ids = gather_windows(grouped_ids[:, None], ends, 6)[:, :, 0]
+    assert np.all(window_ids == window_ids[:, :1])
+    np.testing.assert_array_equal(patients, window_ids[:, -1])
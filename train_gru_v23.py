@@ -14,11 +14,34 @@ Model Mimarisi:
 - EarlyStopping (val_pr_auc)
 - ReduceLROnPlateau
 - ModelCheckpoint (en iyi ağırlıkları kaydet)
+- windows ve index veri formatları; veri mmap_mode='r' ile açılır ve
+  pencereler WindowBatchSequence ile batch batch okunur
+- shards formatı: tf.data ile paralel, iç içe geçirilmiş shard okuma
+  (bkz. input_pipeline.py)
+- --input-pipeline tfdata: windows/index verisi için tf.data pipeline'ı
+  (karıştırma tamponu, paralel pencere toplama, prefetch, --cache-val)
+- --jit-compile: train/predict adımları XLA ile derlenir; --unroll: kısa
+  sabit pencere için GRU döngüsü açılır (bkz. model_runtime.py)
+- --intra-op-threads / --inter-op-threads / --omp-threads / --cpu-affinity:
+  CPU iş parçacığı ayarları (bkz. cpu_config.py)
+- Kesintiye dayanıklı eğitim: her --checkpoint-every epoch'ta tam durum
+  (ağırlıklar, optimizer, callback sayaçları, RNG, geçmiş) kaydedilir;
+  --resume ile kalınan epoch'tan devam edilir (bkz. training_checkpoint.py)
+- --balance sampler: class_weight yerine hedef pozitif oranlı dengeli
+  batch'ler (BalancedBatchSequence, --pos-fraction)
+- Eğitim telemetrisi: epoch / batch süresi, örnek/sn, veri üretme süresi,
+  RSS ve CPU kullanımı geçmişe ve grafiklere eklenir (bkz. training_telemetry.py)
 
 Kullanım:
     python train_gru_v23.py --data data/processed/ --epochs 60
 """
 
+import cpu_config
+
+if __name__ == '__main__':
+    # Thread ayarları TensorFlow ve OpenMP/MKL yüklenmeden uygulanmalı
+    cpu_config.apply_from_argv()
+
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
@@ -32,24 +55,168 @@ import seaborn as sns
 import argparse
 import os
 import json
+import time
 from datetime import datetime
 
+from compressed_store import CompressedArray, chunk_shuffled_order
+from model_runtime import describe
+from resource_monitor import StageProfiler, format_mb, peak_rss_mb
+from training_checkpoint import TrainingCheckpoint, data_signature
+from training_telemetry import TrainingTelemetry
+from sequence_store import (
+    FORMAT_SHARDS, WindowDataset, index_dtype, load_dataset_info, load_shard_labels,
+    load_split, predict_in_batches
+)
+
+
+class WindowBatchSequence(keras.utils.Sequence):
+    """
+    Index formatındaki, sıkıştırılmış veya memmap ile açılmış veri setleri için Keras Sequence
+
+    Pencereler (batch, window, F) olarak yalnızca istenen batch için
+    toplanır/okunur; eğitim setinde sıra her epoch sonunda karıştırılır.
+    Her epoch'un sırası (seed, epoch) ile belirlenir; initial_epoch ile devam
+    eden eğitim kesintisiz çalıştırmayla aynı sırayı görür.
+    """
+    
+    def __init__(self, X, y, batch_size=512, shuffle=False, seed=42, initial_epoch=0, **kwargs):
+        super().__init__(**kwargs)
+        self.X = X
+        self.y = np.asarray(y)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = initial_epoch
+        self.load_seconds = 0.0
+        self.order = np.arange(len(self.y))
+        if self.shuffle:
+            self._shuffle_order()
+    
+    def _shuffle_order(self):
+        rng = np.random.default_rng([self.seed, self.epoch])
+        if isinstance(self.X, CompressedArray):
+            # Sıkıştırılmış veri: parça bazında karıştırma (batch başına birkaç parça açılır)
+            self.order = chunk_shuffled_order(self.X.chunk_row_starts, rng)
+        else:
+            self.order = rng.permutation(len(self.y))
+    
+    def __len__(self):
+        return int(np.ceil(len(self.y) / self.batch_size))
+    
+    def __getitem__(self, index):
+        start = time.perf_counter()
+        batch_ids = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+        if self.shuffle:
+            # Sıralı indeksler diskten (memmap) daha verimli okunur
+            batch_ids = np.sort(batch_ids)
+        else:
+            # Ardışık pencereler: dilim erişimi daha ucuz
+            batch_ids = slice(batch_ids[0], batch_ids[-1] + 1)
+        batch = np.asarray(self.X[batch_ids]), self.y[batch_ids]
+        # Batch üretme süresi (eğitim telemetrisi için)
+        self.load_seconds += time.perf_counter() - start
+        return batch
+    
+    def on_epoch_end(self):
+        self.epoch += 1
+        if self.shuffle:
+            self._shuffle_order()
+
+
+class BalancedBatchSequence(keras.utils.Sequence):
+    """
+    Hedef pozitif oranıyla dengelenmiş eğitim batch'leri (class_weight alternatifi)
+
+    Pozitif ve negatif pencerelerin yalnızca indeksleri tutulur; her batch iki
+    havuzdan çekilen indekslerle X'ten (ndarray, memmap, WindowDataset veya
+    CompressedArray) okunur, veri kopyalanmaz. Bir epoch her negatifi bir kez
+    görür; pozitifler her epoch karıştırılıp gerektiği kadar tekrar kullanılır.
+    Sıra (seed, epoch) ile belirlenir.
+    """
+    
+    def __init__(self, X, y, batch_size=512, pos_fraction=0.25, seed=42, initial_epoch=0,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.X = X
+        self.y = np.asarray(y)
+        ids_dtype = index_dtype(len(self.y))
+        self.pos_ids = np.flatnonzero(self.y == 1).astype(ids_dtype)
+        self.neg_ids = np.flatnonzero(self.y != 1).astype(ids_dtype)
+        if len(self.pos_ids) == 0 or len(self.neg_ids) == 0:
+            raise ValueError("Dengeli batch için eğitim setinde iki sınıf da bulunmalı")
+        self.n_pos = int(min(batch_size - 1, max(1, round(batch_size * pos_fraction))))
+        self.n_neg = batch_size - self.n_pos
+        self.seed = seed
+        self.epoch = initial_epoch
+        self.load_seconds = 0.0
+        self._shuffle_pools()
+    
+    def _shuffle_pools(self):
+        rng = np.random.default_rng([self.seed, self.epoch])
+        self.neg_order = rng.permutation(self.neg_ids)
+        n_needed = len(self) * self.n_pos
+        repeats = int(np.ceil(n_needed / len(self.pos_ids)))
+        self.pos_order = np.concatenate(
+            [rng.permutation(self.pos_ids) for _ in range(repeats)]
+        )[:n_needed]
+    
+    def __len__(self):
+        return int(np.ceil(len(self.neg_ids) / self.n_neg))
+    
+    def __getitem__(self, index):
+        start = time.perf_counter()
+        batch_ids = np.sort(np.concatenate([
+            self.pos_order[index * self.n_pos:(index + 1) * self.n_pos],
+            self.neg_order[index * self.n_neg:(index + 1) * self.n_neg]
+        ]))
+        batch = np.asarray(self.X[batch_ids]), self.y[batch_ids]
+        self.load_seconds += time.perf_counter() - start
+        return batch
+    
+    def on_epoch_end(self):
+        self.epoch += 1
+        self._shuffle_pools()
+
+
+def sequence_dataset(sequence, window_shape: tuple) -> tf.data.Dataset:
+    """
+    Sequence batch'lerini sabit pencere şekilli bir tf.data pipeline'ı olarak üret
+
+    Keras bir Sequence'ı (None, None, None) şekilli girdi olarak izler;
+    unroll=True GRU ise sabit zaman adımı sayısı ister. Batch'ler Sequence'ın
+    kendi sırasıyla üretilir ve her epoch sonunda on_epoch_end çağrılır.
+    """
+    def batches():
+        for index in range(len(sequence)):
+            yield sequence[index]
+        sequence.on_epoch_end()
+
+    dataset = tf.data.Dataset.from_generator(batches, output_signature=(
+        tf.TensorSpec((None,) + tuple(window_shape), tf.as_dtype(sequence.X.dtype)),
+        tf.TensorSpec((None,), tf.as_dtype(sequence.y.dtype))
+    ))
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(len(sequence)))
+    return dataset.prefetch(1)
+
 
 class GRUSepsisModel:
     """GRU tabanlı sepsis tahmin modeli"""
     
-    def __init__(self, input_shape=(6, 63), gru_units=64, dense_units=32, dropout_rate=0.3):
+    def __init__(self, input_shape=(6, 63), gru_units=64, dense_units=32, dropout_rate=0.3,
+                 unroll=False):
         """
         Args:
             input_shape: (sequence_length, num_features)
             gru_units: GRU katmanındaki ünite sayısı
             dense_units: Dense katmanındaki ünite sayısı
             dropout_rate: Dropout oranı
+            unroll: GRU döngüsünü aç (kısa, sabit pencereler için daha hızlı)
         """
         self.input_shape = input_shape
         self.gru_units = gru_units
         self.dense_units = dense_units
         self.dropout_rate = dropout_rate
+        self.unroll = unroll
         self.model = None
         self.history = None
         
@@ -62,6 +229,7 @@ class GRUSepsisModel:
             layers.GRU(
                 self.gru_units,
                 return_sequences=False,
+                unroll=self.unroll,
                 name='gru_layer'
             ),
             layers.BatchNormalization(name='batch_norm'),
@@ -85,8 +253,8 @@ class GRUSepsisModel:
         
         return model
     
-    def compile_model(self, learning_rate=0.001):
-        """Modeli derle"""
+    def compile_model(self, learning_rate=0.001, jit_compile=False):
+        """Modeli derle (jit_compile=True: train/predict adımları XLA ile derlenir)"""
         self.model.compile(
             optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
             loss='binary_crossentropy',
@@ -95,9 +263,11 @@ class GRUSepsisModel:
                 keras.metrics.AUC(name='pr_auc', curve='PR'),
                 keras.metrics.Precision(name='precision'),
                 keras.metrics.Recall(name='recall')
-            ]
+            ],
+            jit_compile=jit_compile
         )
-        print(f"\n✓ Model derlendi (lr={learning_rate})")
+        print(f"\n✓ Model derlendi (lr={learning_rate}, "
+              f"{describe(jit_compile, self.unroll)})")
     
     def calculate_class_weights(self, y_train):
         """Sınıf ağırlıklarını hesapla"""
@@ -124,16 +294,74 @@ class GRUSepsisModel:
         epochs=60,
         batch_size=512,
         class_weight=None,
-        callbacks_list=None
+        callbacks_list=None,
+        initial_epoch=0,
+        pos_fraction=None,
+        seed=42
     ):
-        """Modeli eğit"""
+        """
+        Modeli eğit
+
+        initial_epoch: checkpoint'tan devam ederken başlangıç epoch'u
+        pos_fraction: verilirse eğitim batch'leri BalancedBatchSequence ile bu
+            pozitif oranında oluşturulur (class_weight ile birlikte kullanılmaz)
+        seed: Sequence girdilerinin epoch karıştırma tohumu
+        """
         print("\n" + "="*60)
         print("MODEL EĞİTİMİ BAŞLIYOR")
         print("="*60)
-        print(f"Train örnekleri: {len(X_train):,}")
-        print(f"Validation örnekleri: {len(X_val):,}")
+        print(f"Train örnekleri: {len(y_train):,}")
+        print(f"Validation örnekleri: {len(y_val):,}")
         print(f"Batch size: {batch_size}")
         print(f"Max epochs: {epochs}")
+        if pos_fraction:
+            print(f"Dengeli batch: pozitif oranı {pos_fraction:.2f}")
+        if initial_epoch:
+            print(f"Başlangıç epoch'u: {initial_epoch + 1}")
+        
+        if isinstance(X_train, tf.data.Dataset):
+            # Shard formatı: X_train/X_val (x, y) batch'leri üreten tf.data pipeline'ları
+            self.history = self.model.fit(
+                X_train,
+                validation_data=X_val,
+                epochs=epochs,
+                class_weight=class_weight,
+                callbacks=callbacks_list,
+                initial_epoch=initial_epoch,
+                verbose=1
+            )
+            return self.history
+        
+        if pos_fraction or isinstance(X_train, (WindowDataset, CompressedArray, np.memmap)):
+            # Index / sıkıştırılmış / memmap: pencereler batch batch üretilir, veri seti RAM'e alınmaz
+            if pos_fraction:
+                # Dengeli batch'ler: yalnızca indeks havuzları tutulur (bellekte veya memmap veride)
+                train_data = BalancedBatchSequence(
+                    X_train, y_train, batch_size, pos_fraction, seed=seed,
+                    initial_epoch=initial_epoch
+                )
+            else:
+                train_data = WindowBatchSequence(
+                    X_train, y_train, batch_size, shuffle=True, seed=seed,
+                    initial_epoch=initial_epoch
+                )
+            for callback in callbacks_list or []:
+                # Telemetri: batch üretme süresini Sequence'ın sayacından okur
+                if hasattr(callback, 'watch_data'):
+                    callback.watch_data(train_data)
+            # Sabit pencere şekli: --unroll sabit zaman adımı sayısı gerektirir
+            self.history = self.model.fit(
+                sequence_dataset(train_data, self.input_shape),
+                validation_data=sequence_dataset(
+                    WindowBatchSequence(X_val, y_val, batch_size), self.input_shape
+                ),
+                epochs=epochs,
+                class_weight=class_weight,
+                callbacks=callbacks_list,
+                initial_epoch=initial_epoch,
+                verbose=1
+            )
+            return self.history
         
         self.history = self.model.fit(
             X_train, y_train,
@@ -142,6 +370,7 @@ class GRUSepsisModel:
             batch_size=batch_size,
             class_weight=class_weight,
             callbacks=callbacks_list,
+            initial_epoch=initial_epoch,
             verbose=1
         )
         
@@ -154,12 +383,23 @@ class GRUSepsisModel:
         print("="*60)
         
         # Model tahminleri
-        y_pred_proba = self.model.predict(X_test, verbose=0)
+        if isinstance(X_test, tf.data.Dataset):
+            # Sıralı pipeline: tahminler y_test ile aynı sırada
+            y_pred_proba = self.model.predict(X_test, verbose=0)
+            eval_inputs = {'x': X_test}
+        elif isinstance(X_test, (WindowDataset, CompressedArray, np.memmap)):
+            y_pred_proba = predict_in_batches(self.model, X_test)
+            eval_inputs = {'x': sequence_dataset(
+                WindowBatchSequence(X_test, y_test, batch_size=1024), self.input_shape
+            )}
+        else:
+            y_pred_proba = self.model.predict(X_test, verbose=0)
+            eval_inputs = {'x': X_test, 'y': y_test}
         y_pred = (y_pred_proba > 0.5).astype(int)
         
         # Metrikler
         test_loss, test_roc_auc, test_pr_auc, test_precision, test_recall = \
-            self.model.evaluate(X_test, y_test, verbose=0)
+            self.model.evaluate(**eval_inputs, verbose=0)
         
         print(f"\nTest Metrikleri:")
         print(f"  Loss:      {test_loss:.4f}")
@@ -192,8 +432,11 @@ class GRUSepsisModel:
     def plot_training_history(self, save_path=None):
         """Eğitim geçmişini görselleştir"""
         history_dict = self.history.history
+        # Telemetri varsa (TrainingTelemetry) üçüncü satırda hız ve kaynak grafikleri
+        has_telemetry = 'samples_per_s' in history_dict
         
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        fig, axes = plt.subplots(3 if has_telemetry else 2, 2,
+                                 figsize=(15, 15 if has_telemetry else 10))
         fig.suptitle('GRU Model Eğitim Geçmişi', fontsize=16, fontweight='bold')
         
         # Loss
@@ -234,6 +477,38 @@ class GRUSepsisModel:
         axes[1, 1].legend()
         axes[1, 1].grid(True, alpha=0.3)
         
+        if has_telemetry:
+            # Throughput ve CPU kullanımı
+            axes[2, 0].plot(history_dict['samples_per_s'], label='Örnek/sn', linewidth=2)
+            axes[2, 0].set_title('Eğitim Hızı')
+            axes[2, 0].set_xlabel('Epoch')
+            axes[2, 0].set_ylabel('Örnek/sn')
+            axes[2, 0].grid(True, alpha=0.3)
+            cpu_axis = axes[2, 0].twinx()
+            cpu_axis.plot(history_dict['cpu_util'], label='CPU kullanımı', color='gray',
+                          linestyle='--')
+            cpu_axis.set_ylabel('CPU kullanımı (oran)')
+            lines = axes[2, 0].get_lines() + cpu_axis.get_lines()
+            axes[2, 0].legend(lines, [line.get_label() for line in lines])
+            
+            # Epoch süresi dağılımı ve bellek
+            for key, label in [('step_time_s', 'Eğitim adımları'), ('data_time_s', 'Veri üretme'),
+                               ('host_time_s', 'Adımlar arası'), ('val_time_s', 'Validation')]:
+                if key in history_dict:
+                    axes[2, 1].plot(history_dict[key], label=label, linewidth=2)
+            axes[2, 1].set_title('Epoch Süresi ve Bellek')
+            axes[2, 1].set_xlabel('Epoch')
+            axes[2, 1].set_ylabel('Süre (sn)')
+            axes[2, 1].grid(True, alpha=0.3)
+            lines = axes[2, 1].get_lines()
+            if 'rss_mb' in history_dict:
+                rss_axis = axes[2, 1].twinx()
+                rss_axis.plot(history_dict['rss_mb'], label='RSS (MB)', color='black',
+                              linestyle=':')
+                rss_axis.set_ylabel('RSS (MB)')
+                lines = lines + rss_axis.get_lines()
+            axes[2, 1].legend(lines, [line.get_label() for line in lines])
+        
         plt.tight_layout()
         
         if save_path:
@@ -243,6 +518,27 @@ class GRUSepsisModel:
         return fig
 
 
+PROFILE_STAGES = ['load_data', 'build_model', 'train', 'plot', 'evaluate']
+
+
+def convergence_summary(history_dict, train_wall_s, balance, pos_fraction=None):
+    """
+    En iyi val_pr_auc'a ulaşılan epoch ve eğitim süresi (--balance karşılaştırması için)
+
+    train_wall_s: --resume ile devam edilen eğitimde tüm oturumların toplamı
+    """
+    val_pr_auc = history_dict['val_pr_auc']
+    best_epoch = int(np.argmax(val_pr_auc))
+    return {
+        'balance': balance,
+        'pos_fraction': pos_fraction,
+        'best_epoch': best_epoch + 1,
+        'best_val_pr_auc': float(val_pr_auc[best_epoch]),
+        'epochs_run': len(val_pr_auc),
+        'train_wall_s': float(train_wall_s)
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='GRU modelini eğit'
@@ -296,42 +592,181 @@ def main():
         default=0.3,
         help='Dropout oranı'
     )
+    parser.add_argument(
+        '--jit-compile',
+        action='store_true',
+        help='Eğitim ve tahmin adımlarını XLA ile derle (CPU\'da op başına ek yükü azaltır)'
+    )
+    parser.add_argument(
+        '--unroll',
+        action='store_true',
+        help='GRU döngüsünü aç (kısa, sabit pencereler için)'
+    )
+    parser.add_argument(
+        '--input-pipeline',
+        type=str,
+        choices=['sequence', 'tfdata'],
+        default='sequence',
+        help='windows/index formatı için girdi: sequence (Keras Sequence) veya tfdata '
+             '(tf.data: karıştırma tamponu, paralel map, prefetch). shards her zaman tf.data kullanır'
+    )
+    parser.add_argument(
+        '--shuffle-buffer',
+        type=int,
+        default=10_000,
+        help='Shard formatında tf.data karıştırma tamponu boyutu (pencere, varsayılan: 10000); '
+             'windows/index formatında indeksler her epoch tamamen karıştırılır'
+    )
+    parser.add_argument(
+        '--cache-val',
+        action='store_true',
+        help='tf.data validation batch\'lerini ilk epoch\'tan sonra bellekte tut'
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        choices=PROFILE_STAGES,
+        default=None,
+        help='Bu aşama için cProfile istatistiklerini çıktı dizinine yaz (profile_<aşama>.prof)'
+    )
+    parser.add_argument(
+        '--trace-malloc',
+        action='store_true',
+        help='Aşama profiline tracemalloc en büyük bellek ayıranlarını ekle (yavaşlatır)'
+    )
+    parser.add_argument(
+        '--balance',
+        type=str,
+        choices=['class_weight', 'sampler'],
+        default='class_weight',
+        help='Sınıf dengesizliği: class_weight (varsayılan) veya sampler '
+             '(hedef pozitif oranlı dengeli batch\'ler)'
+    )
+    parser.add_argument(
+        '--pos-fraction',
+        type=float,
+        default=0.25,
+        help='--balance sampler için batch başına pozitif oranı (varsayılan: 0.25)'
+    )
+    parser.add_argument(
+        '--telemetry-every',
+        type=int,
+        default=100,
+        help='Telemetri batch kaydı aralığı (batch); epoch ölçümleri her zaman alınır, '
+             '0 batch kaydını kapatır (varsayılan: 100)'
+    )
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=1,
+        help='Kaç epoch\'ta bir tam eğitim durumu kaydedileceği; 0 kapatır (varsayılan: 1)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='<output>/checkpoints altındaki son tam durumdan eğitime devam et'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Ağırlık başlatma, dropout ve epoch karıştırma sıraları için tohum (varsayılan: 42)'
+    )
+    cpu_config.add_arguments(parser)
     
     args = parser.parse_args()
+    if args.resume and args.checkpoint_every <= 0:
+        parser.error("--resume için --checkpoint-every 0'dan büyük olmalı")
+    if args.balance == 'sampler' and not 0 < args.pos_fraction < 1:
+        parser.error("--pos-fraction 0 ile 1 arasında olmalı")
+    cpu_settings = cpu_config.apply(cpu_config.resolve(args))
     
     print("="*60)
     print("GRU SEPSIS TAHMİN MODELİ - EĞİTİM v23")
     print("="*60)
     print(f"Başlangıç zamanı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"CPU: {cpu_config.describe(cpu_settings)}")
+    
+    # Python / NumPy / TensorFlow tohumları; --resume'da checkpoint'teki RNG durumu geri yüklenir
+    keras.utils.set_random_seed(args.seed)
+    
+    # Aşama profili (süre, CPU, bellek; isteğe bağlı tracemalloc/cProfile)
+    os.makedirs(args.output, exist_ok=True)
+    profiler = StageProfiler(
+        trace_malloc=args.trace_malloc,
+        profile_stage=args.profile,
+        profile_dir=args.output
+    )
     
     # Veriyi yükle
     print(f"\nVeri yükleniyor: {args.data}")
-    X_train = np.load(os.path.join(args.data, 'X_train.npy'))
-    y_train = np.load(os.path.join(args.data, 'y_train.npy'))
-    X_val = np.load(os.path.join(args.data, 'X_val.npy'))
-    y_val = np.load(os.path.join(args.data, 'y_val.npy'))
-    X_test = np.load(os.path.join(args.data, 'X_test.npy'))
-    y_test = np.load(os.path.join(args.data, 'y_test.npy'))
-    
-    print(f"✓ Veri yüklendi")
-    print(f"  Train: {X_train.shape}")
-    print(f"  Val:   {X_val.shape}")
-    print(f"  Test:  {X_test.shape}")
+    with profiler.stage('load_data'):
+        dataset_info = load_dataset_info(args.data)
+        if dataset_info['format'] == FORMAT_SHARDS:
+            # Shard'lar tf.data ile paralel, iç içe geçirilerek okunur
+            from input_pipeline import shard_dataset
+        
+            y_train = load_shard_labels(args.data, 'train')
+            y_val = load_shard_labels(args.data, 'val')
+            y_test = load_shard_labels(args.data, 'test')
+            # Eğitim pipeline'ı checkpoint'ten sonra initial_epoch ile kurulur
+            X_train = None
+            X_val = shard_dataset(args.data, 'val', args.batch_size, cache=args.cache_val)
+            X_test = shard_dataset(args.data, 'test', 1024)
+            input_shape = (dataset_info['window_size'], dataset_info['n_features'])
+            shapes = {name: (len(y),) + input_shape for name, y in
+                      [('train', y_train), ('val', y_val), ('test', y_test)]}
+            feature_dtype = dataset_info['feature_dtype']
+        else:
+            X_train, y_train = load_split(args.data, 'train', mmap_mode='r')
+            X_val, y_val = load_split(args.data, 'val', mmap_mode='r')
+            X_test, y_test = load_split(args.data, 'test', mmap_mode='r')
+            input_shape = (X_train.shape[1], X_train.shape[2])
+            shapes = {'train': X_train.shape, 'val': X_val.shape, 'test': X_test.shape}
+            feature_dtype = X_train.dtype
+            
+            if args.input_pipeline == 'tfdata':
+                # tf.data: indeks karıştırma, paralel pencere toplama, prefetch
+                from input_pipeline import window_dataset
+                
+                X_val = window_dataset(X_val, y_val, args.batch_size, cache=args.cache_val)
+                X_test = window_dataset(X_test, y_test, 1024)
+    
+    tfdata_input = dataset_info['format'] == FORMAT_SHARDS or args.input_pipeline == 'tfdata'
+    if args.balance == 'sampler' and tfdata_input:
+        parser.error("--balance sampler windows/index formatında --input-pipeline sequence "
+                     "ile kullanılabilir")
+    
+    print(f"✓ Veri yüklendi (format: {dataset_info['format']}, dtype: {feature_dtype})")
+    print(f"  Train: {shapes['train']}")
+    print(f"  Val:   {shapes['val']}")
+    print(f"  Test:  {shapes['test']}")
+    if tfdata_input:
+        shuffle_desc = (f"karıştırma tamponu: {args.shuffle_buffer:,}"
+                        if dataset_info['format'] == FORMAT_SHARDS else "tam permütasyon")
+        print(f"  Girdi: tf.data ({shuffle_desc}, "
+              f"validation önbelleği: {'açık' if args.cache_val else 'kapalı'})")
     
     # Model oluştur
-    input_shape = (X_train.shape[1], X_train.shape[2])
     gru_model = GRUSepsisModel(
         input_shape=input_shape,
         gru_units=args.gru_units,
         dense_units=args.dense_units,
-        dropout_rate=args.dropout
+        dropout_rate=args.dropout,
+        unroll=args.unroll
     )
     
-    gru_model.build_model()
-    gru_model.compile_model(learning_rate=args.lr)
+    with profiler.stage('build_model'):
+        gru_model.build_model()
+        gru_model.compile_model(learning_rate=args.lr, jit_compile=args.jit_compile)
     
-    # Sınıf ağırlıklarını hesapla
-    class_weight = gru_model.calculate_class_weights(y_train)
+    # Sınıf ağırlıklarını hesapla (sampler modunda batch'ler zaten dengeli)
+    if args.balance == 'sampler':
+        class_weight = None
+        pos_fraction = args.pos_fraction
+    else:
+        class_weight = gru_model.calculate_class_weights(y_train)
+        pos_fraction = None
     
     # Callbacks tanımla
     os.makedirs(args.output, exist_ok=True)
@@ -362,29 +797,108 @@ def main():
         )
     ]
     
+    # Telemetri ölçümleri logs'a yazılır; History ve checkpoint'ten önce çalışmalı
+    telemetry = TrainingTelemetry(args.batch_size, log_every=args.telemetry_every)
+    callbacks_list.append(telemetry)
+    
+    # Tam durum checkpoint'i: izlediği callback'lerden sonra çalışmalı
+    checkpoint = None
+    initial_epoch = 0
+    if args.checkpoint_every > 0:
+        fingerprint = {
+            'data': os.path.abspath(args.data),
+            'data_files': data_signature(args.data),
+            'format': dataset_info['format'],
+            'shape': [int(dim) for dim in input_shape],
+            'n_train': int(len(y_train)),
+            'gru_units': args.gru_units,
+            'dense_units': args.dense_units,
+            'dropout': args.dropout,
+            'lr': args.lr,
+            'batch_size': args.batch_size,
+            'unroll': args.unroll,
+            'input_pipeline': args.input_pipeline,
+            'balance': args.balance,
+            'pos_fraction': pos_fraction,
+            'seed': args.seed
+        }
+        checkpoint = TrainingCheckpoint(
+            os.path.join(args.output, 'checkpoints'), fingerprint,
+            tracked_callbacks=callbacks_list[:3], every=args.checkpoint_every
+        )
+        checkpoint.start(resume=args.resume, epochs=args.epochs)
+        initial_epoch = checkpoint.initial_epoch
+        callbacks_list.append(checkpoint)
+    
+    if tfdata_input:
+        # Karıştırma (seed, epoch) ile belirlenir: devam eden eğitim ilk epoch'un sırasını tekrarlamaz
+        if dataset_info['format'] == FORMAT_SHARDS:
+            X_train = shard_dataset(
+                args.data, 'train', args.batch_size, shuffle=True,
+                shuffle_buffer=args.shuffle_buffer, seed=args.seed, initial_epoch=initial_epoch
+            )
+        else:
+            X_train = window_dataset(
+                X_train, y_train, args.batch_size, shuffle=True,
+                seed=args.seed, initial_epoch=initial_epoch
+            )
+    
     # Modeli eğit
-    history = gru_model.train(
-        X_train, y_train,
-        X_val, y_val,
-        epochs=args.epochs,
-        batch_size=args.batch_size,
-        class_weight=class_weight,
-        callbacks_list=callbacks_list
-    )
+    with profiler.stage('train'):
+        history = gru_model.train(
+            X_train, y_train,
+            X_val, y_val,
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+            class_weight=class_weight,
+            callbacks_list=callbacks_list,
+            initial_epoch=initial_epoch,
+            pos_fraction=pos_fraction,
+            seed=args.seed
+        )
+    if checkpoint is not None:
+        # Devam edilen eğitimde geçmiş önceki epoch'ları da içerir
+        history.history = checkpoint.history
+    
+    if history.history.get('samples_per_s'):
+        epoch_times = history.history['epoch_time_s']
+        data_share = (sum(history.history['data_time_s']) / max(sum(epoch_times), 1e-9)
+                      if 'data_time_s' in history.history else None)
+        print(f"\nTelemetri: {np.mean(history.history['samples_per_s']):,.0f} örnek/sn, "
+              f"epoch başına {np.mean(epoch_times):.1f} s"
+              + (f", veri üretme payı {data_share:.1%}" if data_share is not None else "")
+              + f", peak RSS {format_mb(peak_rss_mb())}")
     
     # Eğitim geçmişini kaydet
     history_path = os.path.join(args.output, 'training_history.json')
     history_dict = {k: [float(v) for v in vals] for k, vals in history.history.items()}
+    # Her --telemetry-every batch'teki hız / kaynak kayıtları (bu oturum)
+    history_dict['batch_telemetry'] = telemetry.batch_records
     with open(history_path, 'w') as f:
         json.dump(history_dict, f, indent=2)
     print(f"\n✓ Eğitim geçmişi kaydedildi: {history_path}")
     
     # Grafikleri çiz
     plot_path = os.path.join(args.output, 'training_history.png')
-    gru_model.plot_training_history(save_path=plot_path)
+    with profiler.stage('plot'):
+        gru_model.plot_training_history(save_path=plot_path)
     
     # Test setini değerlendir
-    test_results, y_pred_proba = gru_model.evaluate(X_test, y_test)
+    with profiler.stage('evaluate'):
+        test_results, y_pred_proba = gru_model.evaluate(X_test, y_test)
+    
+    # Yakınsama özeti: class_weight ve sampler modlarını karşılaştırmak için
+    train_wall_s = next(r['wall_s'] for r in profiler.records if r['name'] == 'train')
+    if checkpoint is not None:
+        # Devam edilen eğitimde önceki oturumların süresi de dahil
+        train_wall_s += checkpoint.previous_wall_s
+    test_results['convergence'] = convergence_summary(
+        history.history, train_wall_s, args.balance, pos_fraction
+    )
+    convergence = test_results['convergence']
+    print(f"\nYakınsama ({args.balance}): en iyi val PR-AUC {convergence['best_val_pr_auc']:.4f}, "
+          f"epoch {convergence['best_epoch']}/{convergence['epochs_run']}, "
+          f"eğitim süresi {train_wall_s:.0f} s")
     
     # Test sonuçlarını kaydet
     results_path = os.path.join(args.output, 'test_results.json')
@@ -404,6 +918,11 @@ def main():
     print(f"En iyi model: {model_path}")
     print(f"Test ROC-AUC: {test_results['test_roc_auc']:.4f}")
     print(f"Test PR-AUC: {test_results['test_pr_auc']:.4f}")
+    
+    profiler.print_report()
+    report_path = os.path.join(args.output, 'profile_report.json')
+    profiler.save(report_path)
+    print(f"\n✓ Profil raporu kaydedildi: {report_path}")
 
 
 if __name__ == '__main__':
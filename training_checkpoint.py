@@ -0,0 +1,286 @@
+"""
+Sepsis Tahmin Sistemi - Kesintiye Dayanıklı Eğitim Checkpoint'i
+===============================================================
+
+train_gru_v23.py için tam eğitim durumu checkpoint'i (--resume). Her
+--checkpoint-every epoch'ta <output>/checkpoints/ altına yazılır:
+
+- ckpt-XXXX.*: model ağırlıkları ve optimizer durumu (Adam moment'leri,
+  adım sayacı; tf.train.Checkpoint)
+- early_stopping-XXXX.npz: EarlyStopping(restore_best_weights=True) için
+  tutulan en iyi ağırlıklar
+- state.json: epoch sayacı, öğrenme oranı, EarlyStopping / ReduceLROnPlateau /
+  ModelCheckpoint sayaçları, Python / NumPy / TensorFlow RNG durumları, o ana
+  kadarki eğitim geçmişi, tüm oturumların toplam eğitim süresi ve çalıştırmayı
+  tanımlayan parametreler (veri dosyalarının boyut / değişiklik zamanı imzası
+  dahil)
+
+Epoch bütçesini bitirmiş bir eğitim --resume ve daha büyük --epochs ile
+uzatılabilir; EarlyStopping ile durmuş bir eğitim tamamlanmış kalır.
+
+Ağırlık dosyaları önce yazılır, state.json atomik olarak en son güncellenir;
+state.json'da kayıtlı olmayan dosyalar yarım kalmış sayılır ve silinir. Süreç
+checkpoint sırasında öldürülse bile bir önceki tutarlı durum korunur.
+
+Callback, durumunu geri yükleyebilmek için callback listesinde izlediği
+callback'lerden sonra yer almalıdır (onların on_train_begin sıfırlamasından
+sonra çalışır).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from file_utils import write_json_atomic
+
+# İzlenen callback'lerin geri yüklenen sayaçları (varsa)
+CALLBACK_STATE_ATTRS = ['wait', 'best', 'cooldown_counter', 'stopped_epoch', 'best_epoch']
+
+
+def _to_builtin(value):
+    """NumPy skalerlerini JSON'a yazılabilir Python değerlerine çevir"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def data_signature(path: str) -> str:
+    """
+    Veri dosyalarının imzası (göreli yol, boyut ve değişiklik zamanından)
+
+    Dizin verilirse altındaki tüm dosyalar dahil edilir; çok GB'lık içerik
+    hashlenmez (data_ingest.cache_path_for ile aynı yaklaşım).
+    """
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path) for name in names
+        )
+    else:
+        files = [path]
+    entries = []
+    for file_path in files:
+        stat = os.stat(file_path)
+        entries.append([os.path.relpath(file_path, path) if file_path != path else '',
+                        stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()[:16]
+
+
+def rng_state() -> dict:
+    """Python, NumPy ve TensorFlow global RNG durumları"""
+    py_version, py_state, py_gauss = random.getstate()
+    np_name, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+    return {
+        'python': [py_version, list(py_state), py_gauss],
+        'numpy': [np_name, np_keys.tolist(), int(np_pos), int(np_has_gauss), float(np_gauss)],
+        'tensorflow': tf.random.get_global_generator().state.numpy().tolist()
+    }
+
+
+def restore_rng_state(state: dict):
+    """rng_state çıktısını geri yükle"""
+    py_version, py_state, py_gauss = state['python']
+    random.setstate((py_version, tuple(py_state), py_gauss))
+    np_name, np_keys, np_pos, np_has_gauss, np_gauss = state['numpy']
+    np.random.set_state((np_name, np.asarray(np_keys, dtype=np.uint32), np_pos, np_has_gauss,
+                         np_gauss))
+    tf.random.get_global_generator().state.assign(
+        np.asarray(state['tensorflow'], dtype=np.int64)
+    )
+
+
+class TrainingCheckpoint(keras.callbacks.Callback):
+    """
+    Periyodik tam durum checkpoint'i ve --resume ile kaldığı yerden devam
+
+    Kullanım:
+        checkpoint = TrainingCheckpoint(dir, fingerprint, [early_stopping, reduce_lr, ...])
+        checkpoint.start(resume=True, epochs=60)
+        model.fit(..., initial_epoch=checkpoint.initial_epoch,
+                  callbacks=[early_stopping, reduce_lr, ..., checkpoint])
+        checkpoint.history  # önceki ve yeni epoch'ların birleşik geçmişi
+        checkpoint.previous_wall_s  # önceki oturumların kayıtlı eğitim süresi
+    """
+
+    def __init__(self, checkpoint_dir: str, fingerprint: dict, tracked_callbacks: list,
+                 every: int = 1):
+        """
+        Args:
+            checkpoint_dir: Checkpoint dizini
+            fingerprint: Çalıştırmayı tanımlayan parametreler (devam ederken aynı olmalı)
+            tracked_callbacks: Durumu kaydedilecek callback'ler
+            every: Kaç epoch'ta bir checkpoint yazılacağı
+        """
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.fingerprint = fingerprint
+        self.tracked_callbacks = tracked_callbacks
+        self.every = max(1, every)
+        self.state_path = os.path.join(checkpoint_dir, 'state.json')
+        self.state = None
+        self.initial_epoch = 0
+        self.history = {}
+        self.previous_wall_s = 0.0
+        self._epoch = 0
+        self._stopped_early = False
+        self._session_start = None
+        self._tf_checkpoint = None
+
+    def start(self, resume: bool, epochs: int):
+        """Yeni çalıştırma başlat veya kayıtlı duruma devam et (initial_epoch'u belirler)"""
+        if resume and os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            changed = [
+                key for key in self.fingerprint
+                if state['fingerprint'].get(key) != self.fingerprint[key]
+            ]
+            if changed:
+                raise ValueError(
+                    f"Önceki eğitime devam edilemez, değişenler: {changed}. "
+                    "--resume olmadan yeniden başlatın."
+                )
+            self.state = state
+            self.history = state['history']
+            self.previous_wall_s = state.get('train_wall_s', 0.0)
+            self._stopped_early = state.get('stopped_early', False)
+            # Erken durmuş eğitim yeniden çalıştırılmaz; epoch bütçesini bitirmiş
+            # eğitim istenen epoch sayısı daha büyükse kaldığı yerden uzatılır
+            if state['completed'] and self._stopped_early:
+                self.initial_epoch = max(epochs, state['epoch'])
+            else:
+                self.initial_epoch = min(epochs, state['epoch'])
+            self._epoch = state['epoch']
+            self._remove_uncommitted()
+            status = ''
+            if state['completed']:
+                status = ', erken durdurulmuş' if self._stopped_early else ', tamamlanmış'
+            print(f"✓ Checkpoint bulundu: {self.checkpoint_dir} (epoch {state['epoch']}"
+                  f"{status})")
+            if state['completed'] and not self._stopped_early and epochs > state['epoch']:
+                print(f"  Eğitim {epochs} epoch'a uzatılıyor")
+            return
+
+        if resume:
+            print(f"⚠ Checkpoint bulunamadı ({self.state_path}), eğitim baştan başlıyor")
+        if os.path.exists(self.checkpoint_dir):
+            shutil.rmtree(self.checkpoint_dir)
+        os.makedirs(self.checkpoint_dir)
+
+    def _checkpoint_object(self) -> tf.train.Checkpoint:
+        if self._tf_checkpoint is None:
+            self._tf_checkpoint = tf.train.Checkpoint(
+                model=self.model, optimizer=self.model.optimizer
+            )
+        return self._tf_checkpoint
+
+    def _build_optimizer(self):
+        """Optimizer slot'larını oluştur ki geri yükleme ertelenmeden yapılsın"""
+        optimizer = self.model.optimizer
+        if hasattr(optimizer, 'build'):
+            optimizer.build(self.model.trainable_variables)
+        else:
+            # Eski (legacy) optimizer API'si
+            optimizer._create_all_weights(self.model.trainable_variables)
+
+    def on_train_begin(self, logs=None):
+        self._session_start = time.perf_counter()
+        if self.state is None:
+            return
+        state = self.state
+        self._build_optimizer()
+        self._checkpoint_object().read(
+            os.path.join(self.checkpoint_dir, state['weights'])
+        ).assert_existing_objects_matched()
+        keras.backend.set_value(self.model.optimizer.lr, state['learning_rate'])
+
+        for callback, saved in zip(self.tracked_callbacks, state['callbacks']):
+            for attr, value in saved['attrs'].items():
+                setattr(callback, attr, value)
+            if saved.get('best_weights'):
+                with np.load(os.path.join(self.checkpoint_dir, saved['best_weights'])) as f:
+                    callback.best_weights = [f[f'arr_{i}'] for i in range(len(f.files))]
+
+        restore_rng_state(state['rng'])
+        print(f"✓ Eğitim durumu geri yüklendi: epoch {state['epoch']}, "
+              f"lr={state['learning_rate']:.2e}")
+
+    def on_epoch_begin(self, epoch, logs=None):
+        # Yeni bir epoch çalışıyorsa önceki oturumun erken durması geçerli değil
+        self._stopped_early = False
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._epoch = epoch + 1
+        for key, value in (logs or {}).items():
+            self.history.setdefault(key, []).append(float(value))
+        if self._epoch % self.every == 0:
+            self.save()
+
+    def on_train_end(self, logs=None):
+        # Buraya ulaşan eğitim (son epoch veya EarlyStopping) tamamlanmış sayılır
+        if self.model.stop_training:
+            self._stopped_early = True
+        self.save(completed=True)
+
+    def save(self, completed: bool = False):
+        """Tam eğitim durumunu yaz; state.json en son ve atomik olarak güncellenir"""
+        tag = f"{self._epoch:04d}"
+        weights = f"ckpt-{tag}"
+        self._checkpoint_object().write(os.path.join(self.checkpoint_dir, weights))
+
+        callback_states = []
+        for callback in self.tracked_callbacks:
+            saved = {
+                'class': type(callback).__name__,
+                'attrs': {
+                    attr: _to_builtin(getattr(callback, attr))
+                    for attr in CALLBACK_STATE_ATTRS if hasattr(callback, attr)
+                }
+            }
+            best_weights = getattr(callback, 'best_weights', None)
+            if best_weights is not None:
+                name = f"{type(callback).__name__.lower()}-{tag}.npz"
+                tmp_path = os.path.join(self.checkpoint_dir, '.tmp-' + name)
+                with open(tmp_path, 'wb') as f:
+                    np.savez(f, *best_weights)
+                os.replace(tmp_path, os.path.join(self.checkpoint_dir, name))
+                saved['best_weights'] = name
+            callback_states.append(saved)
+
+        state = {
+            'fingerprint': self.fingerprint,
+            'epoch': self._epoch,
+            'completed': completed,
+            'stopped_early': self._stopped_early,
+            'train_wall_s': self.previous_wall_s + time.perf_counter() - self._session_start,
+            'weights': weights,
+            'learning_rate': float(keras.backend.get_value(self.model.optimizer.lr)),
+            'callbacks': callback_states,
+            'rng': rng_state(),
+            'history': self.history,
+            'saved': datetime.now().isoformat(timespec='seconds')
+        }
+        write_json_atomic(self.state_path, state)
+        self.state = state
+        self._remove_uncommitted()
+
+    def _remove_uncommitted(self):
+        """state.json'da kayıtlı olmayan ağırlık dosyalarını sil"""
+        keep = {self.state['weights']}
+        keep.update(saved['best_weights'] for saved in self.state['callbacks']
+                    if saved.get('best_weights'))
+        for path in glob.glob(os.path.join(self.checkpoint_dir, '*')):
+            name = os.path.basename(path)
+            if name in ('state.json', 'checkpoint'):
+                continue
+            if not any(name == kept or name.startswith(kept + '.') for kept in keep):
+                os.remove(path)
@@ -0,0 +1,144 @@
+"""
+Sepsis Tahmin Sistemi - Eğitim Telemetrisi
+==========================================
+
+train_gru_v23.py için epoch ve batch düzeyinde hız / kaynak kaydı. Eğitim
+yavaşladığında (ör. veri yenilemesinden sonra) nedenin profilleyici olmadan
+görülebilmesi için kullanılır.
+
+Epoch başına (logs üzerinden History'ye, training_history.json'a ve
+grafiklere eklenir):
+
+- epoch_time_s: epoch'un duvar saati süresi (validation dahil)
+- train_time_s / val_time_s: eğitim ve validation kısımları
+- samples_per_s: eğitim örnek/sn (batch sayısı × batch boyutu, yaklaşık)
+- step_time_s: eğitim adımlarının toplam süresi (hesaplama + adım içinde
+  veri beklemesi)
+- data_time_s: batch üretmeye harcanan süre (Keras Sequence __getitem__;
+  tf.data girdilerinde ölçülmez). Önceden hazırlama (prefetch) ile
+  örtüşmediği ölçüde eğitimi bekletir.
+- host_time_s: adımlar arası süre (Python / callback ek yükü)
+- rss_mb, peak_rss_mb: süreç belleği
+- cpu_cores / cpu_util: ortalama kullanılan çekirdek ve kullanılabilir
+  çekirdeklere oranı
+
+Her log_every batch'te bir aynı ölçümler kısa pencere için batch_records
+listesine eklenir.
+"""
+
+import time
+
+from tensorflow import keras
+
+import cpu_config
+from resource_monitor import current_rss_mb, peak_rss_mb
+
+
+class TrainingTelemetry(keras.callbacks.Callback):
+    """
+    Epoch / batch süresi, verim, veri bekleme, RSS ve CPU kullanımı kaydı
+
+    Epoch ölçümleri logs'a yazılır; callback listesinde History'den ve
+    TrainingCheckpoint'tan önce yer aldığından bu değerler eğitim geçmişine
+    ve checkpoint'lere de girer. Veri süresi için eğitim verisi watch_data ile
+    bildirilir (load_seconds sayacı olan Sequence'lar).
+    """
+
+    def __init__(self, batch_size: int, log_every: int = 100):
+        """
+        Args:
+            batch_size: Eğitim batch boyutu (örnek/sn hesabı için)
+            log_every: Kaç batch'te bir batch kaydı alınacağı (0: kapalı)
+        """
+        super().__init__()
+        self.batch_size = batch_size
+        self.log_every = log_every
+        self.n_cpus = cpu_config.usable_cpus()
+        self.data_source = None
+        self.batch_records = []
+
+    def watch_data(self, source):
+        """Batch üretim süresi load_seconds ile okunacak eğitim verisi"""
+        self.data_source = source if hasattr(source, 'load_seconds') else None
+
+    def _data_seconds(self):
+        return self.data_source.load_seconds if self.data_source is not None else None
+
+    def _snapshot(self):
+        return time.perf_counter(), time.process_time(), self._data_seconds()
+
+    def _window(self, start, batches: int, step_s: float, host_s: float) -> dict:
+        """start anından bu yana geçen pencere için ölçümler"""
+        wall_start, cpu_start, data_start = start
+        wall, cpu, data = self._snapshot()
+        elapsed = max(wall - wall_start, 1e-9)
+        cores = (cpu - cpu_start) / elapsed
+        return {
+            'wall_s': elapsed,
+            'samples_per_s': batches * self.batch_size / elapsed,
+            'step_time_s': step_s,
+            'data_time_s': None if data is None else data - data_start,
+            'host_time_s': host_s,
+            'rss_mb': current_rss_mb(),
+            'cpu_cores': cores,
+            'cpu_util': cores / self.n_cpus
+        }
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch = epoch
+        self._epoch_start = self._snapshot()
+        self._window_start = self._epoch_start
+        self._batches = 0
+        self._step_s = self._window_step_s = 0.0
+        self._host_s = self._window_host_s = 0.0
+        self._last_batch_end = self._epoch_start[0]
+        self._val_s = 0.0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._batch_start = time.perf_counter()
+        gap = self._batch_start - self._last_batch_end
+        self._host_s += gap
+        self._window_host_s += gap
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._last_batch_end = time.perf_counter()
+        step = self._last_batch_end - self._batch_start
+        self._step_s += step
+        self._window_step_s += step
+        self._batches += 1
+
+        if self.log_every and self._batches % self.log_every == 0:
+            record = self._window(self._window_start, self.log_every,
+                                  self._window_step_s, self._window_host_s)
+            record.update({'epoch': self._epoch + 1, 'batch': self._batches})
+            self.batch_records.append(record)
+            self._window_start = self._snapshot()
+            self._window_step_s = self._window_host_s = 0.0
+
+    def on_test_begin(self, logs=None):
+        self._val_start = time.perf_counter()
+
+    def on_test_end(self, logs=None):
+        self._val_s += time.perf_counter() - self._val_start
+
+    def on_epoch_end(self, epoch, logs=None):
+        if logs is None:
+            return
+        epoch_stats = self._window(self._epoch_start, self._batches, self._step_s, self._host_s)
+        train_s = epoch_stats['wall_s'] - self._val_s
+        logs.update({
+            'epoch_time_s': epoch_stats['wall_s'],
+            'train_time_s': train_s,
+            'val_time_s': self._val_s,
+            'samples_per_s': self._batches * self.batch_size / max(train_s, 1e-9),
+            'step_time_s': self._step_s,
+            'host_time_s': self._host_s,
+            'cpu_cores': epoch_stats['cpu_cores'],
+            'cpu_util': epoch_stats['cpu_util']
+        })
+        # Ölçülemeyen değerler geçmişe eklenmez (History tüm epoch'larda sayı bekler)
+        for key, value in [('data_time_s', epoch_stats['data_time_s']),
+                           ('rss_mb', epoch_stats['rss_mb']),
+                           ('peak_rss_mb', peak_rss_mb())]:
+            if value is not None:
+                logs[key] = value